@@ -1,61 +1,29 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
-from models import db, Project
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, stream_with_context
+from models import db, Project, Person, ProjectStakeholder, normalize_name
+from search_index import full_text_search
+from fuzzy_search import fuzzy_search, trigram_index, DEFAULT_THRESHOLD as FUZZY_THRESHOLD
+from graph import related_summaries, project_graph
+from cache import cached, cache_stats
+from autocomplete import autocomplete, autocomplete_index, KINDS as AUTOCOMPLETE_KINDS
+from http_cache import conditional, catalog_validators, project_validators
+from bulk_import import import_projects, iter_records, ImportFormatError, DEFAULT_BATCH_SIZE as IMPORT_BATCH_SIZE
+from export_projects import iter_export_lines, iter_gzip, parse_fields, parse_since
+from doc_types import get_document_embed_info
+from db_config import engine_options, configure_engine
+from migrations import ensure_schema
+from catalog import filters_from_args, get_project_page, count_projects, get_facets, DEFAULT_PAGE_SIZE
+import io
 import os
+from datetime import datetime
 from urllib.parse import urlsplit, urlunsplit
 
 app = Flask(__name__)
 app.secret_key = 'cars24-secret-key-change-in-production-12345'
 
-# Helper functions for rich document previews
-def get_document_embed_info(url):
-    """Detect document type and return embed information"""
-    if not url:
-        return {'type': 'link', 'embed_url': None}
-    
-    # Google Docs
-    if 'docs.google.com/document' in url:
-        # Convert to embed URL
-        doc_id = url.split('/d/')[1].split('/')[0] if '/d/' in url else None
-        if doc_id:
-            return {
-                'type': 'google_doc',
-                'embed_url': f'https://docs.google.com/document/d/{doc_id}/preview',
-                'icon': 'google-doc'
-            }
-    
-    # Google Sheets
-    elif 'docs.google.com/spreadsheets' in url:
-        doc_id = url.split('/d/')[1].split('/')[0] if '/d/' in url else None
-        if doc_id:
-            return {
-                'type': 'google_sheet',
-                'embed_url': f'https://docs.google.com/spreadsheets/d/{doc_id}/preview',
-                'icon': 'google-sheet'
-            }
-    
-    # Figma
-    elif 'figma.com' in url:
-        return {
-            'type': 'figma',
-            'embed_url': f'https://www.figma.com/embed?embed_host=share&url={url}',
-            'icon': 'figma'
-        }
-    
-    # Notion
-    elif 'notion.so' in url or 'notion.site' in url:
-        return {
-            'type': 'notion',
-            'embed_url': url,
-            'icon': 'notion'
-        }
-    
-    # Default - just a link
-    return {'type': 'link', 'embed_url': None, 'icon': 'link'}
-
 # Register template filter
 @app.template_filter('doc_embed')
-def doc_embed_filter(url):
-    return get_document_embed_info(url)
+def doc_embed_filter(doc):
+    return get_document_embed_info(doc)
 
 # Database Configuration - supports both SQLite (local) and PostgreSQL (production)
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -75,34 +43,54 @@ try:
 except Exception:
     display_database_url = database_url
 
-print(f"Using database: {display_database_url}")
-
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
 
 # Initialize database
 db.init_app(app)
 
-# Create tables if they don't exist
 with app.app_context():
-    db.create_all()
-    print("Database tables created successfully!")
+    # SQLite PRAGMAs (WAL etc.) on every new connection; see db_config.py
+    configure_engine(db.engine)
+
+# Schema changes are applied by migrations.py (gunicorn's on_starting hook or
+# `python migrations.py`); each worker only checks the version once
+@app.before_request
+def check_schema_version():
+    if not app.config.get('SCHEMA_CHECKED'):
+        ensure_schema()
+        app.config['SCHEMA_CHECKED'] = True
 
 @app.route('/')
+@conditional(catalog_validators)
 def index():
-    """Main landing page route"""
-    projects = Project.query.order_by(Project.updated_at.desc()).all()
-    projects_list = [p.to_dict() for p in projects]
-    return render_template('index.html', projects=projects_list)
+    """Main landing page route (first page only; the rest is fetched on demand)"""
+    filters = filters_from_args(request.args)
+    page = get_project_page(filters)
+    return render_template(
+        'index.html',
+        projects=page['projects'],
+        next_cursor=page['next_cursor'],
+        total_count=count_projects(filters),
+        page_size=DEFAULT_PAGE_SIZE
+    )
 
 @app.route('/project/<int:project_id>')
+@conditional(project_validators)
 def project_detail(project_id):
     """Individual project detail page"""
     project = Project.query.get_or_404(project_id)
-    # Get all projects for related projects lookup
-    all_projects = Project.query.all()
-    all_projects_list = [p.to_dict() for p in all_projects]
-    return render_template('project_detail.html', project=project.to_dict(), all_projects=all_projects_list)
+    project_dict = project.to_dict()
+    # Resolve only the linked projects (one IN query, three columns); going through
+    # the edge rows keeps a deleted project's id from resolving to whoever reuses it
+    related_projects = related_summaries(project.live_related_ids())
+    return render_template('project_detail.html', project=project_dict, related_projects=related_projects)
+
+def related_ids_from_form(form, exclude=None):
+    """Project ids picked in the form's related-projects field, in order"""
+    ids = [int(value) for value in form.getlist('related_projects') if value.isdigit()]
+    return [i for i in dict.fromkeys(ids) if i != exclude]
 
 @app.route('/project/new', methods=['GET', 'POST'])
 def new_project():
@@ -110,13 +98,6 @@ def new_project():
     if request.method == 'POST':
         project_name = request.form.get('name')
         
-        # Check for duplicate name
-        existing = Project.query.filter_by(name=project_name).first()
-        if existing:
-            flash(f'Project with name "{project_name}" already exists!', 'error')
-            all_projects = Project.query.order_by(Project.name).all()
-            return render_template('project_form.html', project=None, action='Create', all_projects=all_projects)
-        
         # Collect project data (strip whitespace)
         project_data = {
             'name': project_name.strip() if project_name else '',
@@ -133,7 +114,8 @@ def new_project():
             'design_docs': [],
             'analytics_docs': [],
             'other_docs': [],
-            'tags': [tag.strip() for tag in request.form.get('tags', '').split(',') if tag.strip()]
+            'tags': [tag.strip() for tag in request.form.get('tags', '').split(',') if tag.strip()],
+            'related_projects': related_ids_from_form(request.form)
         }
         
         # Process stakeholders with emails (strip whitespace)
@@ -164,7 +146,7 @@ def new_project():
                 else:
                     project_data['other_docs'].append(doc_obj)
         
-        # Create and save project
+        # Create and save project; the unique name_key index catches duplicates
         try:
             project = Project.from_dict(project_data)
             db.session.add(project)
@@ -174,13 +156,16 @@ def new_project():
             return redirect(url_for('project_detail', project_id=project.id))
         except Exception as e:
             db.session.rollback()
-            flash(f'Error creating project: {str(e)}', 'error')
-            all_projects = Project.query.order_by(Project.name).all()
-            return render_template('project_form.html', project=None, action='Create', all_projects=all_projects)
+            if Project.is_name_conflict(e):
+                flash(f'Project with name "{project_data["name"]}" already exists!', 'error')
+            else:
+                flash(f'Error creating project: {str(e)}', 'error')
+            # Re-render what was submitted; only the picked related projects are looked up
+            return render_template('project_form.html', project=project_data, action='Create',
+                                   related_projects=related_summaries(project_data['related_projects']))
     
-    # Get all projects for related projects dropdown
-    all_projects = Project.query.order_by(Project.name).all()
-    return render_template('project_form.html', project=None, action='Create', all_projects=all_projects)
+    # Related projects are picked through /api/projects/suggest
+    return render_template('project_form.html', project=None, action='Create', related_projects=[])
 
 @app.route('/project/<int:project_id>/edit', methods=['GET', 'POST'])
 def edit_project(project_id):
@@ -190,13 +175,6 @@ def edit_project(project_id):
     if request.method == 'POST':
         project_name = request.form.get('name')
         
-        # Check for duplicate name (excluding current project)
-        existing = Project.query.filter(Project.name == project_name, Project.id != project_id).first()
-        if existing:
-            flash(f'Project with name "{project_name}" already exists!', 'error')
-            all_projects = Project.query.filter(Project.id != project_id).order_by(Project.name).all()
-            return render_template('project_form.html', project=project.to_dict(), action='Edit', all_projects=all_projects)
-        
         # Collect updated data (strip whitespace)
         updated_data = {
             'name': project_name.strip() if project_name else '',
@@ -213,7 +191,8 @@ def edit_project(project_id):
             'design_docs': [],
             'analytics_docs': [],
             'other_docs': [],
-            'tags': [tag.strip() for tag in request.form.get('tags', '').split(',') if tag.strip()]
+            'tags': [tag.strip() for tag in request.form.get('tags', '').split(',') if tag.strip()],
+            'related_projects': related_ids_from_form(request.form, exclude=project_id)
         }
         
         # Process stakeholders with emails (strip whitespace)
@@ -244,7 +223,7 @@ def edit_project(project_id):
                 else:
                     updated_data['other_docs'].append(doc_obj)
         
-        # Update project
+        # Update project; the unique name_key index catches duplicates
         try:
             project.update_from_dict(updated_data)
             db.session.commit()
@@ -253,13 +232,18 @@ def edit_project(project_id):
             return redirect(url_for('project_detail', project_id=project.id))
         except Exception as e:
             db.session.rollback()
-            flash(f'Error updating project: {str(e)}', 'error')
-            all_projects = Project.query.filter(Project.id != project_id).order_by(Project.name).all()
-            return render_template('project_form.html', project=project.to_dict(), action='Edit', all_projects=all_projects)
+            if Project.is_name_conflict(e):
+                flash(f'Project with name "{updated_data["name"]}" already exists!', 'error')
+            else:
+                flash(f'Error updating project: {str(e)}', 'error')
+            # Re-render what was submitted; only the picked related projects are looked up
+            return render_template('project_form.html', project=updated_data, action='Edit', project_id=project_id,
+                                   related_projects=related_summaries(updated_data['related_projects']))
     
-    # Get all projects for related projects dropdown (excluding current)
-    all_projects = Project.query.filter(Project.id != project_id).order_by(Project.name).all()
-    return render_template('project_form.html', project=project.to_dict(), action='Edit', all_projects=all_projects)
+    # Related projects are picked through /api/projects/suggest
+    project_dict = project.to_dict()
+    return render_template('project_form.html', project=project_dict, action='Edit', project_id=project_id,
+                           related_projects=related_summaries(project.live_related_ids()))
 
 @app.route('/project/<int:project_id>/delete', methods=['POST'])
 def delete_project(project_id):
@@ -268,6 +252,7 @@ def delete_project(project_id):
     
     try:
         name = project.name
+        project.drop_from_referrers()
         db.session.delete(project)
         db.session.commit()
         
@@ -278,50 +263,202 @@ def delete_project(project_id):
     
     return redirect(url_for('index'))
 
+@app.route('/api/project/<int:project_id>/graph')
+def project_relationship_graph(project_id):
+    """API endpoint for the related-projects graph around a project"""
+    if not db.session.query(Project.id).filter_by(id=project_id).first():
+        return {'error': 'Project not found'}, 404
+    depth = request.args.get('depth', 1, type=int)
+    return project_graph(project_id, depth)
+
 @app.route('/api/search')
+@conditional(catalog_validators)
 def search_projects():
-    """API endpoint for searching projects"""
-    query = request.args.get('q', '').lower()
+    """API endpoint for searching projects (typo-tolerant, or mode=fulltext for word matches)"""
+    query = request.args.get('q', '').strip()
     
     if not query:
         return {'projects': []}
     
-    # Search in name, summary, product_manager, business_vertical, and tags
-    projects = Project.query.all()
-    results = []
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
     
-    for project in projects:
-        project_dict = project.to_dict()
-        searchable_text = ' '.join([
-            project_dict['name'],
-            project_dict['summary'],
-            project_dict['product_manager'],
-            project_dict['business_vertical'],
-            ' '.join(project_dict['tags'])
-        ]).lower()
-        
-        if query in searchable_text:
-            results.append({
-                'id': project_dict['id'],
-                'name': project_dict['name'],
-                'summary': project_dict['summary'][:100] + '...' if len(project_dict['summary']) > 100 else project_dict['summary'],
-                'business_vertical': project_dict['business_vertical'],
-                'product_manager': project_dict['product_manager']
-            })
+    if request.args.get('mode') == 'fulltext':
+        # Search in name, summary, product_manager, business_vertical, and tags
+        return {'projects': full_text_search(query, limit=limit)}
+    
+    # Trigram similarity over name, tags, product manager, business vertical and summary
+    threshold = max(0.1, min(request.args.get('threshold', FUZZY_THRESHOLD, type=float), 1.0))
+    results = fuzzy_search(query, threshold=threshold, limit=limit)
     
     return {'projects': results}
 
+@app.route('/api/autocomplete')
+@conditional(catalog_validators)
+def autocomplete_terms():
+    """API endpoint for search-as-you-type completions (in-process prefix index)"""
+    prefix = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 8, type=int), 25))
+    kinds = [kind for kind in request.args.getlist('kind') if kind in AUTOCOMPLETE_KINDS]
+    
+    return {'completions': autocomplete(prefix, limit=limit, kinds=kinds)}
+
+@app.route('/api/projects')
+@conditional(catalog_validators)
+def list_projects():
+    """API endpoint for paginated, filtered project cards"""
+    filters = filters_from_args(request.args)
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    
+    # Copy: the page dict is shared with the read cache
+    page = dict(get_project_page(filters, cursor=cursor, limit=limit))
+    
+    # The total only changes with the filters, so only count on the first page
+    if not cursor:
+        page['total'] = count_projects(filters)
+    
+    return page
+
+@app.route('/api/projects/bulk', methods=['POST'])
+def bulk_import_projects():
+    """API endpoint for bulk import (JSON array or NDJSON body), upserting on name"""
+    batch_size = request.args.get('batch_size', IMPORT_BATCH_SIZE, type=int)
+    upsert = request.args.get('upsert', '1') not in ('0', 'false', 'no')
+    
+    # Stream the body so large NDJSON uploads are never held in memory twice
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8')
+    try:
+        report = import_projects(iter_records(stream), batch_size=batch_size, upsert=upsert)
+    except ImportFormatError as e:
+        db.session.rollback()
+        return {'error': str(e)}, 400
+    
+    return report
+
+@app.route('/api/projects/export')
+def export_projects():
+    """API endpoint streaming projects as NDJSON (optionally gzip'd)"""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    lines = iter_export_lines(since=since, fields=fields)
+    filename = f"projects_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    
+    if request.args.get('gzip') in ('1', 'true', 'yes'):
+        body, mimetype, filename = iter_gzip(lines), 'application/gzip', filename + '.gz'
+    else:
+        body, mimetype = lines, 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.route('/api/facets')
+@conditional(catalog_validators)
+def project_facets():
+    """API endpoint for per-tag and per-vertical counts under the current filters"""
+    filters = filters_from_args(request.args)
+    tag_limit = max(1, min(request.args.get('tag_limit', 25, type=int), 200))
+    return get_facets(filters, tag_limit=tag_limit)
+
+@app.route('/api/people')
+def search_people():
+    """API endpoint for the people typeahead (prefix match on name or email)"""
+    prefix = normalize_name(request.args.get('q', ''))
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    
+    if not prefix:
+        return {'people': []}
+    
+    # Range scans instead of LIKE so the name_key index and the unique
+    # dedupe_key index apply; emails are stored lowercased, as "email:<address>"
+    upper = prefix + '\uffff'
+    email_prefix = Person.key_for('', request.args.get('q', '').strip().lower())
+    people = (
+        Person.query
+        .filter(db.or_(
+            db.and_(Person.name_key >= prefix, Person.name_key < upper),
+            db.and_(Person.dedupe_key >= email_prefix, Person.dedupe_key < email_prefix + '\uffff')
+        ))
+        .order_by(Person.name_key)
+        .limit(limit)
+        .all()
+    )
+    
+    counts = dict(
+        db.session.query(ProjectStakeholder.person_id, db.func.count(db.distinct(ProjectStakeholder.project_id)))
+        .filter(ProjectStakeholder.person_id.in_([p.id for p in people]))
+        .group_by(ProjectStakeholder.person_id)
+    ) if people else {}
+    
+    return {'people': [dict(p.to_dict(), project_count=counts.get(p.id, 0)) for p in people]}
+
+@app.route('/api/projects/suggest')
+@conditional(catalog_validators)
+def suggest_projects():
+    """API endpoint for the related-projects picker (prefix match on the normalized name)"""
+    prefix = normalize_name(request.args.get('prefix', ''))
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    exclude = request.args.getlist('exclude', type=int)
+    
+    if not prefix:
+        return {'projects': []}
+    
+    # Range scan on the uq_projects_name_key index, reading only id and name
+    query = db.session.query(Project.id, Project.name).filter(
+        Project.name_key >= prefix, Project.name_key < prefix + '\uffff'
+    )
+    if exclude:
+        query = query.filter(Project.id.notin_(exclude))
+    rows = query.order_by(Project.name_key).limit(limit).all()
+    
+    return {'projects': [{'id': row.id, 'name': row.name} for row in rows]}
+
+@app.route('/api/people/<int:person_id>/projects')
+def person_projects(person_id):
+    """API endpoint listing every project a person is a stakeholder on"""
+    person = Person.query.get_or_404(person_id)
+    
+    rows = (
+        db.session.query(Project.id, Project.name, Project.business_vertical, ProjectStakeholder.role)
+        .join(ProjectStakeholder, ProjectStakeholder.project_id == Project.id)
+        .filter(ProjectStakeholder.person_id == person_id)
+        .order_by(Project.name)
+        .all()
+    )
+    
+    projects = {}
+    for project_id, name, vertical, role in rows:
+        entry = projects.setdefault(project_id, {
+            'id': project_id,
+            'name': name,
+            'business_vertical': vertical,
+            'roles': []
+        })
+        entry['roles'].append(role)
+    
+    return {'person': person.to_dict(), 'projects': list(projects.values())}
+
 @app.route('/api/business-verticals')
+@conditional(catalog_validators)
 def get_business_verticals():
     """API endpoint to get all unique business verticals"""
-    projects = Project.query.all()
-    verticals = set()
-    
-    for project in projects:
-        if project.business_vertical:
-            verticals.add(project.business_vertical)
+    def load_verticals():
+        # Index-only DISTINCT over ix_projects_business_vertical
+        rows = db.session.query(Project.business_vertical).distinct().order_by(Project.business_vertical)
+        return [vertical for (vertical,) in rows if vertical]
     
-    return {'verticals': sorted(list(verticals))}
+    return {'verticals': cached('verticals', None, load_verticals)}
+
+@app.route('/api/cache/stats')
+def read_cache_stats():
+    """API endpoint exposing read-cache hit/miss counters for this worker"""
+    return dict(cache_stats(), autocomplete=autocomplete_index.stats(), fuzzy_search=trigram_index.stats())
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,241 @@
+"""
+ASGI entry point: async JSON endpoints in front of the Flask app
+
+    pip install -r requirements-asgi.txt
+    gunicorn -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker asgi:app
+    (or: uvicorn asgi:app --workers 4)
+
+The read-only JSON endpoints the UI calls on every keystroke or page load
+(/api/search, /api/autocomplete, /api/projects/suggest and
+/api/business-verticals) run as async handlers on an async SQLAlchemy engine
+(aiosqlite, or asyncpg for PostgreSQL), so a request waiting on the database
+no longer holds a worker. They answer exactly like their app.py routes,
+ETag / 304 handling included. Every other route (HTML pages, forms, exports,
+bulk import) is the unchanged Flask app, run in a thread pool by a2wsgi.
+
+Commits made through the Flask routes keep this process's in-process indexes
+current as usual; the async handlers only compare the catalog version and,
+when another process changed it, catch the index up in a thread.
+"""
+from contextlib import asynccontextmanager
+from functools import wraps
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import make_url, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.http import http_date, parse_date, parse_etags
+from app import app as flask_app, database_url
+from models import Project, CatalogVersion, normalize_name
+from cache import CATALOG_VERSION_ID, read_cache
+from db_config import engine_options, configure_engine
+from http_cache import catalog_etag, make_etag, as_utc
+from migrations import ensure_schema
+from search_index import full_text_statement, full_text_results
+from fuzzy_search import (
+    trigram_index, uses_trigram_index, query_words, rows_statement, index_matches,
+    postgres_statements, postgres_matches, fuzzy_results, DEFAULT_THRESHOLD as FUZZY_THRESHOLD
+)
+from autocomplete import autocomplete_index, KINDS as AUTOCOMPLETE_KINDS
+
+
+def async_database_url(url):
+    """The same database through an async driver: aiosqlite or asyncpg"""
+    url = make_url(url)
+    if url.get_backend_name() == 'postgresql':
+        # asyncpg takes ssl=require where libpq takes sslmode=require
+        query = {'ssl' if name == 'sslmode' else name: value for name, value in url.query.items()}
+        return url.set(drivername='postgresql+asyncpg', query=query)
+    return url.set(drivername='sqlite+aiosqlite')
+
+
+engine = create_async_engine(async_database_url(database_url), **engine_options(database_url))
+# SQLite PRAGMAs (WAL etc.) on every new connection, as for the Flask engine
+configure_engine(engine.sync_engine)
+
+
+def _in_app_context(fn):
+    with flask_app.app_context():
+        return fn()
+
+
+def _start_worker():
+    """Schema check and index warm-up, as app.py's first request and gunicorn's post_worker_init
+
+    Returns whether fuzzy search runs on the in-process trigram index.
+    """
+    ensure_schema()
+    flask_app.config['SCHEMA_CHECKED'] = True
+    autocomplete_index.ensure_current()
+    if not uses_trigram_index():
+        return False
+    trigram_index.ensure_current()
+    return True
+
+
+async def _ensure_current(index, version):
+    """index.ensure_current() in a thread, unless the index already reflects `version`"""
+    if index.built and index.version == version:
+        return
+    await run_in_threadpool(_in_app_context, index.ensure_current)
+
+
+# --- Conditional requests (http_cache.py) -----------------------------------
+
+async def _catalog_state(conn):
+    row = (await conn.execute(
+        select(CatalogVersion.version, CatalogVersion.updated_at).where(CatalogVersion.id == CATALOG_VERSION_ID)
+    )).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return parse_etags(if_none_match).contains(etag)
+    since = parse_date(request.headers.get('if-modified-since'))
+    if since and last_modified:
+        return as_utc(last_modified) <= since
+    return False
+
+
+def _set_validators(response, etag, last_modified):
+    response.headers['ETag'] = f'"{etag}"'
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(as_utc(last_modified))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def catalog_conditional(handler):
+    """app.py's @conditional(catalog_validators) for an async handler
+
+    The handler gets the request, an open connection and the catalog version,
+    and returns the JSON body. Tags match the Flask routes', so a client's
+    copy stays valid whichever server answered it.
+    """
+    @wraps(handler)
+    async def endpoint(request):
+        async with engine.connect() as conn:
+            version, updated_at = await _catalog_state(conn)
+            # request.full_path in Flask: the query string changes the body
+            etag = make_etag(catalog_etag(version, updated_at), f'{request.url.path}?{request.url.query}')
+            if _not_modified(request, etag, updated_at):
+                return _set_validators(Response(status_code=304), etag, updated_at)
+            body = await handler(request, conn, version)
+        return _set_validators(JSONResponse(body), etag, updated_at)
+    return endpoint
+
+
+def _arg(request, name, default, type=str):
+    """request.args.get(name, default, type=type)"""
+    try:
+        return type(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+# --- Endpoints ---------------------------------------------------------------
+
+@catalog_conditional
+async def search_projects(request, conn, version):
+    """Async /api/search (typo-tolerant, or mode=fulltext for word matches)"""
+    query = request.query_params.get('q', '').strip()
+
+    if not query:
+        return {'projects': []}
+
+    limit = max(1, min(_arg(request, 'limit', 20, int), 100))
+
+    if request.query_params.get('mode') == 'fulltext':
+        statement = full_text_statement(query, limit, engine.dialect.name)
+        if statement is None:
+            return {'projects': []}
+        return {'projects': full_text_results((await conn.execute(*statement)).mappings())}
+
+    threshold = max(0.1, min(_arg(request, 'threshold', FUZZY_THRESHOLD, float), 1.0))
+    words = query_words(query)
+    if not words:
+        return {'projects': []}
+
+    if request.app.state.trigram_index:
+        await _ensure_current(trigram_index, version)
+        ranked = trigram_index.search(query, threshold=threshold, limit=limit)
+        rows = (await conn.execute(rows_statement([project_id for project_id, _, _ in ranked]))).all() if ranked else []
+        matches = index_matches(ranked, rows)
+    else:
+        *setup, (sql, params) = postgres_statements(words, threshold, limit)
+        for statement in setup:
+            await conn.execute(*statement)
+        matches = postgres_matches(await conn.execute(sql, params))
+
+    return {'projects': fuzzy_results(matches, words, threshold)}
+
+
+@catalog_conditional
+async def autocomplete_terms(request, conn, version):
+    """Async /api/autocomplete (in-process prefix index)"""
+    prefix = request.query_params.get('q', '')
+    limit = max(1, min(_arg(request, 'limit', 8, int), 25))
+    kinds = [kind for kind in request.query_params.getlist('kind') if kind in AUTOCOMPLETE_KINDS]
+
+    await _ensure_current(autocomplete_index, version)
+    return {'completions': autocomplete_index.complete(prefix, limit=limit, kinds=kinds)}
+
+
+@catalog_conditional
+async def suggest_projects(request, conn, version):
+    """Async /api/projects/suggest (prefix match on the normalized name)"""
+    prefix = normalize_name(request.query_params.get('prefix', ''))
+    limit = max(1, min(_arg(request, 'limit', 10, int), 50))
+    exclude = [int(value) for value in request.query_params.getlist('exclude') if value.isdigit()]
+
+    if not prefix:
+        return {'projects': []}
+
+    query = select(Project.id, Project.name).where(
+        Project.name_key >= prefix, Project.name_key < prefix + '\uffff'
+    )
+    if exclude:
+        query = query.where(Project.id.notin_(exclude))
+    rows = await conn.execute(query.order_by(Project.name_key).limit(limit))
+
+    return {'projects': [{'id': row.id, 'name': row.name} for row in rows]}
+
+
+@catalog_conditional
+async def business_verticals(request, conn, version):
+    """Async /api/business-verticals, sharing the Flask routes' read cache"""
+    key = ('verticals', version, None)  # cache.cached('verticals', None, ...)
+    found, verticals = read_cache.lookup(key)
+    if not found:
+        rows = await conn.execute(
+            select(Project.business_vertical).distinct().order_by(Project.business_vertical)
+        )
+        verticals = [vertical for (vertical,) in rows if vertical]
+        read_cache.store(key, verticals)
+
+    return {'verticals': verticals}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.trigram_index = await run_in_threadpool(_in_app_context, _start_worker)
+    yield
+    await engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/search', search_projects),
+        Route('/api/autocomplete', autocomplete_terms),
+        Route('/api/projects/suggest', suggest_projects),
+        Route('/api/business-verticals', business_verticals),
+        # Everything else: the Flask app, in a thread pool
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,197 @@
+"""
+In-process autocomplete index for search-as-you-type
+
+Each worker keeps a sorted array of normalized terms (project names,
+product managers, verticals, tags and stakeholder names) and answers
+prefix lookups with a binary search, so completions never touch the
+database. Every word of a term starts a posting, so "portal" completes
+"Loan Portal".
+
+Kept current the same way as every catalog_index.CatalogIndex.
+"""
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from models import Project, normalize_name
+from catalog_index import CatalogIndex, register_index
+
+KINDS = ['project', 'tag', 'product_manager', 'vertical', 'person']
+KIND_RANK = {kind: rank for rank, kind in enumerate(KINDS)}  # tie-break, lower first
+
+DEFAULT_LIMIT = 8
+MAX_WORDS = 8          # words of a term that start a posting
+MAX_SCAN = 256         # postings ranked per lookup (see PrefixIndex.complete)
+
+
+def project_terms(name, product_manager, business_vertical, tags, stakeholders):
+    """(kind, display text) pairs one project contributes to the index"""
+    terms = [('project', name), ('product_manager', product_manager), ('vertical', business_vertical)]
+    terms.extend(('tag', tag) for tag in tags or [])
+    if isinstance(stakeholders, dict):
+        for members in stakeholders.values():
+            # {"name", "email"} entries, or the legacy plain strings
+            terms.extend(('person', m.get('name') if isinstance(m, dict) else m) for m in members or [])
+    return [(kind, ' '.join(text.split())) for kind, text in terms if isinstance(text, str) and text.strip()]
+
+
+def _word_suffixes(key):
+    """The term itself plus every suffix starting at one of its first MAX_WORDS words"""
+    words = key.split(' ')
+    return [' '.join(words[i:]) for i in range(min(len(words), MAX_WORDS))]
+
+
+def _dedupe(terms):
+    """{(kind, normalized key): display text}, one per term a project lists more than once"""
+    return {(kind, text.casefold()): text for kind, text in terms}
+
+
+class PrefixIndex(CatalogIndex):
+    """Sorted-array prefix index over catalog terms, safe to share between threads
+
+    Postings are plain strings, "<word-start suffix>\\0<entry id>", so the
+    array stays compact and bisect compares them in C. Entries are
+    [kind, normalized key, display text, project count, project id], the id
+    only being kept for project names; each project keeps an array of its
+    entry ids so an update can decrement what it contributed.
+    """
+    columns = [Project.name, Project.product_manager, Project.business_vertical, Project.tags, Project.stakeholders]
+
+    def __init__(self):
+        super().__init__()
+        self._postings = []
+        self._entries = {}                              # entry id -> entry
+        self._entry_ids = {kind: {} for kind in KINDS}  # kind -> normalized key -> entry id
+        self._next_id = 0                               # self._projects: project id -> array of entry ids
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- Loading ----------------------------------------------------------------
+
+    def _load(self, rows):
+        entries = {}
+        entry_ids = {kind: {} for kind in KINDS}
+        projects = {}
+        for project_id, *fields in rows:
+            own = []
+            for (kind, key), text in _dedupe(project_terms(*fields)).items():
+                by_key = entry_ids[kind]
+                entry_id = by_key.get(key)
+                if entry_id is None:
+                    entry_id = by_key[key] = len(entries)
+                    entries[entry_id] = [kind, key, text, 1, project_id]
+                else:
+                    entries[entry_id][3] += 1
+                own.append(entry_id)
+            projects[project_id] = array('l', own)
+        postings = sorted(
+            f'{suffix}\0{entry_id}' for entry_id, entry in entries.items() for suffix in _word_suffixes(entry[1])
+        )
+        with self._lock:
+            self._postings, self._entries, self._entry_ids, self._projects = postings, entries, entry_ids, projects
+            self._next_id = len(entries)
+
+    # --- Incremental updates -------------------------------------------------
+
+    def _add_term(self, project_id, kind, key, text):
+        entry_id = self._entry_ids[kind].get(key)
+        if entry_id is None:
+            entry_id = self._entry_ids[kind][key] = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = [kind, key, text, 1, project_id]
+            for suffix in _word_suffixes(key):
+                insort(self._postings, f'{suffix}\0{entry_id}')
+        else:
+            entry = self._entries[entry_id]
+            entry[3] += 1
+            if entry[4] is None:
+                entry[4] = project_id
+        return entry_id
+
+    def _remove_project(self, project_id):
+        for entry_id in self._projects.pop(project_id, ()):
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            entry[3] -= 1
+            if entry[4] == project_id:
+                entry[4] = None  # another project with the same name, if any, loses its link
+            if entry[3] > 0:
+                continue
+            kind, key = entry[0], entry[1]
+            del self._entries[entry_id]
+            del self._entry_ids[kind][key]
+            for suffix in _word_suffixes(key):
+                posting = f'{suffix}\0{entry_id}'
+                i = bisect_left(self._postings, posting)
+                if i < len(self._postings) and self._postings[i] == posting:
+                    del self._postings[i]
+
+    def _set_project(self, project_id, fields):
+        self._remove_project(project_id)
+        self._projects[project_id] = array('l', (
+            self._add_term(project_id, kind, key, text)
+            for (kind, key), text in _dedupe(project_terms(*fields)).items()
+        ))
+
+    # --- Lookups -------------------------------------------------------------
+
+    def complete(self, prefix, limit=DEFAULT_LIMIT, kinds=None):
+        """Ranked completions: exact matches, then term starts, then by project count
+
+        At most MAX_SCAN postings are ranked, taken in key order from the
+        prefix on; only one- or two-letter prefixes in a large catalog match
+        more than that, and their results are memoized until the next change.
+        """
+        needle = normalize_name(prefix)
+        if not needle:
+            return []
+        kinds = frozenset(kinds) if kinds else None
+        return self.memoized((needle, limit, kinds), lambda: self._complete(needle, limit, kinds))
+
+    def _complete(self, needle, limit, kinds):
+        postings = self._postings
+        entries = self._entries
+        lo = bisect_left(postings, needle)
+        hi = min(bisect_left(postings, needle + '\uffff', lo), lo + MAX_SCAN)
+        # score: exact match, matched at the start of the term, project count,
+        # kind, shorter first; the entry id last so tuples never tie
+        scored = {}
+        for i in range(lo, hi):
+            suffix, _, entry_id = postings[i].rpartition('\0')
+            entry_id = int(entry_id)
+            kind, key, text, count, project_id = entries[entry_id]
+            if kinds and kind not in kinds:
+                continue
+            score = (key == needle, suffix == key, count, -KIND_RANK[kind], -len(key), entry_id)
+            if score > scored.get(entry_id, ()):
+                scored[entry_id] = score
+
+        results = []
+        for score in heapq.nlargest(limit, scored.values()):
+            kind, key, text, count, project_id = entries[score[-1]]
+            result = {'text': text, 'kind': kind, 'count': count}
+            if kind == 'project' and project_id is not None:
+                result['project_id'] = project_id
+            results.append(result)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                'built': self.built,
+                'version': self.version,
+                'projects': len(self._projects),
+                'entries': len(self._entries),
+                'postings': len(self._postings),
+                'memoized_lookups': len(self._results),
+            }
+
+
+autocomplete_index = register_index(PrefixIndex())
+
+
+def autocomplete(prefix, limit=DEFAULT_LIMIT, kinds=None):
+    """Completions from this worker's index, brought up to date first"""
+    autocomplete_index.ensure_current()
+    return autocomplete_index.complete(prefix, limit=limit, kinds=kinds)
@@ -1,62 +1,226 @@
 #!/usr/bin/env python3
 """
-Backup script for SQLite database
-Creates timestamped backups and exports to JSON
+Backup script for the projects database
+Takes online, consistent backups while the app keeps serving:
+- SQLite: sqlite3 backup API in small page steps (writers are only blocked
+  for one step at a time; WAL contents are included), then
+  PRAGMA integrity_check on the copy
+- PostgreSQL: COPY export of every table inside one REPEATABLE READ
+  snapshot (pg_dump-style, no pg_dump binary needed)
+- Both: a streaming NDJSON export for portability and a manifest with row
+  counts and checksums
+
+Full backups are the daily safety net; frequent incremental backups go
+through backup_store.py, which only stores what changed.
+
+Usage:
+    python backup_database.py [--backup-dir backups] [--pages 256] [--sleep 0.005]
 """
+import argparse
+import gzip
+import hashlib
+import json
 import os
 import shutil
-import json
+import sqlite3
+import time
 from datetime import datetime
-from app_sqlite import app, Project
+from app import app, db
+from export_projects import iter_export_lines
+
+# Tables copied by the PostgreSQL path, parents first
+TABLES = [
+    'projects', 'tags', 'project_tags', 'people', 'project_stakeholders',
+    'project_relations', 'project_tombstones', 'catalog_version', 'restore_log'
+]
+
+KEEP_FULL_BACKUPS = 30
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def open_read_only(path):
+    """Connect to a finished backup file without creating -wal / -shm files next to it"""
+    return sqlite3.connect(f'file:{path}?mode=ro&immutable=1', uri=True)
+
+def integrity_check(path):
+    """Run PRAGMA integrity_check on a SQLite file; returns 'ok' or the problems"""
+    conn = open_read_only(path)
+    try:
+        rows = conn.execute('PRAGMA integrity_check').fetchall()
+    finally:
+        conn.close()
+    return '; '.join(row[0] for row in rows)
+
+def backup_sqlite(db_path, dest_path, pages=256, sleep=0.005):
+    """Copy a live SQLite database with the online backup API
+
+    Each step copies `pages` pages and then releases the lock for `sleep`
+    seconds so writers can get in. The copy is written to a temporary file
+    and only renamed into place once it passes integrity_check.
+    """
+    tmp_path = dest_path + '.partial'
+    started = time.perf_counter()
+    steps = 0
+
+    def progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(tmp_path)
+    try:
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+        # The copy inherits the live database's WAL mode; a backup is one
+        # self-contained file, so switch it back before closing
+        target.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        target.close()
+        source.close()
+
+    check = integrity_check(tmp_path)
+    if check != 'ok':
+        os.remove(tmp_path)
+        raise RuntimeError(f'Backup failed integrity_check: {check}')
+    os.replace(tmp_path, dest_path)
+
+    conn = open_read_only(dest_path)
+    try:
+        counts = {
+            name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+                "AND name NOT LIKE 'projects_fts%'"
+            ).fetchall()
+        }
+    finally:
+        conn.close()
+
+    return {
+        'file': os.path.basename(dest_path),
+        'sha256': file_sha256(dest_path),
+        'bytes': os.path.getsize(dest_path),
+        'steps': steps,
+        'seconds': round(time.perf_counter() - started, 3),
+        'integrity_check': check,
+        'row_counts': counts,
+    }
+
+def backup_postgres(dest_dir):
+    """COPY every table to gzip'd CSV from one consistent snapshot"""
+    os.makedirs(dest_dir, exist_ok=True)
+    started = time.perf_counter()
+    files = {}
+    counts = {}
+
+    # psycopg2 opens its transaction implicitly, so the snapshot has to be set
+    # as connection characteristics (reset when the connection goes back to the pool)
+    options = {'isolation_level': 'REPEATABLE READ', 'postgresql_readonly': True}
+    with db.engine.connect().execution_options(**options) as conn, conn.begin():
+        cursor = conn.connection.dbapi_connection.cursor()
+        for table in TABLES:
+            path = os.path.join(dest_dir, f'{table}.csv.gz')
+            with gzip.open(path, 'wb') as out:
+                cursor.copy_expert(f'COPY {table} TO STDOUT WITH (FORMAT csv, HEADER true)', out)
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+            counts[table] = cursor.fetchone()[0]
+            files[table] = {'file': os.path.basename(path), 'sha256': file_sha256(path)}
+
+    return {
+        'dir': os.path.basename(dest_dir),
+        'files': files,
+        'seconds': round(time.perf_counter() - started, 3),
+        'row_counts': counts,
+    }
+
+def export_ndjson(dest_path):
+    """Portable NDJSON export (streamed; constant memory)"""
+    count = 0
+    with gzip.open(dest_path, 'wt', encoding='utf-8') as out:
+        for line in iter_export_lines():
+            out.write(line)
+            count += 1
+    return {'file': os.path.basename(dest_path), 'sha256': file_sha256(dest_path), 'projects': count}
+
+def backup_database(backup_dir='backups', pages=256, sleep=0.005):
+    """Create a consistent backup of the projects database"""
 
-def backup_database():
-    """Create backup of SQLite database"""
-    
     # Create backups directory
-    backup_dir = 'backups'
     os.makedirs(backup_dir, exist_ok=True)
-    
+
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # 1. Backup SQLite file
-    db_file = 'projects.db'
-    if os.path.exists(db_file):
-        backup_db = os.path.join(backup_dir, f'projects_{timestamp}.db')
-        shutil.copy(db_file, backup_db)
-        print(f"✅ Database backed up to: {backup_db}")
-        db_size = os.path.getsize(backup_db) / 1024  # KB
-        print(f"   Size: {db_size:.2f} KB")
-    else:
-        print("⚠️  No database file found to backup")
-    
-    # 2. Export to JSON (for portability)
+    manifest = {'timestamp': timestamp, 'created_at': datetime.utcnow().isoformat()}
+
     with app.app_context():
-        projects = Project.query.all()
-        projects_data = [p.to_dict() for p in projects]
-        
-        json_backup = os.path.join(backup_dir, f'projects_{timestamp}.json')
-        with open(json_backup, 'w') as f:
-            json.dump(projects_data, f, indent=2)
-        
-        print(f"✅ JSON export created: {json_backup}")
-        print(f"   Projects: {len(projects_data)}")
-    
-    # 3. Clean old backups (keep last 30)
-    all_backups = sorted([f for f in os.listdir(backup_dir) if f.startswith('projects_')])
-    if len(all_backups) > 30:
-        for old_backup in all_backups[:-30]:
-            os.remove(os.path.join(backup_dir, old_backup))
-        print(f"🗑️  Cleaned {len(all_backups) - 30} old backups")
-    
-    print(f"\n💾 Backup complete! Total backups: {min(len(all_backups), 30)}")
+        dialect = db.engine.dialect.name
+        manifest['dialect'] = dialect
+
+        # 1. Consistent database copy
+        if dialect == 'sqlite':
+            db_file = db.engine.url.database
+            if db_file and os.path.exists(db_file):
+                backup_db = os.path.join(backup_dir, f'projects_{timestamp}.db')
+                manifest['database'] = backup_sqlite(db_file, backup_db, pages=pages, sleep=sleep)
+                info = manifest['database']
+                print(f"✅ Database backed up to: {backup_db}")
+                print(f"   Size: {info['bytes'] / 1024:.2f} KB in {info['steps']} steps ({info['seconds']}s)")
+                print(f"   Integrity check: {info['integrity_check']}")
+            else:
+                print("⚠️  No database file found to backup")
+        elif dialect == 'postgresql':
+            copy_dir = os.path.join(backup_dir, f'projects_{timestamp}.pgcopy')
+            manifest['database'] = backup_postgres(copy_dir)
+            print(f"✅ COPY export written to: {copy_dir}")
+            print(f"   Tables: {len(manifest['database']['files'])} ({manifest['database']['seconds']}s)")
+
+        # 2. Export to NDJSON (for portability)
+        json_backup = os.path.join(backup_dir, f'projects_{timestamp}.ndjson.gz')
+        manifest['export'] = export_ndjson(json_backup)
+        print(f"✅ NDJSON export created: {json_backup}")
+        print(f"   Projects: {manifest['export']['projects']}")
+
+    manifest_path = os.path.join(backup_dir, f'projects_{timestamp}.manifest.json')
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"📄 Manifest: {manifest_path}")
+
+    # 3. Clean old backups (keep the last KEEP_FULL_BACKUPS runs). Files are
+    # grouped by run, so the .db/.pgcopy, export and manifest of one run count once
+    runs = {}
+    for name in os.listdir(backup_dir):
+        if name.startswith('projects_'):
+            runs.setdefault(name.split('.')[0], []).append(name)
+    expired = sorted(runs)[:-KEEP_FULL_BACKUPS]
+    for run in expired:
+        for name in runs[run]:
+            path = os.path.join(backup_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+    if expired:
+        print(f"🗑️  Cleaned {len(expired)} old backups")
+
+    print(f"\n💾 Backup complete! Total backups: {len(runs) - len(expired)}")
+    return manifest
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Online, consistent database backup')
+    parser.add_argument('--backup-dir', default='backups')
+    parser.add_argument('--pages', type=int, default=256, help='SQLite pages copied per step')
+    parser.add_argument('--sleep', type=float, default=0.005, help='seconds writers get between steps')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Cars24 Product Portal - Database Backup")
     print("=" * 60)
     print()
-    
-    backup_database()
-    
+
+    backup_database(args.backup_dir, pages=args.pages, sleep=args.sleep)
+
     print()
     print("=" * 60)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Incremental, content-addressed backup store
+
+Each project is stored as one gzip'd canonical-JSON record named by its
+sha256, so an unchanged project is never written twice. A snapshot manifest
+maps project ids to record hashes through fixed-size id-range chunks, which
+are content-addressed objects as well: a snapshot only writes the records
+that changed plus the chunks that contain them.
+
+Changes are found with a watermark on updated_at (with a small overlap so
+late-committing transactions are not missed) and deletes through the
+project_tombstones table. A restore logged after the parent snapshot (a newer
+restore_log id) forces a full one, since restored projects keep their old
+updated_at.
+Retention is tiered hourly / daily / weekly, unreferenced objects are
+garbage-collected, and tombstones the next snapshot no longer needs are
+deleted.
+
+Layout:
+    <store>/objects/ab/cdef...   gzip'd records and id-range chunks
+    <store>/snapshots/<id>.json  snapshot manifests
+
+Usage:
+    python backup_store.py snapshot [--store backups/store]
+    python backup_store.py list
+    python backup_store.py prune [--keep-hourly 24] [--keep-daily 7] [--keep-weekly 8] [--dry-run]
+"""
+import argparse
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from models import db, Project, ProjectTombstone, RestoreLog
+from export_projects import EXPORT_FIELDS, STREAM_BATCH_SIZE
+
+DEFAULT_STORE = os.path.join('backups', 'store')
+CHUNK_SIZE = 256  # project ids per index chunk (~20 KB of hashes)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+SNAPSHOT_ID_FORMAT = '%Y%m%dT%H%M%SZ'
+
+KEEP_HOURLY = 24
+KEEP_DAILY = 7
+KEEP_WEEKLY = 8
+# Catalog indexes catch up from tombstones as well; one that is further
+# behind than this finds the project count off and rebuilds
+TOMBSTONE_MIN_AGE = timedelta(days=7)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def canonical_json(value):
+    """Stable encoding so equal content always hashes the same"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'),
+                      default=_json_default, ensure_ascii=False).encode('utf-8')
+
+
+class BackupStore:
+    """Object and manifest storage on the local filesystem"""
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.snapshots_dir = os.path.join(root, 'snapshots')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    @contextmanager
+    def lock(self):
+        """Exclusive lock so snapshot and prune never interleave"""
+        with open(os.path.join(self.root, 'lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put(self, data):
+        """Store bytes; returns (digest, compressed bytes written or 0 if already present)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = gzip.compress(data, mtime=0)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return digest, len(compressed)
+
+    def get(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            data = gzip.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f'Object {digest} is corrupt')
+        return data
+
+    def get_json(self, digest):
+        return json.loads(self.get(digest))
+
+    def iter_objects(self):
+        for prefix in os.listdir(self.objects_dir):
+            directory = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(directory):
+                if not name.endswith('.tmp'):
+                    yield prefix + name
+
+    def snapshot_ids(self):
+        """Snapshot ids, oldest first"""
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith('.json'))
+
+    def load_manifest(self, snapshot_id):
+        with open(os.path.join(self.snapshots_dir, f'{snapshot_id}.json')) as f:
+            return json.load(f)
+
+    def latest_manifest(self):
+        ids = self.snapshot_ids()
+        return self.load_manifest(ids[-1]) if ids else None
+
+    def write_manifest(self, manifest):
+        path = os.path.join(self.snapshots_dir, f"{manifest['id']}.json")
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def delete_manifest(self, snapshot_id):
+        os.remove(os.path.join(self.snapshots_dir, f'{snapshot_id}.json'))
+
+
+def _new_snapshot_id(store, now):
+    snapshot_id = now.strftime(SNAPSHOT_ID_FORMAT)
+    existing = set(store.snapshot_ids())
+    suffix = 1
+    candidate = snapshot_id
+    while candidate in existing:
+        candidate = f'{snapshot_id}-{suffix}'
+        suffix += 1
+    return candidate
+
+
+def take_snapshot(store):
+    """Write an incremental snapshot of the projects table; returns its manifest
+
+    Must run inside an app context.
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    parent = store.latest_manifest()
+    since = datetime.fromisoformat(parent['watermark']) - WATERMARK_OVERLAP if parent else None
+    # Read before the projects: a restore committing in between only makes
+    # the next snapshot a full one as well
+    restore_id = RestoreLog.latest_id()
+    if parent and parent.get('restore_id', 0) != restore_id:
+        parent, since = None, None
+
+    parent_chunks = parent['chunks'] if parent else {}
+    chunks = {}  # chunk key -> {project id (str): record hash}, only for touched chunks
+    stats = {'changed': 0, 'deleted': 0, 'new_objects': 0, 'new_bytes': 0}
+
+    def chunk_for(project_id):
+        key = str(project_id // CHUNK_SIZE)
+        if key not in chunks:
+            chunks[key] = store.get_json(parent_chunks[key]['hash']) if key in parent_chunks else {}
+        return chunks[key]
+
+    # Deletes first: a deleted id that was re-created shows up again below
+    if since is not None:
+        tombstones = (
+            db.session.query(ProjectTombstone.project_id)
+            .filter(ProjectTombstone.deleted_at >= since)
+            .distinct()
+        )
+        for (project_id,) in tombstones:
+            if chunk_for(project_id).pop(str(project_id), None) is not None:
+                stats['deleted'] += 1
+
+    stmt = db.select(*[getattr(Project, f) for f in EXPORT_FIELDS]).order_by(Project.id)
+    if since is not None:
+        stmt = stmt.where(Project.updated_at >= since)
+    for row in db.session.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)):
+        record = dict(zip(EXPORT_FIELDS, row))
+        digest, written = store.put(canonical_json(record))
+        chunk = chunk_for(record['id'])
+        if chunk.get(str(record['id'])) != digest:
+            chunk[str(record['id'])] = digest
+            stats['changed'] += 1
+        if written:
+            stats['new_objects'] += 1
+            stats['new_bytes'] += written
+
+    # Untouched chunks are carried over from the parent by hash
+    manifest_chunks = dict(parent_chunks)
+    for key, entries in chunks.items():
+        if not entries:
+            manifest_chunks.pop(key, None)
+            continue
+        digest, written = store.put(canonical_json(entries))
+        manifest_chunks[key] = {'hash': digest, 'count': len(entries)}
+        if written:
+            stats['new_objects'] += 1
+            stats['new_bytes'] += written
+
+    manifest = {
+        'id': _new_snapshot_id(store, now),
+        'created_at': now.isoformat(),
+        'parent': parent['id'] if parent else None,
+        'watermark': now.isoformat(),
+        'restore_id': restore_id,
+        'chunk_size': CHUNK_SIZE,
+        'chunks': dict(sorted(manifest_chunks.items(), key=lambda item: int(item[0]))),
+        'projects': sum(chunk['count'] for chunk in manifest_chunks.values()),
+        'stats': dict(stats, seconds=round(time.perf_counter() - started, 3)),
+    }
+    store.write_manifest(manifest)
+    return manifest
+
+
+def iter_snapshot_records(store, manifest):
+    """Yield the project records of a snapshot, in id order"""
+    for key in sorted(manifest['chunks'], key=int):
+        entries = store.get_json(manifest['chunks'][key]['hash'])
+        for project_id in sorted(entries, key=int):
+            yield store.get_json(entries[project_id])
+
+
+def select_retained(snapshot_ids, keep_hourly=KEEP_HOURLY, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY):
+    """Snapshot ids kept by tiered retention
+
+    For each tier the newest snapshot of each of the most recent N periods
+    (hours, days, ISO weeks) that have snapshots is kept. The newest snapshot
+    is always kept since the next incremental run builds on it.
+    """
+    if not snapshot_ids:
+        return set()
+    newest_first = sorted(snapshot_ids, reverse=True)
+    keep = {newest_first[0]}
+    tiers = [
+        (keep_hourly, lambda t: t.strftime('%Y%m%d%H')),
+        (keep_daily, lambda t: t.strftime('%Y%m%d')),
+        (keep_weekly, lambda t: '%d-%02d' % t.isocalendar()[:2]),
+    ]
+    for limit, period in tiers:
+        seen = set()
+        for snapshot_id in newest_first:
+            if len(seen) >= limit:
+                break
+            bucket = period(datetime.strptime(snapshot_id[:16], SNAPSHOT_ID_FORMAT))
+            if bucket not in seen:
+                seen.add(bucket)
+                keep.add(snapshot_id)
+    return keep
+
+
+def prune(store, keep_hourly=KEEP_HOURLY, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY, dry_run=False):
+    """Apply retention, then delete objects no kept snapshot references"""
+    snapshot_ids = store.snapshot_ids()
+    keep = select_retained(snapshot_ids, keep_hourly, keep_daily, keep_weekly)
+    expired = [s for s in snapshot_ids if s not in keep]
+
+    # Mark: every chunk of a kept snapshot and every record those chunks name
+    reachable = set()
+    for snapshot_id in keep:
+        for chunk in store.load_manifest(snapshot_id)['chunks'].values():
+            if chunk['hash'] in reachable:
+                continue
+            reachable.add(chunk['hash'])
+            reachable.update(store.get_json(chunk['hash']).values())
+
+    # Sweep
+    garbage = [digest for digest in store.iter_objects() if digest not in reachable]
+    freed = 0
+    for digest in garbage:
+        path = store.object_path(digest)
+        freed += os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+    if not dry_run:
+        for snapshot_id in expired:
+            store.delete_manifest(snapshot_id)
+
+    return {
+        'kept': len(keep),
+        'expired': expired,
+        'deleted_objects': len(garbage),
+        'freed_bytes': freed,
+        'dry_run': dry_run,
+    }
+
+
+def prune_tombstones(store, dry_run=False):
+    """Delete tombstones older than both the next snapshot's watermark and TOMBSTONE_MIN_AGE
+
+    Must run inside an app context; returns (count, cutoff).
+    """
+    cutoff = datetime.utcnow() - TOMBSTONE_MIN_AGE
+    latest = store.latest_manifest()
+    if latest:
+        cutoff = min(cutoff, datetime.fromisoformat(latest['watermark']) - WATERMARK_OVERLAP)
+    expired = db.session.query(ProjectTombstone).filter(ProjectTombstone.deleted_at < cutoff)
+    if dry_run:
+        return expired.count(), cutoff
+    count = expired.delete(synchronize_session=False)
+    db.session.commit()
+    return count, cutoff
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental, deduplicated project backups')
+    parser.add_argument('command', choices=['snapshot', 'list', 'prune'])
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--keep-hourly', type=int, default=KEEP_HOURLY)
+    parser.add_argument('--keep-daily', type=int, default=KEEP_DAILY)
+    parser.add_argument('--keep-weekly', type=int, default=KEEP_WEEKLY)
+    parser.add_argument('--no-prune', action='store_true', help='snapshot without applying retention')
+    parser.add_argument('--dry-run', action='store_true', help='prune: only report what would be deleted')
+    args = parser.parse_args()
+
+    store = BackupStore(args.store)
+    retention = dict(keep_hourly=args.keep_hourly, keep_daily=args.keep_daily, keep_weekly=args.keep_weekly)
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Incremental Backup Store")
+    print("=" * 60)
+    print()
+
+    if args.command == 'list':
+        for snapshot_id in store.snapshot_ids():
+            manifest = store.load_manifest(snapshot_id)
+            stats = manifest['stats']
+            print(f"  {snapshot_id}  {manifest['projects']:>7} projects  "
+                  f"+{stats['changed']} -{stats['deleted']}  {stats['new_bytes'] / 1024:.1f} KB new")
+        return
+
+    from app import app
+    with store.lock(), app.app_context():
+        if args.command == 'snapshot':
+            manifest = take_snapshot(store)
+            stats = manifest['stats']
+            print(f"✅ Snapshot {manifest['id']} ({'incremental' if manifest['parent'] else 'full'})")
+            print(f"   Projects: {manifest['projects']} (changed {stats['changed']}, deleted {stats['deleted']})")
+            print(f"   New objects: {stats['new_objects']} ({stats['new_bytes'] / 1024:.1f} KB) in {stats['seconds']}s")
+            if args.no_prune:
+                return
+
+        result = prune(store, dry_run=args.dry_run, **retention)
+        verb = 'Would delete' if args.dry_run else 'Deleted'
+        print(f"🗑️  {verb} {len(result['expired'])} snapshots and {result['deleted_objects']} objects "
+              f"({result['freed_bytes'] / 1024:.1f} KB); keeping {result['kept']} snapshots")
+        tombstones, cutoff = prune_tombstones(store, dry_run=args.dry_run)
+        print(f"🗑️  {verb} {tombstones} project tombstones older than {cutoff:%Y-%m-%d %H:%M}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Memory and latency of the in-process autocomplete index
+
+Loads synthetic projects (no database needed) into autocomplete.PrefixIndex
+and reports its memory use (tracemalloc, scaled to 100k entries), build
+time, lookup latency for 1-4 character prefixes (first lookup and memoized)
+and the cost of an incremental update after a commit.
+
+Usage:
+    python benchmarks/bench_autocomplete.py [--projects 20000 50000 100000]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autocomplete import PrefixIndex
+
+WORDS = [
+    'loan', 'portal', 'pricing', 'inspection', 'dealer', 'auction', 'finance', 'warranty', 'insurance',
+    'lead', 'router', 'checkout', 'payments', 'kyc', 'onboarding', 'catalog', 'search', 'ranking',
+    'service', 'booking', 'delivery', 'tracking', 'refurb', 'challan', 'rc', 'transfer', 'valuation',
+    'calculator', 'dashboard', 'alerts', 'partner', 'app', 'hub', 'engine', 'api', 'tool', 'console',
+]
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Neha', 'Arjun', 'Kavya', 'Ishaan', 'Meera',
+               'Kabir', 'Diya', 'Aditya', 'Sara', 'Rahul', 'Pooja', 'Nikhil', 'Tanvi', 'Karan', 'Riya']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Singh', 'Kumar', 'Mehta', 'Iyer', 'Nair', 'Reddy', 'Shah',
+              'Jain', 'Bose', 'Das', 'Kapoor', 'Malhotra', 'Chopra', 'Rao', 'Pillai', 'Joshi', 'Bhat']
+VERTICALS = ['VAS', 'A2I', 'I2P', 'Finance', 'Supply', 'Platform']
+
+
+# ~8000 distinct people, shared across projects
+PEOPLE = [f'{first} {middle[0]}. {last}' for first in FIRST_NAMES for middle in FIRST_NAMES for last in LAST_NAMES]
+
+
+def person(rng):
+    return rng.choice(PEOPLE)
+
+
+def synthetic_rows(count, seed=1):
+    rng = random.Random(seed)
+    tags = [f'{w.title()} {i}' for i, w in enumerate(WORDS * 8)]
+    for i in range(1, count + 1):
+        name = ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 4))) + f' {i}'
+        stakeholders = {
+            role: [{'name': person(rng), 'email': ''} for _ in range(rng.randint(1, 3))]
+            for role in ('business', 'product', 'design', 'engineering')
+        }
+        yield (i, name, person(rng), rng.choice(VERTICALS), rng.sample(tags, rng.randint(1, 4)), stakeholders)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def bench(count):
+    rows = list(synthetic_rows(count))
+    started = time.perf_counter()
+    index = PrefixIndex()
+    index.load(rows)
+    build_seconds = time.perf_counter() - started
+    stats = index.stats()
+
+    # Memory in a second load, since tracing slows the build down
+    del index
+    gc.collect()
+    tracemalloc.start()
+    index = PrefixIndex()
+    index.load(rows)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = random.Random(2)
+    prefixes = {n: [rng.choice(WORDS)[:n] for _ in range(200)] for n in (1, 2, 3, 4)}
+    lookups = {}
+    for n, sample in prefixes.items():
+        cold = []
+        for prefix in sample:
+            index._results = {}
+            cold.extend(timed(lambda: index.complete(prefix), 1))
+        warm = timed(lambda: index.complete(sample[0]), 200)
+        lookups[n] = (statistics.median(cold), statistics.median(warm))
+
+    # A commit that renames one project: remove + re-add its terms
+    updates = timed(lambda: index.apply({
+        rng.randint(1, count): (f'Renamed {rng.random()}', 'New PM', 'VAS', ['Mobile'], {})
+    }), 200)
+
+    print(f"\n📦 {count} projects: {stats['entries']} entries, {stats['postings']} postings, "
+          f"built in {build_seconds:.2f}s")
+    print(f"   Memory: {size / 1e6:.1f} MB total, {size / stats['entries'] * 100_000 / 1e6:.1f} MB per 100k entries "
+          f"({size / count * 100_000 / 1e6:.1f} MB per 100k projects)")
+    for n, (cold, warm) in lookups.items():
+        print(f"   {n}-char prefix: {cold:8.1f} µs first lookup, {warm:6.1f} µs memoized (median)")
+    print(f"   Incremental update: {statistics.median(updates):.1f} µs median")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the autocomplete prefix index')
+    parser.add_argument('--projects', type=int, nargs='+', default=[20000, 50000, 100000])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Autocomplete Index Benchmark")
+    print("=" * 60)
+    for count in args.projects:
+        bench(count)
+    print()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
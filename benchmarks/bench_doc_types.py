@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for document type classification
+
+Compares the old per-render if/elif chain against the matcher registry
+(uncached), the LRU-cached fast path used for legacy rows, and reading the
+type stored on the doc entry at write time.
+
+Usage:
+    python benchmarks/bench_doc_types.py [--docs 2000] [--renders 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from doc_types import annotate_docs, classify_url, get_document_embed_info, _classify
+
+def legacy_embed_info(url):
+    """The if/elif chain the doc_embed filter used to run on every render"""
+    if not url:
+        return {'type': 'link', 'embed_url': None}
+    if 'docs.google.com/document' in url:
+        doc_id = url.split('/d/')[1].split('/')[0] if '/d/' in url else None
+        if doc_id:
+            return {'type': 'google_doc', 'embed_url': f'https://docs.google.com/document/d/{doc_id}/preview', 'icon': 'google-doc'}
+    elif 'docs.google.com/spreadsheets' in url:
+        doc_id = url.split('/d/')[1].split('/')[0] if '/d/' in url else None
+        if doc_id:
+            return {'type': 'google_sheet', 'embed_url': f'https://docs.google.com/spreadsheets/d/{doc_id}/preview', 'icon': 'google-sheet'}
+    elif 'figma.com' in url:
+        return {'type': 'figma', 'embed_url': f'https://www.figma.com/embed?embed_host=share&url={url}', 'icon': 'figma'}
+    elif 'notion.so' in url or 'notion.site' in url:
+        return {'type': 'notion', 'embed_url': url, 'icon': 'notion'}
+    return {'type': 'link', 'embed_url': None, 'icon': 'link'}
+
+def sample_docs(count):
+    rng = random.Random(7)
+    templates = [
+        'https://docs.google.com/document/d/{}/edit',
+        'https://docs.google.com/spreadsheets/d/{}/edit#gid=0',
+        'https://docs.google.com/presentation/d/{}/edit',
+        'https://www.figma.com/file/{}/Checkout-Flow',
+        'https://www.notion.so/cars24/Spec-{}',
+        'https://miro.com/app/board/{}=/',
+        'https://lookerstudio.google.com/reporting/{}',
+        'https://confluence.cars24.team/pages/{}',
+    ]
+    return [
+        {'name': f'Doc {i}', 'url': rng.choice(templates).format(f'{rng.getrandbits(64):x}')}
+        for i in range(count)
+    ]
+
+def timed(label, fn, docs, renders):
+    started = time.perf_counter()
+    for _ in range(renders):
+        for doc in docs:
+            fn(doc)
+    elapsed = time.perf_counter() - started
+    calls = len(docs) * renders
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms   {elapsed / calls * 1e9:7.0f} ns/doc")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark document type classification')
+    parser.add_argument('--docs', type=int, default=2000, help='distinct documents')
+    parser.add_argument('--renders', type=int, default=50, help='times every document is rendered')
+    args = parser.parse_args()
+
+    docs = sample_docs(args.docs)
+    stored = annotate_docs(docs)
+
+    print(f"📄 {args.docs} documents x {args.renders} renders")
+    baseline = timed('legacy if/elif chain', lambda d: legacy_embed_info(d['url']), docs, args.renders)
+    timed('registry, uncached', lambda d: _classify.__wrapped__(d['url']), docs, args.renders)
+    _classify.cache_clear()
+    cached = timed('registry, lru_cache (legacy)', lambda d: classify_url(d['url']), docs, args.renders)
+    precomputed = timed('stored at write time', get_document_embed_info, stored, args.renders)
+    print(f"\n⚡ lru_cache: {baseline / cached:.1f}x   stored: {baseline / precomputed:.1f}x vs legacy")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Read/write throughput with and without the database performance profile
+
+Seeds a throwaway SQLite database (or uses --database-url), then runs a mixed
+workload from several worker processes, like gunicorn workers: mostly
+landing-page reads (keyset page of cards) and project lookups, plus updates
+that commit. Each run reports reads/s, writes/s and failed operations
+("database is locked" and pool timeouts).
+
+Usage:
+    python benchmarks/bench_engine_profile.py [--workers 4] [--threads 2] [--seconds 5]
+    python benchmarks/bench_engine_profile.py --database-url postgresql://... --threads 8
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, select, update, insert
+from models import db, Project
+from db_config import engine_options, configure_engine
+
+projects = Project.__table__
+
+def make_engine(url, enabled):
+    engine = create_engine(url, **engine_options(url, enabled=enabled))
+    configure_engine(engine, enabled=enabled)
+    return engine
+
+def seed(url, count):
+    engine = create_engine(url)
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    rng = random.Random(1)
+    rows = [{
+        'name': f'Bench project {i:06d}',
+        'summary': 'vehicle pricing inspection loan dealer portal ' * 8,
+        'business_vertical': rng.choice(['VAS', 'A2I', 'I2P', 'Finance']),
+        'product_manager': f'PM {i % 100}',
+        'stakeholders': {}, 'core_docs': [], 'design_docs': [], 'analytics_docs': [], 'other_docs': [],
+        'tags': ['Mobile'], 'related_projects': [],
+        'created_at': now, 'updated_at': now,
+    } for i in range(count)]
+    with engine.begin() as conn:
+        conn.execute(insert(projects), rows)
+    engine.dispose()
+
+def worker(url, enabled, threads, seconds, write_ratio, count, results):
+    engine = make_engine(url, enabled)
+    totals = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def run(seed_value):
+        rng = random.Random(seed_value)
+        reads = writes = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                if rng.random() < write_ratio:
+                    with engine.begin() as conn:
+                        conn.execute(
+                            update(projects)
+                            .where(projects.c.id == rng.randint(1, count))
+                            .values(summary=f'updated {rng.random()}', updated_at=datetime.utcnow())
+                        )
+                    writes += 1
+                else:
+                    with engine.connect() as conn:
+                        conn.execute(
+                            select(projects.c.id, projects.c.name, projects.c.summary, projects.c.updated_at)
+                            .order_by(projects.c.updated_at.desc(), projects.c.id.desc())
+                            .limit(24)
+                        ).all()
+                        conn.execute(select(projects).where(projects.c.id == rng.randint(1, count))).first()
+                    reads += 1
+            except Exception:
+                errors += 1
+        with lock:
+            totals['reads'] += reads
+            totals['writes'] += writes
+            totals['errors'] += errors
+
+    pool = [threading.Thread(target=run, args=(os.getpid() * 100 + i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    engine.dispose()
+    results.put(totals)
+
+def run_profile(url, enabled, args):
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=worker, args=(url, enabled, args.threads, args.seconds,
+                                                     args.write_ratio, args.projects, results))
+        for _ in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    totals = {'reads': 0, 'writes': 0, 'errors': 0}
+    for _ in procs:
+        for key, value in results.get().items():
+            totals[key] += value
+    for p in procs:
+        p.join()
+    return {key: value / args.seconds for key, value in totals.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the database performance profile')
+    parser.add_argument('--database-url', help='existing database to use (default: a temporary SQLite file)')
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    parser.add_argument('--threads', type=int, default=2, help='threads per worker')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url:
+        seeded = {True: args.database_url, False: args.database_url}
+    else:
+        tmpdir = tempfile.mkdtemp()
+        base = os.path.join(tmpdir, 'seed.db')
+        print(f"🌱 Seeding {args.projects} projects...")
+        seed(f'sqlite:///{base}', args.projects)
+        # Separate copies: WAL mode sticks to the database file
+        seeded = {}
+        for enabled in (False, True):
+            path = os.path.join(tmpdir, f'profile_{enabled}.db')
+            shutil.copy(base, path)
+            seeded[enabled] = f'sqlite:///{path}'
+
+    print(f"⚙️  {args.workers} workers x {args.threads} threads, {args.seconds}s, {args.write_ratio:.0%} writes\n")
+    print(f"  {'profile':<10} {'reads/s':>10} {'writes/s':>10} {'errors/s':>10}")
+    try:
+        for enabled in (False, True):
+            r = run_profile(seeded[enabled], enabled, args)
+            print(f"  {'on' if enabled else 'off':<10} {r['reads']:>10.0f} {r['writes']:>10.0f} {r['errors']:>10.1f}")
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir)
+
+if __name__ == '__main__':
+    main()
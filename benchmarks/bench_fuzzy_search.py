@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Latency of the in-process trigram index behind fuzzy search
+
+Loads synthetic projects (no database needed) into fuzzy_search.TrigramIndex
+and reports build time, memory, lookup latency for misspelled one- and
+two-word queries (first lookup and memoized) and the cost of an incremental
+update after a commit.
+
+Usage:
+    python benchmarks/bench_fuzzy_search.py [--projects 20000 50000 100000]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fuzzy_search import TrigramIndex
+from bench_autocomplete import WORDS, VERTICALS, person, timed
+
+FILLER = [
+    'the', 'for', 'and', 'with', 'customers', 'dealers', 'cars', 'buyers', 'sellers', 'faster', 'automated',
+    'manual', 'flow', 'reports', 'grading', 'quality', 'scores', 'city', 'launch', 'pilot', 'mobile', 'web',
+]
+
+
+def synthetic_rows(count, seed=1):
+    rng = random.Random(seed)
+    tags = [f'{w.title()} {i}' for i, w in enumerate(WORDS * 8)]
+    vocabulary = WORDS + FILLER
+    for i in range(1, count + 1):
+        name = ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 4))) + f' {i}'
+        summary = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(10, 40)))
+        yield (i, name, rng.sample(tags, rng.randint(1, 4)), person(rng), rng.choice(VERTICALS), summary)
+
+
+def misspell(word, rng):
+    """Drop, double or swap one letter"""
+    i = rng.randrange(len(word))
+    edit = rng.choice(['drop', 'double', 'swap'])
+    if edit == 'drop' and len(word) > 3:
+        return word[:i] + word[i + 1:]
+    if edit == 'swap' and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + word[i] + word[i:]
+
+
+def bench(count):
+    rows = list(synthetic_rows(count))
+    started = time.perf_counter()
+    index = TrigramIndex()
+    index.load(rows)
+    build_seconds = time.perf_counter() - started
+    stats = index.stats()
+
+    # Memory in a second load, since tracing slows the build down
+    del index
+    gc.collect()
+    tracemalloc.start()
+    index = TrigramIndex()
+    index.load(rows)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = random.Random(2)
+    queries = {
+        'one word': [misspell(rng.choice(WORDS), rng) for _ in range(100)],
+        'two words': [f'{misspell(rng.choice(WORDS), rng)} {rng.choice(WORDS)}' for _ in range(100)],
+    }
+    lookups = {}
+    for label, sample in queries.items():
+        cold = []
+        for query in sample:
+            index._results = {}
+            cold.extend(timed(lambda: index.search(query), 1))
+        warm = timed(lambda: index.search(sample[0]), 200)
+        lookups[label] = (statistics.median(cold), max(cold), statistics.median(warm))
+
+    # A commit that edits one project: remove + re-add its words
+    updates = timed(lambda: index.apply({
+        rng.randint(1, count): (f'Renamed {rng.random()}', ['Mobile'], 'Priya S. Sharma', 'Finance', 'Pricing for dealers')
+    }), 200)
+
+    print(f"\n📦 {count} projects: {stats['vocabulary']} words, {stats['trigrams']} trigrams, "
+          f"built in {build_seconds:.2f}s")
+    print(f"   Memory: {size / 1e6:.1f} MB ({size / count * 100_000 / 1e6:.1f} MB per 100k projects)")
+    for label, (cold, worst, warm) in lookups.items():
+        print(f"   {label:>9}: {cold / 1000:7.2f} ms first lookup (max {worst / 1000:.2f} ms), "
+              f"{warm:6.1f} µs memoized (median)")
+    print(f"   Incremental update: {statistics.median(updates):.1f} µs median")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the fuzzy search trigram index')
+    parser.add_argument('--projects', type=int, nargs='+', default=[20000, 50000, 100000])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Fuzzy Search Index Benchmark")
+    print("=" * 60)
+    for count in args.projects:
+        bench(count)
+    print()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+HTTP benchmark of every route at 1k / 10k / 100k projects, with a regression gate
+
+For each catalog size, seeds a SQLite database with generate_projects.py
+(cached in --data-dir, so reruns skip it), then drives the landing page,
+project pages, the create / edit / delete forms, /api/search and
+/api/business-verticals twice, each on a fresh copy of the database:
+
+- test client: in-process and sequential, with SQL queries per request
+  (after WARMUP_REQUESTS unmeasured requests per route)
+- gunicorn: a real local server (sync workers, gunicorn.conf.py) under
+  --concurrency client threads
+
+and records p50/p95/p99 latency, throughput and errors per route, plus peak
+RSS (the test-client process, or the largest gunicorn worker).
+
+Results are compared with a stored baseline JSON; a route that got slower
+(p95 or throughput beyond --tolerance), issues more queries, or a peak RSS
+that grew, is reported and the run exits with status 1. Baselines are only
+comparable on the same machine and with the same workload options (each
+driver's are stored with its results; a mismatch fails the check instead of
+comparing): record one with --update-baseline.
+
+Usage:
+    python benchmarks/bench_http.py [--sizes 1000 10000 100000] [--baseline benchmarks/baseline.json]
+    python benchmarks/bench_http.py --sizes 1000 --update-baseline   # other sizes are kept
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_projects import generate_projects, load_database, DOMAINS, TAGS, VERTICALS
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+ROUTES = [
+    'index', 'project_detail', 'api_search', 'api_business_verticals',
+    'new_project_form', 'new_project', 'edit_project_form', 'edit_project', 'delete_project',
+]
+
+MIN_LATENCY_DELTA_MS = 2.0  # p95 changes smaller than this are noise, whatever the ratio
+# Unmeasured requests per route before the test client starts counting: the
+# first ones render templates for the first time and create the people and
+# tags the forms introduce, which would otherwise skew short runs
+WARMUP_REQUESTS = 5
+
+# Searches and form posts reuse the generator's vocabulary
+SEARCH_WORDS = sorted({word.lower() for domain in DOMAINS for word in domain.split()})
+SEED_END = datetime(2026, 1, 1)  # fixed, so a seed database is the same wherever it is built
+
+
+# --- Data --------------------------------------------------------------------
+
+def seed_database(path, size):
+    """Bulk-load `size` generated projects into a fresh database (run in a subprocess, see seeded_database)"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    load_database(generate_projects(size, end=SEED_END))
+
+
+def seeded_database(data_dir, size):
+    """Path of the cached seed database for `size` projects, creating it if needed"""
+    path = os.path.join(data_dir, f'projects_{size}.db')
+    if not os.path.exists(path):
+        print(f"🌱 Seeding {size} projects...")
+        started = time.perf_counter()
+        partial = path + '.partial'
+        for stale in (partial, partial + '-wal', partial + '-shm'):
+            if os.path.exists(stale):
+                os.remove(stale)
+        subprocess.run([sys.executable, __file__, '--seed-database', partial, '--seed-size', str(size)], check=True)
+        os.replace(partial, path)
+        print(f"   done in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def working_copy(seed_path, workdir, label):
+    """A copy of the seed database the run may write to"""
+    path = os.path.join(workdir, f'{label}.db')
+    shutil.copy(seed_path, path)
+    return path
+
+
+# --- Workload ----------------------------------------------------------------
+
+class Workload:
+    """Requests for each route; shared by both drivers (thread-safe)
+
+    Reads and edits use the lower half of the seeded ids; deletes take the
+    upper half from the top, each id once, so they never hit a page the
+    other routes read.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._names = itertools.count(1)
+        self._deletes = itertools.count(size, -1)
+        self._lock = threading.Lock()
+
+    def _read_id(self, rng):
+        return rng.randint(1, max(1, self.size // 2))
+
+    def _form(self, name, rng):
+        return {
+            'name': name,
+            'summary': ' '.join(rng.choice(SEARCH_WORDS) for _ in range(20)),
+            'business_vertical': rng.choice(list(VERTICALS)),
+            # Fixed people: the warm-up creates them, so later requests only look them up
+            'product_manager': 'Bench PM',
+            'tags': ', '.join(rng.sample(TAGS[:20], 2)),
+            'business_stakeholder_name': ['Bench Person'],
+            'business_stakeholder_email': ['bench@example.com'],
+            'doc_category': ['core'],
+            'doc_name': ['PRD'],
+            'doc_url': ['https://docs.google.com/document/d/bench'],
+            'related_projects': [str(self._read_id(rng))],
+        }
+
+    def request(self, route, rng):
+        """(method, path, form or None, expected status), or None once the route has no work left"""
+        if route == 'index':
+            return 'GET', '/', None, 200
+        if route == 'project_detail':
+            return 'GET', f'/project/{self._read_id(rng)}', None, 200
+        if route == 'api_search':
+            word = rng.choice(SEARCH_WORDS)
+            return 'GET', f'/api/search?q={word[:2] + word[3:]}', None, 200
+        if route == 'api_business_verticals':
+            return 'GET', '/api/business-verticals', None, 200
+        if route == 'new_project_form':
+            return 'GET', '/project/new', None, 200
+        if route == 'new_project':
+            name = f'Bench New Project {os.getpid()}-{next(self._names)}'
+            return 'POST', '/project/new', self._form(name, rng), 302
+        if route == 'edit_project_form':
+            return 'GET', f'/project/{self._read_id(rng)}/edit', None, 200
+        if route == 'edit_project':
+            project_id = self._read_id(rng)
+            return 'POST', f'/project/{project_id}/edit', self._form(f'Bench Edited Project {project_id}', rng), 302
+        if route == 'delete_project':
+            with self._lock:
+                project_id = next(self._deletes)
+            if project_id <= self.size // 2:
+                return None
+            return 'POST', f'/project/{project_id}/delete', None, 302
+        raise ValueError(route)
+
+
+def summarize(latencies, errors, elapsed, queries=None):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    if len(latencies_ms) > 1:
+        cuts = statistics.quantiles(latencies_ms, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies_ms[0] if latencies_ms else 0.0
+    result = {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if queries is not None:
+        result['queries'] = round(queries / max(1, len(latencies)), 2)
+    return result
+
+
+# --- Test client driver ------------------------------------------------------
+
+def run_test_client(size, requests_per_route, seed):
+    """Drive every route through app.test_client() (DATABASE_URL points at a working copy)"""
+    from sqlalchemy import event
+    from app import app, db
+
+    queries = [0]
+
+    def count_query(*args):
+        queries[0] += 1
+
+    client = app.test_client()
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+    # The first request checks the schema and builds the in-process indexes
+    client.get('/api/search?q=warmup')
+    client.get('/api/autocomplete?q=w')
+
+    workload = Workload(size)
+    rng = random.Random(seed)
+    routes = {}
+    for route in ROUTES:
+        for _ in range(WARMUP_REQUESTS):
+            spec = workload.request(route, rng)
+            if spec is None:
+                break
+            method, path, form, expected = spec
+            client.open(path, method=method, data=form)
+        latencies, errors = [], 0
+        queries[0] = 0
+        started = time.perf_counter()
+        for _ in range(requests_per_route):
+            spec = workload.request(route, rng)
+            if spec is None:
+                break
+            method, path, form, expected = spec
+            request_started = time.perf_counter()
+            response = client.open(path, method=method, data=form)
+            latencies.append(time.perf_counter() - request_started)
+            errors += response.status_code != expected
+        routes[route] = summarize(latencies, errors, time.perf_counter() - started, queries[0])
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'workload': {'requests': requests_per_route, 'seed': seed},
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'routes': routes,
+    }
+
+
+def test_client_run(database_path, size, args):
+    """run_test_client() in a fresh process, so its peak RSS is its own"""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}')
+    output = subprocess.run(
+        [sys.executable, __file__, '--run-test-client', '--seed-size', str(size),
+         '--requests', str(args.requests), '--seed', str(args.seed)],
+        env=env, cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# --- Gunicorn driver ---------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _process_tree(pid):
+    """pid and its direct children (gunicorn master and workers)"""
+    pids = [pid]
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        pids.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return pids
+
+
+def _peak_rss_mb(pid):
+    """VmHWM (peak resident set) of a process, in MB"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _send(port, method, path, form):
+    body = urlencode(form, doseq=True) if form is not None else None
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'} if body is not None else {}
+    # Sync workers close the connection after each response
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def _start_gunicorn(database_path, workers):
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+         '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        try:
+            if _send(port, 'GET', '/api/business-verticals', None) == 200:
+                return server, port
+        except OSError:
+            time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start')
+
+
+def gunicorn_run(database_path, size, args):
+    server, port = _start_gunicorn(database_path, args.workers)
+    try:
+        # Every worker builds its indexes in post_worker_init; one request each warms the rest
+        for _ in range(args.workers * 2):
+            _send(port, 'GET', '/api/search?q=warmup', None)
+
+        workload = Workload(size)
+        routes = {}
+        for route in ROUTES:
+            latencies, errors = [], [0]
+            lock = threading.Lock()
+            deadline = time.monotonic() + args.seconds
+
+            def drive(thread_seed):
+                rng = random.Random(thread_seed)
+                own, failed = [], 0
+                while time.monotonic() < deadline:
+                    spec = workload.request(route, rng)
+                    if spec is None:
+                        break
+                    method, path, form, expected = spec
+                    started = time.perf_counter()
+                    try:
+                        failed += _send(port, method, path, form) != expected
+                    except OSError:
+                        failed += 1
+                    own.append(time.perf_counter() - started)
+                with lock:
+                    latencies.extend(own)
+                    errors[0] += failed
+
+            started = time.perf_counter()
+            threads = [threading.Thread(target=drive, args=(args.seed * 1000 + i,)) for i in range(args.concurrency)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            routes[route] = summarize(latencies, errors[0], time.perf_counter() - started)
+
+        workers = _process_tree(server.pid)[1:]
+        peak = max((_peak_rss_mb(pid) for pid in workers), default=0.0)
+        total = sum(_peak_rss_mb(pid) for pid in [server.pid, *workers])
+        return {
+            'workload': {'seconds': args.seconds, 'concurrency': args.concurrency,
+                         'workers': args.workers, 'seed': args.seed},
+            'peak_rss_mb': round(peak, 1),
+            'total_rss_mb': round(total, 1),
+            'routes': routes,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# --- Baseline ----------------------------------------------------------------
+
+def _options(workload):
+    return ' '.join(f'--{name} {value}' for name, value in sorted((workload or {}).items())) or 'unknown options'
+
+
+def mismatches(results, baseline):
+    """Size / driver pairs whose baseline was recorded with other workload options"""
+    lines = []
+    for size, drivers in results['sizes'].items():
+        for driver, current in drivers.items():
+            base = baseline.get('sizes', {}).get(size, {}).get(driver)
+            if base and base.get('workload') != current['workload']:
+                lines.append(f"{size} projects, {driver}: baseline has {_options(base.get('workload'))}, "
+                             f"this run {_options(current['workload'])}")
+    return lines
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of `results` against `baseline`, as printable lines
+
+    Pairs listed by mismatches() are skipped.
+    """
+    regressions = []
+    for size, drivers in results['sizes'].items():
+        for driver, current in drivers.items():
+            base = baseline.get('sizes', {}).get(size, {}).get(driver)
+            if not base or base.get('workload') != current['workload']:
+                continue
+            where = f'{size} projects, {driver}'
+            for route, now in current['routes'].items():
+                then = base['routes'].get(route)
+                if not then:
+                    continue
+                if now['p95_ms'] > then['p95_ms'] * (1 + tolerance) and now['p95_ms'] - then['p95_ms'] > MIN_LATENCY_DELTA_MS:
+                    regressions.append(f"{where}, {route}: p95 {then['p95_ms']:.1f} → {now['p95_ms']:.1f} ms")
+                if then['rps'] and now['rps'] < then['rps'] * (1 - tolerance):
+                    regressions.append(f"{where}, {route}: {then['rps']:.0f} → {now['rps']:.0f} req/s")
+                if 'queries' in now and 'queries' in then and now['queries'] > then['queries'] + 0.5:
+                    regressions.append(f"{where}, {route}: {then['queries']} → {now['queries']} queries per request")
+                if now['errors'] / max(1, now['requests']) > then['errors'] / max(1, then['requests']):
+                    regressions.append(f"{where}, {route}: {then['errors']} → {now['errors']} errors")
+            if current['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+                regressions.append(f"{where}: peak RSS {base['peak_rss_mb']:.0f} → {current['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def print_results(size, driver, result):
+    print(f"\n📊 {size} projects, {driver} (peak RSS {result['peak_rss_mb']:.0f} MB)")
+    print(f"   {'route':<24} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'errors':>7}")
+    for route, r in result['routes'].items():
+        queries = f"{r['queries']:.1f}" if 'queries' in r else '-'
+        print(f"   {route:<24} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['rps']:>8.0f} {queries:>8} {r['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every route at several catalog sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--drivers', nargs='+', choices=['test_client', 'gunicorn'], default=['test_client', 'gunicorn'])
+    parser.add_argument('--requests', type=int, default=200, help='requests per route (test client)')
+    parser.add_argument('--seconds', type=float, default=3, help='seconds per route (gunicorn)')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads (gunicorn)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--data-dir', help='where seed databases are cached (default: a temporary directory)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown / RSS growth (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    parser.add_argument('--run-test-client', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--seed-database', help=argparse.SUPPRESS)
+    parser.add_argument('--seed-size', type=int, help=argparse.SUPPRESS)  # also the size for --run-test-client
+    args = parser.parse_args()
+
+    if args.seed_database:
+        seed_database(args.seed_database, args.seed_size)
+        return 0
+    if args.run_test_client:
+        print(json.dumps(run_test_client(args.seed_size, args.requests, args.seed)))
+        return 0
+
+    print("=" * 60)
+    print("Cars24 Product Portal - HTTP Benchmark")
+    print("=" * 60)
+
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    os.makedirs(data_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp()
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': f'{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs',
+            'requests': args.requests, 'seconds': args.seconds,
+            'concurrency': args.concurrency, 'workers': args.workers, 'seed': args.seed,
+        },
+        'sizes': {},
+    }
+    try:
+        for size in args.sizes:
+            seed_path = seeded_database(data_dir, size)
+            drivers = results['sizes'][str(size)] = {}
+            for driver in args.drivers:
+                database_path = working_copy(seed_path, workdir, f'{driver}_{size}')
+                run = test_client_run if driver == 'test_client' else gunicorn_run
+                drivers[driver] = run(database_path, size, args)
+                print_results(size, driver, drivers[driver])
+    finally:
+        shutil.rmtree(workdir)
+        if not args.data_dir:
+            shutil.rmtree(data_dir)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    print()
+    status = 0
+    if args.update_baseline:
+        # Sizes (and drivers) not run this time keep their recorded numbers
+        baseline = {'sizes': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        for size, drivers in results['sizes'].items():
+            baseline['sizes'].setdefault(size, {}).update(drivers)
+        baseline['meta'] = results['meta']
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"📌 Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        incomparable = mismatches(results, baseline)
+        regressions = compare(results, baseline, args.tolerance)
+        if incomparable:
+            print(f"❌ Not comparable with {args.baseline} (rerun with its options, or --update-baseline):")
+            for line in incomparable:
+                print(f"   {line}")
+            status = 1
+        if regressions:
+            print(f"❌ {len(regressions)} regressions against {args.baseline}:")
+            for line in regressions:
+                print(f"   {line}")
+            status = 1
+        elif not incomparable:
+            print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    else:
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to record one")
+    print("=" * 60)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Before/after benchmark for list-page column projections
+
+Seeds a throwaway SQLite database with N synthetic projects, then compares
+loading full rows + to_dict() (the old list path) against
+Project.projected(...) + to_card_dict() / to_summary_dict().
+
+Reports bytes read from the database and time spent loading + decoding.
+
+Usage:
+    python benchmarks/bench_projection.py [--projects 20000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def seed(db, Project, count):
+    """Insert synthetic projects with realistically sized JSON columns"""
+    rng = random.Random(42)
+    roles = ['business', 'product', 'design', 'engineering']
+    rows = []
+    for i in range(count):
+        docs = lambda n, kind: [
+            {'name': f'{kind} {j}', 'url': f'https://docs.google.com/document/d/{rng.getrandbits(64):x}/edit'}
+            for j in range(n)
+        ]
+        rows.append({
+            'name': f'Project {i:06d}',
+            'summary': ' '.join(rng.choice(['vehicle', 'pricing', 'inspection', 'loan', 'dealer', 'portal',
+                                            'analytics', 'workflow', 'customer', 'platform']) for _ in range(40)),
+            'business_vertical': rng.choice(['VAS', 'A2I', 'I2P', 'Finance', 'Retail']),
+            'product_manager': f'PM {rng.randint(1, 200)}',
+            'stakeholders': {
+                role: [{'name': f'Person {rng.randint(1, 5000)}', 'email': f'p{rng.randint(1, 5000)}@cars24.com'}
+                       for _ in range(rng.randint(2, 8))]
+                for role in roles
+            },
+            'core_docs': docs(rng.randint(1, 4), 'PRD'),
+            'design_docs': docs(rng.randint(0, 3), 'Figma'),
+            'analytics_docs': docs(rng.randint(0, 3), 'Dashboard'),
+            'other_docs': docs(rng.randint(0, 3), 'Notes'),
+            'tags': rng.sample(['Mobile', 'AI/ML', 'Payments', 'Web', 'Ops', 'Data', 'UX', 'Growth'], 3),
+            'related_projects': [rng.randint(1, count) for _ in range(rng.randint(0, 5))],
+        })
+        if len(rows) == 2000:
+            db.session.execute(db.insert(Project), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(Project), rows)
+    db.session.commit()
+
+def bytes_read(db, columns):
+    """Total size of the raw column values a query over `columns` reads"""
+    expr = ' + '.join(f'COALESCE(LENGTH(CAST({c} AS BLOB)), 0)' for c in columns)
+    return db.session.execute(db.text(f'SELECT SUM({expr}) FROM projects')).scalar()
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_projection_')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(workdir, "bench.db")}'
+    from app import app, db, Project
+    from migrations import migrate
+
+    all_columns = [c.name for c in Project.__table__.columns]
+
+    with app.app_context():
+        # A fresh file: the app only creates the schema on its first request
+        migrate()
+        print(f"Seeding {args.projects} projects...")
+        seed(db, Project, args.projects)
+
+        def full():
+            db.session.expunge_all()
+            [p.to_dict() for p in Project.query.all()]
+
+        def cards():
+            db.session.expunge_all()
+            [p.to_card_dict() for p in Project.projected(Project.CARD_COLUMNS).all()]
+
+        def summaries():
+            db.session.expunge_all()
+            [p.to_summary_dict() for p in Project.projected().all()]
+
+        cases = [
+            ('full rows + to_dict()', all_columns, full),
+            ('CARD_COLUMNS + to_card_dict()', Project.CARD_COLUMNS, cards),
+            ('SUMMARY_COLUMNS + to_summary_dict()', Project.SUMMARY_COLUMNS, summaries),
+        ]
+
+        print()
+        print(f"{'path':<38}{'bytes read':>14}{'load+decode':>14}{'vs full':>10}")
+        baseline = None
+        for label, columns, fn in cases:
+            size = bytes_read(db, columns)
+            seconds = timed(fn, args.repeat)
+            baseline = baseline or seconds
+            print(f"{label:<38}{size / 1024 / 1024:>11.1f} MB{seconds * 1000:>11.0f} ms{baseline / seconds:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Load test: sync gunicorn workers (app:app) against the ASGI mode (asgi:app)
+
+Seeds a throwaway SQLite database with generate_projects.py (or uses
+--database-url), starts each server on a local port with the same number of
+workers, and drives the JSON endpoints asgi.py serves asynchronously (plus
+the landing page, which both modes serve through Flask) from several client
+processes at high concurrency. Reports requests/s, p50/p95/p99 latency and errors per mode,
+overall and per route.
+
+Needs requirements-asgi.txt.
+
+Usage:
+    python benchmarks/load_asgi.py [--projects 5000] [--workers 4] [--concurrency 256] [--seconds 15]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_projects import generate_projects, load_database, DOMAINS
+
+MODES = {
+    'sync': ['app:app'],
+    'asgi': ['-k', 'uvicorn_worker.UvicornWorker', 'asgi:app'],
+}
+
+WORDS = sorted({word.lower() for domain in DOMAINS for word in domain.split()})
+
+
+def seed(database_url, count):
+    """Create the schema and bulk-load `count` generated projects"""
+    os.environ['DATABASE_URL'] = database_url
+    from app import app, db
+
+    load_database(generate_projects(count))
+    with app.app_context():
+        db.engine.dispose()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, database_url, workers, port):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+               '-b', f'127.0.0.1:{port}', '--log-level', 'warning', '--backlog', '4096', *MODES[mode]]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    import httpx
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/api/business-verticals', timeout=2).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def request_mix(rng):
+    """(route label, path) of one request"""
+    word = rng.choice(WORDS)
+    typo = word[:2] + word[3:] if len(word) > 4 else word
+    return rng.choices([
+        ('/api/search', f'/api/search?q={typo}'),
+        ('/api/search fulltext', f'/api/search?q={word}&mode=fulltext'),
+        ('/api/autocomplete', f'/api/autocomplete?q={word[:rng.randint(1, 4)]}'),
+        ('/api/projects/suggest', f'/api/projects/suggest?prefix={word[:3]}'),
+        ('/api/business-verticals', '/api/business-verticals'),
+        ('/', '/'),
+    ], weights=[30, 10, 30, 10, 15, 5])[0]
+
+
+def client(port, concurrency, seconds, seed_value, results):
+    import httpx
+
+    async def run():
+        samples = []
+        deadline = time.monotonic() + seconds
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=30) as http:
+            async def loop(rng):
+                while time.monotonic() < deadline:
+                    route, path = request_mix(rng)
+                    started = time.perf_counter()
+                    try:
+                        ok = (await http.get(path)).status_code == 200
+                    except httpx.HTTPError:
+                        ok = False
+                    samples.append((route, time.perf_counter() - started, ok))
+            await asyncio.gather(*(loop(random.Random(seed_value * 1000 + i)) for i in range(concurrency)))
+        return samples
+
+    results.put(asyncio.run(run()))
+
+
+def percentile(values, pct):
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1] if len(values) > 1 else values[0]
+
+
+def run_load(port, args):
+    results = multiprocessing.Queue()
+    per_client = max(1, args.concurrency // args.clients)
+    procs = [
+        multiprocessing.Process(target=client, args=(port, per_client, args.seconds, i, results))
+        for i in range(args.clients)
+    ]
+    for p in procs:
+        p.start()
+    samples = []
+    for _ in procs:
+        samples.extend(results.get())
+    for p in procs:
+        p.join()
+    return samples
+
+
+def summarize(samples, seconds):
+    latencies = [latency * 1000 for _, latency, ok in samples if ok]
+    return {
+        'requests': len(samples),
+        'rps': len(latencies) / seconds,
+        'p50': percentile(latencies, 50) if latencies else 0,
+        'p95': percentile(latencies, 95) if latencies else 0,
+        'p99': percentile(latencies, 99) if latencies else 0,
+        'errors': sum(1 for _, _, ok in samples if not ok),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sync gunicorn workers with the ASGI mode under load')
+    parser.add_argument('--database-url', help='existing database to use (default: a temporary SQLite file)')
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4, help='server worker processes')
+    parser.add_argument('--concurrency', type=int, default=256, help='requests in flight')
+    parser.add_argument('--clients', type=int, default=4, help='load generator processes')
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Sync vs ASGI Load Test")
+    print("=" * 60)
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.mkdtemp()
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'load.db')}"
+        print(f"🌱 Seeding {args.projects} projects...")
+        seed(database_url, args.projects)
+
+    print(f"⚙️  {args.workers} workers, {args.concurrency} concurrent requests, {args.seconds}s per mode\n")
+    summaries = {}
+    try:
+        for mode in args.modes:
+            port = free_port()
+            server = start_server(mode, database_url, args.workers, port)
+            try:
+                samples = run_load(port, args)
+            finally:
+                server.terminate()
+                server.wait()
+            summaries[mode] = summarize(samples, args.seconds)
+            by_route = {}
+            for sample in samples:
+                by_route.setdefault(sample[0], []).append(sample)
+            print(f"🚀 {mode}")
+            for route, route_samples in sorted(by_route.items()):
+                s = summarize(route_samples, args.seconds)
+                print(f"   {route:<26} {s['rps']:>8.0f} req/s  p50 {s['p50']:>7.1f} ms  "
+                      f"p99 {s['p99']:>7.1f} ms  errors {s['errors']}")
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir)
+
+    print()
+    print(f"  {'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for mode, s in summaries.items():
+        print(f"  {mode:<6} {s['rps']:>9.0f} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['errors']:>8}")
+    print()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
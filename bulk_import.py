@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Bulk project import (JSON array or NDJSON)
+
+Records are validated, then written in batches with multi-row
+INSERT ... ON CONFLICT (name_key) DO UPDATE statements, so an existing project
+with the same name (ignoring case and whitespace) is updated in place. Tags, people and related-project
+links are synced set-based per batch, and a per-record report is returned.
+Each batch commits on its own; one the database rejects is rolled back, its
+records are reported as failed and the import carries on with the next.
+
+Used by POST /api/projects/bulk and from the command line:
+
+    python bulk_import.py projects.ndjson [--batch-size 1000] [--no-upsert]
+    cat projects.json | python bulk_import.py - --report report.json
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from models import db, Project, Tag, ProjectStakeholder, ProjectRelation, STAKEHOLDER_ROLES, normalize_name
+from cache import bump_catalog_version
+from doc_types import annotate_docs
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 5000
+
+REQUIRED_FIELDS = ['name', 'summary', 'business_vertical', 'product_manager']
+DOC_FIELDS = ['core_docs', 'design_docs', 'analytics_docs', 'other_docs']
+FIELD_LIMITS = {'name': 200, 'business_vertical': 50, 'product_manager': 100}
+
+# Columns an upsert overwrites; created_at keeps the original value
+UPSERT_COLUMNS = [
+    'summary', 'business_vertical', 'product_manager', 'stakeholders',
+    'core_docs', 'design_docs', 'analytics_docs', 'other_docs', 'tags', 'related_projects'
+]
+
+
+class ImportFormatError(ValueError):
+    """The payload is neither a JSON array nor NDJSON"""
+
+
+def iter_records(stream):
+    """Yield records from a text stream holding a JSON array or NDJSON
+
+    NDJSON is read line by line, so arbitrarily large files stream through.
+    """
+    head = stream.read(1)
+    while head and head.isspace():
+        head = stream.read(1)
+    if not head:
+        return
+
+    if head == '[':
+        try:
+            records = json.loads(head + stream.read())
+        except json.JSONDecodeError as e:
+            raise ImportFormatError(f'Invalid JSON array: {e}')
+        yield from records
+        return
+
+    for line_number, line in enumerate(_lines(head, stream), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            # Keep going: the bad line is reported as a failed record
+            yield _InvalidLine(line_number, str(e))
+
+
+def _lines(head, stream):
+    yield head + stream.readline()
+    yield from stream
+
+
+class _InvalidLine:
+    def __init__(self, line_number, error):
+        self.line_number = line_number
+        self.error = error
+
+
+def _clean_docs(docs, field, errors):
+    if docs is None:
+        return []
+    if not isinstance(docs, list):
+        errors.append(f'{field} must be a list')
+        return []
+    cleaned = []
+    for doc in docs:
+        if not isinstance(doc, dict) or not doc.get('url'):
+            errors.append(f'{field} entries need a url')
+            continue
+        cleaned.append({'name': str(doc.get('name') or doc['url']).strip(), 'url': str(doc['url']).strip()})
+    return annotate_docs(cleaned)
+
+
+def validate_record(record):
+    """Return (row, errors) for one input record"""
+    if isinstance(record, _InvalidLine):
+        return None, [f'line {record.line_number}: invalid JSON ({record.error})']
+    if not isinstance(record, dict):
+        return None, ['record must be a JSON object']
+
+    errors = []
+    row = {}
+    for field in REQUIRED_FIELDS:
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f'{field} is required')
+            continue
+        value = value.strip()
+        limit = FIELD_LIMITS.get(field)
+        if limit and len(value) > limit:
+            errors.append(f'{field} is longer than {limit} characters')
+        row[field] = value
+    if 'name' in row:
+        row['name_key'] = normalize_name(row['name'])
+
+    stakeholders = record.get('stakeholders') or {}
+    if not isinstance(stakeholders, dict):
+        errors.append('stakeholders must be an object')
+        stakeholders = {}
+    row['stakeholders'] = {
+        role: [m for m in stakeholders.get(role) or [] if m]
+        for role in dict.fromkeys(STAKEHOLDER_ROLES + list(stakeholders))
+    }
+
+    for field in DOC_FIELDS:
+        row[field] = _clean_docs(record.get(field), field, errors)
+
+    tags = record.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    if not isinstance(tags, list):
+        errors.append('tags must be a list')
+        tags = []
+    row['tags'] = Tag.clean_names(str(tag) for tag in tags)
+
+    related = record.get('related_projects') or []
+    if not isinstance(related, list) or not all(str(i).isdigit() for i in related):
+        errors.append('related_projects must be a list of project ids')
+        related = []
+    row['related_projects'] = [int(i) for i in related]
+
+    return (None if errors else row), errors
+
+
+def _insert_statement(upsert):
+    """INSERT ... ON CONFLICT (name_key) ... RETURNING, run executemany-style
+    
+    SQLAlchemy batches executemany into multi-row VALUES ("insertmanyvalues")
+    within the driver's bind-parameter limits.
+    """
+    dialect = db.engine.dialect.name
+    table = Project.__table__
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(table)
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(table)
+    else:
+        raise RuntimeError(f'Bulk import is not supported on {dialect}')
+
+    if upsert:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['name_key'],
+            set_=dict({c: stmt.excluded[c] for c in UPSERT_COLUMNS}, updated_at=datetime.utcnow())
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['name_key'])
+    return stmt.returning(table.c.id, table.c.name_key)
+
+
+def _write_batch(batch, upsert, report):
+    """Upsert one batch of (index, row) pairs in its own transaction"""
+    # Within a batch the last record for a name wins (keyed by normalized name)
+    latest = {}
+    for index, row in batch:
+        key = row['name_key']
+        if key in latest:
+            report.record(latest[key][0], latest[key][1]['name'], 'skipped',
+                          errors=[f'superseded by record {index} with the same name'])
+        latest[key] = (index, row)
+
+    try:
+        keys = list(latest)
+        existing = dict(db.session.query(Project.name_key, Project.id).filter(Project.name_key.in_(keys)))
+
+        now = datetime.utcnow()
+        rows = [dict(row, created_at=now, updated_at=now) for index, row in latest.values()]
+        result = db.session.execute(_insert_statement(upsert), rows)
+        written = {key: pid for pid, key in result}
+
+        Tag.sync_project_tags({written[key]: row['tags'] for key, (i, row) in latest.items() if key in written})
+        ProjectStakeholder.sync_projects({
+            written[key]: (row['stakeholders'], row['product_manager'])
+            for key, (i, row) in latest.items() if key in written
+        })
+        ProjectRelation.sync_projects({
+            written[key]: row['related_projects'] for key, (i, row) in latest.items() if key in written
+        })
+        if written:
+            bump_catalog_version()
+        db.session.commit()
+    except DBAPIError as e:
+        db.session.rollback()
+        error = f'database error, nothing in this batch was written: {e.orig}'
+        for index, row in latest.values():
+            report.record(index, row['name'], 'failed', errors=[error])
+        return
+
+    for key, (index, row) in latest.items():
+        if key not in written:
+            report.record(index, row['name'], 'skipped', project_id=existing.get(key),
+                          errors=['a project with this name already exists'])
+        else:
+            report.record(index, row['name'], 'updated' if key in existing else 'inserted',
+                          project_id=written[key])
+
+
+class ImportReport:
+    def __init__(self):
+        self.results = []
+        self.counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+        self.started = time.perf_counter()
+
+    def record(self, index, name, status, project_id=None, errors=None):
+        self.counts[status] += 1
+        result = {'index': index, 'name': name, 'status': status}
+        if project_id is not None:
+            result['id'] = project_id
+        if errors:
+            result['errors'] = errors
+        self.results.append(result)
+
+    def to_dict(self):
+        elapsed = time.perf_counter() - self.started
+        total = sum(self.counts.values())
+        return {
+            'total': total,
+            **self.counts,
+            'seconds': round(elapsed, 3),
+            'records_per_second': round(total / elapsed, 1) if elapsed else None,
+            'results': sorted(self.results, key=lambda r: r['index']),
+        }
+
+
+def import_projects(records, batch_size=DEFAULT_BATCH_SIZE, upsert=True):
+    """Validate and write an iterable of project records; returns a report dict"""
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    report = ImportReport()
+    batch = []
+
+    for index, record in enumerate(records):
+        row, errors = validate_record(record)
+        if errors:
+            name = record.get('name') if isinstance(record, dict) else None
+            report.record(index, name, 'failed', errors=errors)
+            continue
+        batch.append((index, row))
+        if len(batch) >= batch_size:
+            _write_batch(batch, upsert, report)
+            batch = []
+
+    if batch:
+        _write_batch(batch, upsert, report)
+
+    return report.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import projects from JSON or NDJSON')
+    parser.add_argument('path', help="input file ('-' for stdin)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--no-upsert', action='store_true', help='skip records whose name already exists')
+    parser.add_argument('--report', help='write the per-record report to this JSON file')
+    args = parser.parse_args()
+
+    from app import app
+    from migrations import ensure_schema
+
+    stream = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+    with app.app_context(), stream:
+        ensure_schema()
+        report = import_projects(iter_records(stream), batch_size=args.batch_size, upsert=not args.no_upsert)
+
+    print(f"✅ Inserted: {report['inserted']}")
+    print(f"🔄 Updated:  {report['updated']}")
+    print(f"⏭️  Skipped:  {report['skipped']}")
+    print(f"❌ Failed:   {report['failed']}")
+    print(f"⏱️  {report['total']} records in {report['seconds']}s ({report['records_per_second']} records/s)")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.report}")
+    else:
+        for result in report['results']:
+            if result.get('errors'):
+                print(f"  ✗ #{result['index']} {result['name']}: {'; '.join(result['errors'])}")
+
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Versioned read-through cache for catalog aggregates
+
+Each worker keeps a small in-process LRU (with a TTL as a safety net) for
+project list pages, the vertical list, facet counts and graphs. Entries are
+keyed by the catalog version stored in the database; the version is bumped
+in the same transaction as any project write, so every worker stops serving
+stale entries as soon as the write commits.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import g, has_app_context
+from sqlalchemy import event
+from models import db, Project, CatalogVersion
+
+CATALOG_VERSION_ID = 1
+
+
+class ReadCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, maxsize=512, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        found, value = self.lookup(key)
+        if found:
+            return value
+        # Load outside the lock; a concurrent miss may load twice, which is harmless
+        value = loader()
+        self.store(key, value)
+        return value
+
+    def lookup(self, key):
+        """(True, value) on a hit, (False, None) on a miss; get_or_load() in two steps for async loaders"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+        return False, None
+
+    def store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+read_cache = ReadCache()
+
+
+def ensure_catalog_version():
+    """Create the version row if it does not exist yet"""
+    if not db.session.get(CatalogVersion, CATALOG_VERSION_ID):
+        db.session.add(CatalogVersion(id=CATALOG_VERSION_ID, version=0))
+        db.session.commit()
+
+
+def bump_catalog_version(session=None):
+    """Increment the catalog version inside the current transaction
+    
+    Called automatically when the session flushes Project changes; bulk
+    paths that write with Core statements call it explicitly.
+    """
+    (session or db.session).execute(
+        db.update(CatalogVersion)
+        .where(CatalogVersion.id == CATALOG_VERSION_ID)
+        .values(version=CatalogVersion.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+def catalog_state():
+    """(version, updated_at) of the catalog, read once per request"""
+    if has_app_context() and 'catalog_state' in g:
+        return g.catalog_state
+    row = db.session.query(CatalogVersion.version, CatalogVersion.updated_at).filter_by(id=CATALOG_VERSION_ID).first()
+    state = (row.version, row.updated_at) if row else (0, None)
+    if has_app_context():
+        g.catalog_state = state
+    return state
+
+
+def current_catalog_version():
+    """Catalog version as seen by this request"""
+    return catalog_state()[0]
+
+
+def cached(namespace, key, loader):
+    """Read-through lookup, invalidated whenever the catalog version changes"""
+    return read_cache.get_or_load((namespace, current_catalog_version(), key), loader)
+
+
+def cache_stats():
+    return dict(read_cache.stats(), catalog_version=current_catalog_version())
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_on_project_change(session, flush_context, instances):
+    """Bump the version once per transaction that touches a Project"""
+    if session.info.get('catalog_version_bumped'):
+        return
+    changed = (session.new | session.dirty | session.deleted)
+    if any(isinstance(obj, Project) for obj in changed):
+        session.info['catalog_version_bumped'] = True
+        bump_catalog_version(session)
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_rollback')
+def _reset_bump_flag(session):
+    session.info.pop('catalog_version_bumped', None)
+    # This request's own write changed the version; re-read it next time
+    if has_app_context():
+        g.pop('catalog_state', None)
@@ -0,0 +1,157 @@
+"""
+Server-side project listing for the landing page
+
+Projects are filtered in the database (vertical, tag, text) and paginated
+with a keyset cursor on (updated_at, id), so each page costs the same no
+matter how deep into the catalog the user scrolls.
+"""
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+from models import db, Project, Tag, project_tags
+from search_index import full_text_filter
+from cache import cached
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+DOC_COLUMNS = {
+    'core': Project.core_docs,
+    'design': Project.design_docs,
+    'analytics': Project.analytics_docs,
+    'other': Project.other_docs,
+}
+
+
+def encode_cursor(project):
+    """Encode the (updated_at, id) position of the last project on a page"""
+    raw = f'{project.updated_at.isoformat()}|{project.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor(); returns None if invalid"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        updated_at, project_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(updated_at), int(project_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def filters_from_args(args):
+    """Read the listing filters from request.args"""
+    return {
+        'verticals': [v for v in args.getlist('vertical') if v],
+        'tags': [t for t in args.getlist('tag') if t],
+        'q': args.get('q', '').strip(),
+        'has_docs': [d for d in args.getlist('has_doc') if d in DOC_COLUMNS],
+    }
+
+
+def json_array_length(column):
+    """Length of a JSON array column, computed inside the database"""
+    if db.engine.dialect.name == 'postgresql':
+        return db.func.jsonb_array_length(column)
+    return db.func.json_array_length(column)
+
+
+def filters_key(filters):
+    """Hashable form of a filters dict, for cache keys"""
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in filters.items()
+    ))
+
+
+def apply_filters(query, filters):
+    """Apply vertical / tag / text / document filters to a Project query"""
+    if filters.get('verticals'):
+        query = query.filter(Project.business_vertical.in_(filters['verticals']))
+
+    if filters.get('tags'):
+        # Projects with any of the selected tags, via the tag -> project index
+        tagged = (
+            db.select(project_tags.c.project_id)
+            .join(Tag, Tag.id == project_tags.c.tag_id)
+            .where(Tag.name.in_(filters['tags']))
+        )
+        query = query.filter(Project.id.in_(tagged))
+
+    for category in filters.get('has_docs', []):
+        # e.g. has_doc=analytics -> at least one analytics document
+        query = query.filter(db.func.coalesce(json_array_length(DOC_COLUMNS[category]), 0) > 0)
+
+    if filters.get('q'):
+        text_filter = full_text_filter(filters['q'])
+        if text_filter is not None:
+            query = query.filter(text_filter)
+
+    return query
+
+
+def get_project_page(filters, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return one page of projects, newest first, plus the cursor for the next page"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return cached('project_page', (filters_key(filters), cursor, limit),
+                  lambda: _load_project_page(filters, cursor, limit))
+
+
+def _load_project_page(filters, cursor, limit):
+    query = apply_filters(Project.projected(Project.CARD_COLUMNS), filters)
+
+    position = decode_cursor(cursor)
+    if position:
+        query = query.filter(tuple_(Project.updated_at, Project.id) < position)
+
+    # Fetch one extra row to find out whether there is another page
+    rows = query.order_by(Project.updated_at.desc(), Project.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'projects': [p.to_card_dict() for p in rows],
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+    }
+
+
+def count_projects(filters):
+    """Number of projects matching the filters"""
+    return cached('project_count', filters_key(filters),
+                  lambda: apply_filters(db.session.query(db.func.count(Project.id)), filters).scalar())
+
+
+def get_facets(filters, tag_limit=25):
+    """Per-tag and per-vertical project counts for the current filters
+    
+    Each facet ignores its own selection (but honours the others), so the
+    pills keep showing the alternatives a user can still add.
+    """
+    return cached('facets', (filters_key(filters), tag_limit), lambda: _load_facets(filters, tag_limit))
+
+
+def _load_facets(filters, tag_limit):
+    tag_filters = dict(filters, tags=[])
+    vertical_filters = dict(filters, verticals=[])
+    
+    tag_counts = (
+        db.session.query(Tag.name, db.func.count(project_tags.c.project_id).label('count'))
+        .join(project_tags, project_tags.c.tag_id == Tag.id)
+        .group_by(Tag.name)
+        .order_by(db.desc('count'), Tag.name)
+    )
+    if tag_filters.get('verticals') or tag_filters.get('q'):
+        matching = apply_filters(db.select(Project.id), tag_filters)
+        tag_counts = tag_counts.filter(project_tags.c.project_id.in_(matching))
+    
+    vertical_counts = apply_filters(
+        db.session.query(Project.business_vertical, db.func.count(Project.id)),
+        vertical_filters
+    ).group_by(Project.business_vertical).order_by(Project.business_vertical)
+    
+    return {
+        'tags': [{'name': name, 'count': count} for name, count in tag_counts.limit(tag_limit)],
+        'verticals': [{'name': name, 'count': count} for name, count in vertical_counts if name],
+    }
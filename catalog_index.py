@@ -0,0 +1,192 @@
+"""
+In-process indexes over the projects table, kept current in every worker
+
+Base class for the indexes each worker keeps in memory (autocomplete.py,
+fuzzy_search.py). An index is built on first use (gunicorn warms it in
+post_worker_init), updated in place after each ORM commit that touches a
+Project, and checked against the catalog version on every lookup. When
+another worker or a Core bulk write changed the catalog, it catches up from
+projects.updated_at and project_tombstones, and rebuilds if the project
+count still disagrees or a restore was logged (restore_log) in between.
+"""
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from models import db, Project, ProjectTombstone, CatalogVersion, RestoreLog
+from cache import CATALOG_VERSION_ID, current_catalog_version
+
+CATCH_UP_OVERLAP = timedelta(minutes=5)  # clock skew between workers
+RESULT_CACHE_SIZE = 2048                 # memoized lookups, dropped on any change
+BUILD_BATCH_SIZE = 1000
+
+CATALOG_INDEXES = []
+
+
+def register_index(index):
+    """Keep an index current with the session's commits"""
+    CATALOG_INDEXES.append(index)
+    return index
+
+
+def _read_version():
+    return db.session.query(CatalogVersion.version).filter_by(id=CATALOG_VERSION_ID).scalar() or 0
+
+
+class CatalogIndex:
+    """Subclasses set columns and implement _load, _set_project and _remove_project
+
+    Rows and field tuples passed to them follow `columns` (Project
+    attributes, without the id). _set_project / _remove_project run under
+    self._lock; _load builds new structures and swaps them in under it.
+    """
+    columns = []
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._projects = {}  # project id -> whatever the subclass needs to remove it
+        self._results = {}   # memoized lookups
+        self.version = None    # catalog version the index reflects
+        self.synced_at = None  # utcnow() of the last read from the database
+        self.restore_id = None  # newest restore_log id at the last build
+        self.built = False
+
+    def _load(self, rows):
+        raise NotImplementedError
+
+    def _set_project(self, project_id, fields):
+        raise NotImplementedError
+
+    def _remove_project(self, project_id):
+        raise NotImplementedError
+
+    def fields_of(self, project):
+        return tuple(getattr(project, column.key) for column in self.columns)
+
+    def memoized(self, key, compute):
+        """Result of compute() for key, until the index changes"""
+        with self._lock:
+            results = self._results.get(key)
+            if results is None:
+                results = compute()
+                if len(self._results) >= RESULT_CACHE_SIZE:
+                    self._results = {}
+                self._results[key] = results
+            return results
+
+    # --- Loading ---------------------------------------------------------------
+
+    def load(self, rows, version=None, synced_at=None, restore_id=None):
+        """Replace the contents with (id, *columns) rows"""
+        self._load(rows)
+        with self._lock:
+            self._results = {}
+            self.version, self.synced_at, self.restore_id, self.built = version, synced_at, restore_id, True
+
+    def build(self):
+        """Read every project from the database (inside an app context)"""
+        # Version first: a write that lands during the read only makes the
+        # index look older than it is, and the next lookup catches up
+        version = _read_version()
+        restore_id = RestoreLog.latest_id()
+        synced_at = datetime.utcnow()
+        rows = db.session.execute(
+            select(Project.id, *self.columns).execution_options(yield_per=BUILD_BATCH_SIZE)
+        )
+        self.load(rows, version, synced_at, restore_id)
+
+    def catch_up(self):
+        """Apply projects changed (or deleted) since the last sync; rebuild if still inconsistent"""
+        if RestoreLog.latest_id() != self.restore_id:
+            # Restored projects keep their old updated_at
+            self.build()
+            return
+        version = _read_version()
+        since = self.synced_at - CATCH_UP_OVERLAP
+        synced_at = datetime.utcnow()
+        deleted = db.session.execute(
+            select(ProjectTombstone.project_id).where(ProjectTombstone.deleted_at >= since)
+        ).scalars().all()
+        rows = db.session.execute(select(Project.id, *self.columns).where(Project.updated_at >= since)).all()
+        count = db.session.query(db.func.count(Project.id)).scalar()
+
+        with self._lock:
+            for project_id in deleted:
+                self._remove_project(project_id)
+            for project_id, *fields in rows:
+                self._set_project(project_id, fields)
+            self._results = {}
+            consistent = len(self._projects) == count
+            if consistent:
+                self.version, self.synced_at = version, synced_at
+        if not consistent:
+            # e.g. a backfill that kept updated_at
+            self.build()
+
+    def ensure_current(self):
+        """Build or catch up if the catalog version moved; serves the old index while another thread does"""
+        version = current_catalog_version()
+        if self.built and self.version == version:
+            return
+        if not self._refresh_lock.acquire(blocking=not self.built):
+            return
+        try:
+            if not self.built:
+                self.build()
+            elif self.version != version:
+                self.catch_up()
+        finally:
+            self._refresh_lock.release()
+
+    def apply(self, changes, version=None):
+        """Apply {project id: field tuple, or None if deleted} from a local commit"""
+        with self._lock:
+            if not self.built:
+                return
+            for project_id, fields in changes.items():
+                if fields is None:
+                    self._remove_project(project_id)
+                else:
+                    self._set_project(project_id, fields)
+            self._results = {}
+            # Only if nothing else was committed since the index was synced
+            if version is not None and self.version == version - 1:
+                self.version = version
+
+
+@event.listens_for(db.session, 'after_flush')
+def _capture_project_changes(session, flush_context):
+    """Remember the fields of flushed projects until the transaction commits"""
+    changes = {}
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Project) and obj.id is not None:
+            changes[obj.id] = [index.fields_of(obj) for index in CATALOG_INDEXES]
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            changes[obj.id] = None
+    if not changes:
+        return
+    session.info.setdefault('catalog_index_changes', {}).update(changes)
+    if 'catalog_index_version' not in session.info:
+        # The catalog version this transaction bumped to (cache.py, before_flush)
+        session.info['catalog_index_version'] = session.execute(
+            select(CatalogVersion.version).where(CatalogVersion.id == CATALOG_VERSION_ID)
+        ).scalar()
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_project_changes(session):
+    changes = session.info.pop('catalog_index_changes', None)
+    version = session.info.pop('catalog_index_version', None)
+    if not changes:
+        return
+    for i, index in enumerate(CATALOG_INDEXES):
+        index.apply({
+            project_id: None if fields is None else fields[i] for project_id, fields in changes.items()
+        }, version)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_project_changes(session):
+    session.info.pop('catalog_index_changes', None)
+    session.info.pop('catalog_index_version', None)
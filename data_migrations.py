@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Chunked, resumable in-place data migrations
+
+A data migration rewrites rows of the projects table while the app keeps
+serving. Rows are read in primary-key order (keyset batches, never OFFSET)
+and each batch is transformed and written in its own short transaction
+together with a checkpoint in data_migration_state, so an interrupted run
+resumes from the last committed batch and memory use stays at one batch.
+
+Online backfills follow expand / backfill: prepare() only makes additive
+changes (e.g. ADD COLUMN), the app's write path fills the new shape for rows
+it touches, and the batches convert everything else. Batches leave
+updated_at alone (the landing page order does not change), so take a full
+backup_store.py snapshot (a new store) after a migration that rewrites rows.
+
+Usage:
+    python data_migrations.py list
+    python data_migrations.py run <name> [--dry-run] [--batch-size 500] [--sleep 0.05]
+    python data_migrations.py run <name> --restart     # ignore the checkpoint
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from sqlalchemy import bindparam, column, inspect, select
+from models import db, Project, DataMigrationState, STAKEHOLDER_ROLES
+from doc_types import annotate_docs
+from cache import bump_catalog_version
+
+DEFAULT_BATCH_SIZE = 500
+DOC_COLUMNS = ['core_docs', 'design_docs', 'analytics_docs', 'other_docs']
+
+DATA_MIGRATIONS = {}
+
+
+def register(cls):
+    DATA_MIGRATIONS[cls.name] = cls()
+    return cls
+
+
+class DataMigration:
+    """Base class: subclasses set name / columns and implement transform()"""
+    name = None
+    description = ''
+    columns = []
+    batch_size = DEFAULT_BATCH_SIZE
+
+    def prepare(self, conn):
+        """Additive, idempotent schema changes run before the first batch"""
+
+    def select_columns(self, conn):
+        return list(self.columns)
+
+    def transform(self, rows):
+        """Return a list of {'id': ..., column: new value} for rows that change"""
+        raise NotImplementedError
+
+
+# --- Migrations ----------------------------------------------------------------
+
+@register
+class AnnotateDocTypes(DataMigration):
+    name = 'annotate_doc_types'
+    description = 'store type / embed_url on doc entries saved before doc_types.py'
+    columns = DOC_COLUMNS
+
+    def transform(self, rows):
+        updates = []
+        for row in rows:
+            changed = {}
+            for field in DOC_COLUMNS:
+                docs = getattr(row, field) or []
+                if any('type' not in doc for doc in docs):
+                    changed[field] = annotate_docs(docs)
+            if changed:
+                updates.append(dict(changed, id=row.id))
+        return updates
+
+
+def _categorize(name):
+    lowered = name.lower()
+    if any(term in lowered for term in ['prd', 'brd', 'trd', 'spec', 'requirement']):
+        return 'core_docs'
+    if any(term in lowered for term in ['figma', 'miro', 'design', 'wireframe', 'mockup']):
+        return 'design_docs'
+    if any(term in lowered for term in ['analytics', 'ga', 'event', 'dashboard', 'metric']):
+        return 'analytics_docs'
+    return 'other_docs'
+
+
+def _loads(value, default):
+    if isinstance(value, str):
+        try:
+            return json.loads(value) if value else default
+        except ValueError:
+            return default
+    return default if value is None else value
+
+
+@register
+class LegacyProjectShape(DataMigration):
+    """In-place version of migrate_schema_v2.py
+
+    Splits the legacy `documents` column into the four doc lists and turns
+    plain-string stakeholders into {"name", "email"} entries. The legacy
+    column is left in place; drop it once nothing reads it any more.
+    """
+    name = 'legacy_project_shape'
+    description = 'split legacy documents into doc lists; stakeholder strings -> objects'
+
+    def select_columns(self, conn):
+        # Schema migration 1 adds the missing doc / relation columns; a dry run
+        # before that reads whatever exists
+        existing = {c['name'] for c in inspect(conn).get_columns('projects')}
+        return [c for c in ['stakeholders', 'documents'] + DOC_COLUMNS + ['related_projects'] if c in existing]
+
+    def transform(self, rows):
+        updates = []
+        for row in rows:
+            changed = {}
+
+            stakeholders = _loads(row.stakeholders, {})
+            if isinstance(stakeholders, dict):
+                fixed = {
+                    role: [m if isinstance(m, dict) else {'name': m, 'email': ''} for m in stakeholders.get(role) or []]
+                    for role in dict.fromkeys(STAKEHOLDER_ROLES + list(stakeholders))
+                }
+                if fixed != stakeholders:
+                    changed['stakeholders'] = fixed
+
+            documents = _loads(getattr(row, 'documents', None), {})
+            has_docs = any(_loads(getattr(row, field, None), []) for field in DOC_COLUMNS)
+            if isinstance(documents, dict) and documents and not has_docs:
+                split = {field: [] for field in DOC_COLUMNS}
+                for key, doc in documents.items():
+                    name = doc.get('name', key) if isinstance(doc, dict) else key
+                    url = doc.get('url', doc) if isinstance(doc, dict) else doc
+                    split[_categorize(name)].append({'name': name, 'url': url})
+                changed.update({field: annotate_docs(docs) for field, docs in split.items()})
+            elif not has_docs:
+                changed.update({field: [] for field in DOC_COLUMNS if getattr(row, field, None) is None})
+
+            if getattr(row, 'related_projects', None) is None:
+                changed['related_projects'] = []
+
+            if changed:
+                updates.append(dict(changed, id=row.id))
+        return updates
+
+
+# --- Engine --------------------------------------------------------------------
+
+def _column(name):
+    table = Project.__table__
+    return table.c[name] if name in table.c else column(name)
+
+
+def _write(conn, updates):
+    """executemany UPDATE, grouped by the set of columns each row changes"""
+    table = Project.__table__
+    groups = {}
+    for update in updates:
+        groups.setdefault(tuple(sorted(k for k in update if k != 'id')), []).append(update)
+    for fields, group in groups.items():
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam('_id'))
+            .values({field: bindparam(f'_v_{field}', type_=_column(field).type) for field in fields})
+        )
+        conn.execute(stmt, [
+            dict({f'_v_{field}': update[field] for field in fields}, _id=update['id']) for update in group
+        ])
+
+
+def _checkpoint(conn, name, last_id, rows_done, rows_changed, completed=False):
+    table = DataMigrationState.__table__
+    now = datetime.utcnow()
+    values = {'last_id': last_id, 'rows_done': rows_done, 'rows_changed': rows_changed, 'updated_at': now}
+    if completed:
+        values['completed_at'] = now
+    conn.execute(table.update().where(table.c.name == name).values(**values))
+
+
+def load_state(name):
+    if not inspect(db.engine).has_table(DataMigrationState.__tablename__):
+        return None
+    return db.session.get(DataMigrationState, name)
+
+
+def run_data_migration(migration, batch_size=None, dry_run=False, sleep=0.0, max_batches=None,
+                       restart=False, progress=None):
+    """Run (or resume) a data migration; returns a report dict
+
+    Must run inside an app context. With dry_run nothing is written (not even
+    the checkpoint) and the report estimates the time for a real run.
+    """
+    batch_size = batch_size or migration.batch_size
+    table = Project.__table__
+
+    state = load_state(migration.name)
+    if state and state.completed_at and not restart:
+        return {'name': migration.name, 'status': 'already complete', 'rows_done': state.rows_done}
+
+    if not dry_run:
+        with db.engine.begin() as conn:
+            migration.prepare(conn)
+            if state is None:
+                conn.execute(DataMigrationState.__table__.insert().values(name=migration.name))
+            elif restart:
+                _checkpoint(conn, migration.name, 0, 0, 0)
+                conn.execute(DataMigrationState.__table__.update()
+                             .where(DataMigrationState.name == migration.name)
+                             .values(completed_at=None, started_at=datetime.utcnow()))
+        db.session.expire_all()
+
+    resume = state if state and not restart else None
+    last_id = resume.last_id if resume else 0
+    rows_done = resume.rows_done if resume else 0
+    rows_changed = resume.rows_changed if resume else 0
+
+    with db.engine.connect() as conn:
+        names = migration.select_columns(conn)
+        remaining = conn.execute(select(db.func.count()).select_from(table).where(table.c.id > last_id)).scalar()
+    stmt_columns = [table.c.id] + [_column(name) for name in names]
+
+    started = time.perf_counter()
+    scanned = changed = batches = 0
+    while max_batches is None or batches < max_batches:
+        with db.engine.begin() as conn:
+            rows = conn.execute(
+                select(*stmt_columns).select_from(table)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            updates = migration.transform(rows)
+            last_id = rows[-1].id
+            scanned += len(rows)
+            changed += len(updates)
+            if not dry_run:
+                if updates:
+                    _write(conn, updates)
+                    bump_catalog_version(conn)
+                _checkpoint(conn, migration.name, last_id, rows_done + scanned, rows_changed + changed)
+        batches += 1
+
+        elapsed = time.perf_counter() - started
+        rate = scanned / elapsed if elapsed else 0
+        if progress:
+            eta = (remaining - scanned) / rate if rate else 0
+            progress(f"  ✓ {scanned}/{remaining} rows ({changed} changed), {rate:.0f} rows/s, ETA {eta:.0f}s")
+        if sleep:
+            time.sleep(sleep)
+
+    finished = max_batches is None or batches < max_batches
+    if finished and not dry_run:
+        with db.engine.begin() as conn:
+            _checkpoint(conn, migration.name, last_id, rows_done + scanned, rows_changed + changed, completed=True)
+
+    elapsed = time.perf_counter() - started
+    rate = scanned / elapsed if elapsed else None
+    report = {
+        'name': migration.name,
+        'status': 'dry run' if dry_run else ('complete' if finished else 'paused'),
+        'resumed_from': resume.last_id if resume else None,
+        'rows_scanned': scanned,
+        'rows_changed': changed,
+        'last_id': last_id,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rate, 1) if rate else None,
+    }
+    if dry_run and rate:
+        # Writes and the sleep between batches are not part of a dry run
+        report['estimated_seconds'] = round(remaining / rate + (remaining / batch_size) * sleep, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chunked, resumable data migrations')
+    parser.add_argument('command', choices=['list', 'run'])
+    parser.add_argument('name', nargs='?')
+    parser.add_argument('--batch-size', type=int)
+    parser.add_argument('--sleep', type=float, default=0.0, help='pause between batches to leave room for traffic')
+    parser.add_argument('--max-batches', type=int, help='stop after this many batches (resume later)')
+    parser.add_argument('--dry-run', action='store_true', help='transform without writing; estimate run time')
+    parser.add_argument('--restart', action='store_true', help='start over instead of resuming')
+    args = parser.parse_args()
+
+    from app import app
+    from migrations import ensure_schema
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Data Migrations")
+    print("=" * 60)
+    print()
+
+    with app.app_context():
+        ensure_schema()
+        if args.command == 'list':
+            for name, migration in DATA_MIGRATIONS.items():
+                state = load_state(name)
+                if state is None:
+                    status = 'not started'
+                elif state.completed_at:
+                    status = f'complete ({state.rows_done} rows, {state.rows_changed} changed)'
+                else:
+                    status = f'in progress at id {state.last_id}'
+                print(f"  {name:<24} {status}")
+                print(f"  {'':<24} {migration.description}")
+            return 0
+
+        migration = DATA_MIGRATIONS.get(args.name)
+        if migration is None:
+            parser.error(f"unknown migration {args.name!r}; see `python data_migrations.py list`")
+
+        print(f"🔧 {migration.name}{' (dry run)' if args.dry_run else ''}")
+        report = run_data_migration(
+            migration, batch_size=args.batch_size, dry_run=args.dry_run, sleep=args.sleep,
+            max_batches=args.max_batches, restart=args.restart, progress=print
+        )
+
+    print(f"\n✅ {report['status']}: {report.get('rows_scanned', report.get('rows_done'))} rows scanned, "
+          f"{report.get('rows_changed', 0)} changed")
+    if report.get('resumed_from'):
+        print(f"   Resumed after id {report['resumed_from']}")
+    if report.get('rows_per_second'):
+        print(f"   {report['seconds']}s ({report['rows_per_second']} rows/s)")
+    if 'estimated_seconds' in report:
+        print(f"   Estimated full run: {report['estimated_seconds']}s")
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Document type registry
+
+Each document URL is classified by a registry of precompiled matchers
+(Google Docs / Sheets / Slides / Drive, Looker Studio, Looker, Figma, Notion,
+Miro). The type and embed URL are computed once when a project is written
+and stored on each doc entry ({"name", "url", "type", "embed_url"}); docs
+saved before that are classified on read through an LRU-cached fast path.
+
+New document types are added with register_doc_type(). Patterns are
+anchored to an https:// URL on the service's host (see https_url), and an
+embed URL is only ever handed out if it is https://, because it ends up as
+an iframe src.
+"""
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+LINK = {'type': 'link', 'embed_url': None, 'icon': 'link'}
+
+_DOC_TYPES = []
+_ICONS = {'link': 'link'}
+
+
+class DocType:
+    """One matcher: a compiled URL pattern plus how to build the embed URL
+
+    `hint` is a lowercase substring every matching URL contains; it is
+    checked before the regex so non-matching types cost a substring test.
+    `embed` is a format string filled with the pattern's groups ({0}, {1}...)
+    and {url} (the URL-quoted original), or None if the type is link-only.
+    """
+
+    def __init__(self, type, hint, pattern, embed=None, icon=None):
+        self.type = type
+        self.hint = hint
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.embed = embed
+        self.quotes_url = bool(embed) and '{url}' in embed
+        self.icon = icon or type.replace('_', '-')
+
+    def match(self, url, lowered):
+        if self.hint not in lowered:
+            return None
+        match = self.pattern.search(url)
+        if not match:
+            return None
+        embed_url = None
+        if self.embed:
+            quoted = quote(url, safe='') if self.quotes_url else None
+            embed_url = safe_embed_url(self.embed.format(*match.groups(), url=quoted))
+        return {'type': self.type, 'embed_url': embed_url, 'icon': self.icon}
+
+
+def https_url(host, path=''):
+    """Pattern for an https:// URL on host (or a subdomain of it), followed by path"""
+    return r'^https://(?:[\w-]+\.)*' + re.escape(host) + '/' + path
+
+
+def safe_embed_url(embed_url):
+    """The embed URL if it is https://, else None (it is rendered as an iframe src)"""
+    return embed_url if embed_url and embed_url.startswith('https://') else None
+
+
+@lru_cache(maxsize=4096)
+def _classify(url):
+    lowered = url.lower()
+    for doc_type in _DOC_TYPES:
+        info = doc_type.match(url, lowered)
+        if info:
+            return info
+    return LINK
+
+
+def classify_url(url):
+    """Type / embed URL / icon for a document URL (cached per URL)"""
+    if not url:
+        return dict(LINK)
+    return dict(_classify(url))
+
+
+def register_doc_type(type, hint, pattern, embed=None, icon=None):
+    """Add a matcher; earlier registrations win when several match"""
+    doc_type = DocType(type, hint, pattern, embed, icon)
+    _DOC_TYPES.append(doc_type)
+    _ICONS.setdefault(type, doc_type.icon)
+    _classify.cache_clear()
+
+
+register_doc_type('google_doc', 'docs.google.com/document', https_url('docs.google.com', r'document/(?:u/\d+/)?d/([\w-]+)'),
+                  'https://docs.google.com/document/d/{0}/preview')
+register_doc_type('google_sheet', 'docs.google.com/spreadsheets', https_url('docs.google.com', r'spreadsheets/(?:u/\d+/)?d/([\w-]+)'),
+                  'https://docs.google.com/spreadsheets/d/{0}/preview')
+register_doc_type('google_slides', 'docs.google.com/presentation', https_url('docs.google.com', r'presentation/(?:u/\d+/)?d/([\w-]+)'),
+                  'https://docs.google.com/presentation/d/{0}/embed')
+register_doc_type('google_drive', 'drive.google.com/file', https_url('drive.google.com', r'file/(?:u/\d+/)?d/([\w-]+)'),
+                  'https://drive.google.com/file/d/{0}/preview')
+register_doc_type('looker_studio', '.google.com', r'^https://(?:lookerstudio|datastudio)\.google\.com/(?:u/\d+/)?reporting/([\w-]+)',
+                  'https://lookerstudio.google.com/embed/reporting/{0}')
+register_doc_type('looker', '.looker.com/dashboards', r'^(https://(?:[\w-]+\.)+looker\.com)/dashboards/([\w:-]+)',
+                  '{0}/embed/dashboards/{1}')
+register_doc_type('figma', 'figma.com/', https_url('figma.com'),
+                  'https://www.figma.com/embed?embed_host=share&url={url}')
+# Notion pages embed as themselves; rebuilt from the matched host and path only
+register_doc_type('notion', 'notion.', r'^https://((?:[\w-]+\.)*notion\.(?:so|site))(/[\w/.~%-]*)',
+                  'https://{0}{1}')
+register_doc_type('miro', 'miro.com/app/board/', https_url('miro.com', r'app/board/([\w=-]+)'),
+                  'https://miro.com/app/live-embed/{0}/')
+
+
+def get_document_embed_info(doc):
+    """Embed info for a doc entry (stored at write time) or a bare URL"""
+    if isinstance(doc, dict):
+        if 'type' in doc:
+            # Entries stored before the matchers were anchored may hold any string
+            embed_url = doc.get('embed_url')
+            if embed_url and not embed_url.startswith('https://'):
+                embed_url = None
+            return {'type': doc['type'], 'embed_url': embed_url, 'icon': _ICONS.get(doc['type'], 'link')}
+        doc = doc.get('url')
+    return classify_url(doc)
+
+
+def annotate_docs(docs):
+    """Doc entries with their type and embed URL filled in (write path)"""
+    annotated = []
+    for doc in docs or []:
+        info = classify_url(doc.get('url'))
+        annotated.append(dict(doc, type=info['type'], embed_url=info['embed_url']))
+    return annotated
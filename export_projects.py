@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Streaming NDJSON export of projects
+
+Rows are read through a streaming cursor (yield_per; a server-side cursor on
+PostgreSQL) and written one JSON line at a time, optionally gzip-compressed
+on the fly, so memory use stays flat however large the catalog is.
+
+Used by GET /api/projects/export and from the command line:
+
+    python export_projects.py -o projects.ndjson.gz --gzip
+    python export_projects.py --since 2025-01-01 --fields id,name,tags
+"""
+import argparse
+import json
+import sys
+import zlib
+from datetime import datetime, timezone
+from models import db, Project
+
+EXPORT_FIELDS = [
+    'id', 'name', 'summary', 'business_vertical', 'product_manager', 'stakeholders',
+    'core_docs', 'design_docs', 'analytics_docs', 'other_docs', 'tags', 'related_projects',
+    'created_at', 'updated_at'
+]
+
+STREAM_BATCH_SIZE = 500
+
+
+def parse_fields(value):
+    """Validate a comma-separated field list; None means every field"""
+    if not value:
+        return list(EXPORT_FIELDS)
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def naive_utc(value):
+    """Naive UTC, as the timestamp columns store it; aware values are converted first"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_since(value):
+    """Parse an ISO date or datetime; None if not given"""
+    if not value:
+        return None
+    return naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def iter_export_lines(since=None, fields=None):
+    """Yield one NDJSON line (str) per project, oldest id first"""
+    fields = fields or list(EXPORT_FIELDS)
+    stmt = db.select(*[getattr(Project, f) for f in fields]).order_by(Project.id)
+    if since:
+        stmt = stmt.where(Project.updated_at >= since)
+
+    # Core rows (not ORM objects) so nothing accumulates in the identity map
+    result = db.session.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+    for row in result:
+        yield json.dumps(dict(zip(fields, row)), default=_json_default, ensure_ascii=False) + '\n'
+
+
+def iter_gzip(lines, level=6):
+    """Gzip-compress a stream of text lines on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line.encode('utf-8'))
+        size += len(buffer[-1])
+        if size >= 64 * 1024:
+            chunk = compressor.compress(b''.join(buffer))
+            buffer, size = [], 0
+            if chunk:
+                yield chunk
+    chunk = compressor.compress(b''.join(buffer))
+    if chunk:
+        yield chunk
+    yield compressor.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream projects as NDJSON')
+    parser.add_argument('-o', '--output', default='-', help="output file ('-' for stdout)")
+    parser.add_argument('--since', help='only projects updated at or after this ISO date/datetime')
+    parser.add_argument('--fields', help=f"comma-separated subset of: {','.join(EXPORT_FIELDS)}")
+    parser.add_argument('--gzip', action='store_true', help='gzip-compress the output')
+    args = parser.parse_args()
+
+    try:
+        fields = parse_fields(args.fields)
+        since = parse_since(args.since)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from app import app
+
+    if args.output == '-':
+        out = sys.stdout.buffer
+    else:
+        out = open(args.output, 'wb')
+
+    count = 0
+    with app.app_context():
+        lines = iter_export_lines(since=since, fields=fields)
+
+        def counted(lines):
+            nonlocal count
+            for line in lines:
+                count += 1
+                yield line
+
+        if args.gzip:
+            for chunk in iter_gzip(counted(lines)):
+                out.write(chunk)
+        else:
+            for line in counted(lines):
+                out.write(line.encode('utf-8'))
+
+    if out is not sys.stdout.buffer:
+        out.close()
+        print(f"✅ Exported {count} projects to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
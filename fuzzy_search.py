@@ -0,0 +1,422 @@
+"""
+Typo-tolerant (trigram) search for projects
+
+PostgreSQL: pg_trgm GIN indexes on name, tags, product manager, business
+vertical and summary; matches use the word-similarity operator (<%), so
+"inspecton" still finds "Vehicle Inspection System" and "priya" the
+projects Priya Sharma manages.
+SQLite, or PostgreSQL without the pg_trgm extension: every worker keeps an
+in-process trigram index over the words of those fields (a
+catalog_index.CatalogIndex). Each query word is matched against the
+vocabulary by trigram similarity, and the matched words' posting lists give
+the projects.
+
+Both paths score a project by its best field: similarity x field weight
+(name > tags > product manager > business vertical > summary). A project matches when one of its fields reaches
+the similarity threshold.
+"""
+import heapq
+import re
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain
+from markupsafe import escape
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from models import db, Project
+from catalog_index import CatalogIndex, register_index
+
+# By decreasing weight; TrigramIndex._search stops at the first field that can't rank
+FIELDS = ['name', 'tags', 'product_manager', 'business_vertical', 'summary']
+FIELD_WEIGHTS = {'name': 1.0, 'tags': 0.7, 'product_manager': 0.6, 'business_vertical': 0.5, 'summary': 0.4}
+
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_LIMIT = 20
+MAX_QUERY_WORDS = 8
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+POSTGRES_TRGM_INDEXES = {
+    'ix_projects_name_trgm': 'CREATE INDEX IF NOT EXISTS ix_projects_name_trgm ON projects USING GIN (name gin_trgm_ops)',
+    'ix_projects_tags_trgm': 'CREATE INDEX IF NOT EXISTS ix_projects_tags_trgm ON projects USING GIN ((tags::text) gin_trgm_ops)',
+    'ix_projects_summary_trgm': 'CREATE INDEX IF NOT EXISTS ix_projects_summary_trgm ON projects USING GIN (summary gin_trgm_ops)',
+    'ix_projects_product_manager_trgm':
+        'CREATE INDEX IF NOT EXISTS ix_projects_product_manager_trgm ON projects USING GIN (product_manager gin_trgm_ops)',
+    'ix_projects_business_vertical_trgm':
+        'CREATE INDEX IF NOT EXISTS ix_projects_business_vertical_trgm ON projects USING GIN (business_vertical gin_trgm_ops)',
+}
+
+_pg_trgm_installed = None
+
+
+def install_trigram_indexes(conn):
+    """Create pg_trgm and its GIN indexes on PostgreSQL (used by migrations.py)
+
+    Returns False if the extension can't be created (e.g. a managed database
+    without the privilege); search then falls back to the in-process index.
+    """
+    global _pg_trgm_installed
+    if conn.dialect.name != 'postgresql':
+        return False
+    try:
+        with conn.begin_nested():
+            conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    except DBAPIError as e:
+        print(f"  ⚠️  pg_trgm is not available ({e.orig}); fuzzy search will use the in-process index")
+        return False
+    for statement in POSTGRES_TRGM_INDEXES.values():
+        conn.execute(text(statement))
+    _pg_trgm_installed = True
+    return True
+
+
+def uses_trigram_index():
+    """True if fuzzy search runs on this worker's in-process index"""
+    global _pg_trgm_installed
+    if db.engine.dialect.name != 'postgresql':
+        return True
+    if _pg_trgm_installed is None:
+        _pg_trgm_installed = db.session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first() is not None
+    return not _pg_trgm_installed
+
+
+def _words(value):
+    return _WORD_RE.findall(value.casefold()) if value else []
+
+
+def trigrams(word):
+    """pg_trgm's trigrams of one word: padded with two spaces in front and one behind"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Shared trigrams over all trigrams of two words, as pg_trgm's similarity()"""
+    a, b = trigrams(a), trigrams(b)
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _contains(posting, project_id):
+    i = bisect_left(posting, project_id)
+    return i < len(posting) and posting[i] == project_id
+
+
+def _field_words(name, tags, product_manager, business_vertical, summary):
+    """Distinct words of each field, in FIELDS order"""
+    tag_words = chain.from_iterable(_words(tag) for tag in tags or [] if isinstance(tag, str))
+    return [set(_words(name)), set(tag_words), set(_words(product_manager)), set(_words(business_vertical)),
+            set(_words(summary))]
+
+
+class TrigramIndex(CatalogIndex):
+    """Word-level trigram index: trigram -> vocabulary words -> projects per field
+
+    Posting lists are arrays of project ids kept sorted, so an update finds
+    a project with bisect and ties rank by id without sorting. Each project
+    keeps an array of its word ids (word id * len(FIELDS) + field) to leave its
+    postings again. Vocabulary words are only dropped by a rebuild; one no
+    project uses any more just has no postings.
+    """
+    columns = [Project.name, Project.tags, Project.product_manager, Project.business_vertical, Project.summary]
+
+    def __init__(self):
+        super().__init__()
+        self._vocabulary = {}     # word -> word id
+        self._gram_counts = []    # word id -> number of trigrams
+        self._gram_words = {}     # trigram -> array of word ids
+        self._postings = [{} for _ in FIELDS]  # per field: word id -> sorted array of project ids
+
+    def __len__(self):
+        return len(self._projects)
+
+    # --- Loading ----------------------------------------------------------------
+
+    def _word_id(self, word):
+        word_id = self._vocabulary.get(word)
+        if word_id is None:
+            word_id = self._vocabulary[word] = len(self._gram_counts)
+            grams = trigrams(word)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                ids = self._gram_words.get(gram)
+                if ids is None:
+                    ids = self._gram_words[gram] = array('l')
+                ids.append(word_id)
+        return word_id
+
+    def _project_words(self, fields):
+        """[(field, word id)] of one project"""
+        return [
+            (field, self._word_id(word))
+            for field, words in enumerate(_field_words(*fields)) for word in words
+        ]
+
+    def _load(self, rows):
+        loaded = TrigramIndex()  # built aside, then swapped in
+        postings, projects = loaded._postings, loaded._projects
+        for project_id, *fields in rows:
+            own = loaded._project_words(fields)
+            for field, word_id in own:
+                posting = postings[field].get(word_id)
+                if posting is None:
+                    posting = postings[field][word_id] = array('l')
+                posting.append(project_id)
+            projects[project_id] = array('l', (word_id * len(FIELDS) + field for field, word_id in own))
+        for field_postings in postings:
+            for word_id, posting in field_postings.items():
+                field_postings[word_id] = array('l', sorted(posting))
+        with self._lock:
+            self._vocabulary, self._gram_counts = loaded._vocabulary, loaded._gram_counts
+            self._gram_words, self._postings, self._projects = loaded._gram_words, postings, projects
+
+    # --- Incremental updates -------------------------------------------------
+
+    def _remove_project(self, project_id):
+        for key in self._projects.pop(project_id, ()):
+            word_id, field = divmod(key, len(FIELDS))
+            posting = self._postings[field].get(word_id)
+            if posting is None:
+                continue
+            i = bisect_left(posting, project_id)
+            if i < len(posting) and posting[i] == project_id:
+                del posting[i]
+            if not posting:
+                del self._postings[field][word_id]
+
+    def _set_project(self, project_id, fields):
+        self._remove_project(project_id)
+        own = self._project_words(fields)
+        for field, word_id in own:
+            posting = self._postings[field].get(word_id)
+            if posting is None:
+                posting = self._postings[field][word_id] = array('l')
+            insort(posting, project_id)
+        self._projects[project_id] = array('l', (word_id * len(FIELDS) + field for field, word_id in own))
+
+    # --- Lookups -------------------------------------------------------------
+
+    def similar_words(self, word, threshold):
+        """[(similarity, word id)] for vocabulary words at least threshold similar to word"""
+        grams = trigrams(word)
+        shared_counts = Counter(chain.from_iterable(self._gram_words.get(gram, ()) for gram in grams))
+        gram_counts = self._gram_counts
+        matches = []
+        for word_id, shared in shared_counts.items():
+            score = shared / (len(grams) + gram_counts[word_id] - shared)
+            if score >= threshold:
+                matches.append((score, word_id))
+        return matches
+
+    def search(self, query, threshold=DEFAULT_THRESHOLD, limit=DEFAULT_LIMIT):
+        """[(project id, score, matched field)], best first, ties by id"""
+        words = query_words(query)
+        if not words:
+            return []
+        return self.memoized((words, threshold, limit), lambda: self._search(words, threshold, limit))
+
+    def _search(self, words, threshold, limit):
+        matches = [self.similar_words(word, threshold) for word in words]
+        if len(words) == 1:
+            return self._search_word(matches[0], limit)
+
+        # A field's similarity is the mean, over the query words, of its
+        # best-matching word for each. Fields go by decreasing weight, and
+        # one whose weight can't beat the current top `limit` is skipped.
+        scored = {}
+        for field, postings in enumerate(self._postings):
+            weight, name = FIELD_WEIGHTS[FIELDS[field]], FIELDS[field]
+            if len(scored) >= limit and weight < heapq.nlargest(limit, scored.values())[-1][0]:
+                break
+            totals = {}
+            for word_matches in matches:
+                best = {}
+                for score, word_id in sorted(word_matches):
+                    # Ascending, so the best similarity overwrites
+                    best.update(dict.fromkeys(postings.get(word_id, ()), score))
+                for project_id, score in best.items():
+                    totals[project_id] = totals.get(project_id, 0) + score
+            for project_id, total in totals.items():
+                score = total / len(words)
+                if score >= threshold and weight * score > scored.get(project_id, (0,))[0]:
+                    scored[project_id] = (weight * score, name)
+        best = heapq.nlargest(limit, scored.items(), key=lambda item: (item[1][0], -item[0]))
+        return [(project_id, score, field) for project_id, (score, field) in best]
+
+    def _search_word(self, matches, limit):
+        """One query word: walk (field, word) postings from the best weighted score down
+
+        Every project in a posting gets that posting's score, so this stops
+        as soon as `limit` projects are ranked instead of scoring them all.
+        """
+        groups = {}
+        for score, word_id in matches:
+            for field, postings in enumerate(self._postings):
+                posting = postings.get(word_id)
+                if posting:
+                    weighted = round(FIELD_WEIGHTS[FIELDS[field]] * score, 6)
+                    groups.setdefault(weighted, []).append((field, posting))
+
+        ranked, seen = [], set()
+        for weighted in sorted(groups, reverse=True):
+            group = groups[weighted]
+            fresh = set(chain.from_iterable(posting for _, posting in group)).difference(seen)
+            for project_id in heapq.nsmallest(limit - len(ranked), fresh):
+                field = min(field for field, posting in group if _contains(posting, project_id))
+                ranked.append((project_id, weighted, FIELDS[field]))
+            if len(ranked) >= limit:
+                break
+            seen.update(fresh)
+        return ranked
+
+    def stats(self):
+        with self._lock:
+            return {
+                'built': self.built,
+                'version': self.version,
+                'projects': len(self._projects),
+                'vocabulary': len(self._vocabulary),
+                'trigrams': len(self._gram_words),
+                'memoized_lookups': len(self._results),
+            }
+
+
+trigram_index = register_index(TrigramIndex())
+
+
+# --- Results -------------------------------------------------------------------
+
+def _highlight(value, words, threshold):
+    """HTML-escaped value with the words similar to a query word in <mark> tags"""
+    if not value:
+        return ''
+    parts, last = [], 0
+    for match in _WORD_RE.finditer(value):
+        parts.append(str(escape(value[last:match.start()])))
+        word = match.group()
+        if any(similarity(word.casefold(), query_word) >= threshold for query_word in words):
+            parts.append(f'<mark>{escape(word)}</mark>')
+        else:
+            parts.append(str(escape(word)))
+        last = match.end()
+    parts.append(str(escape(value[last:])))
+    return ''.join(parts)
+
+
+def _snippet(summary, words, threshold, length=100):
+    """About `length` characters of the summary around its first matching word"""
+    summary = summary or ''
+    start = 0
+    for match in _WORD_RE.finditer(summary):
+        if any(similarity(match.group().casefold(), word) >= threshold for word in words):
+            if match.start() > length // 3:
+                # Start at a word boundary a little before the match
+                start = summary.rfind(' ', 0, match.start() - length // 3) + 1
+            break
+    window = summary[start:start + length]
+    snippet = _highlight(window, words, threshold)
+    return ('…' if start else '') + snippet + ('…' if start + length < len(summary) else '')
+
+
+def _truncate(summary, length=100):
+    summary = summary or ''
+    return summary[:length] + '...' if len(summary) > length else summary
+
+
+def query_words(query):
+    """Distinct words of a query (at most MAX_QUERY_WORDS)"""
+    return tuple(dict.fromkeys(_words(query)))[:MAX_QUERY_WORDS]
+
+
+def rows_statement(project_ids):
+    """The columns a result shows, for the projects the in-process index ranked"""
+    return select(
+        Project.id, Project.name, Project.summary, Project.business_vertical, Project.product_manager
+    ).where(Project.id.in_(project_ids))
+
+
+def index_matches(ranked, rows):
+    """(row, score, field) in the index's order, for the ranked projects still in the database"""
+    rows = {row.id: row for row in rows}
+    return [(rows[project_id], score, field) for project_id, score, field in ranked if project_id in rows]
+
+
+def postgres_statements(words, threshold, limit):
+    """[(statement, parameters)] to run in one transaction; the last one returns the matches"""
+    sql = text("""
+        SELECT id, name, summary, business_vertical, product_manager,
+               name_score, tags_score, product_manager_score, business_vertical_score, summary_score
+        FROM (
+            SELECT p.id, p.name, p.summary, p.business_vertical, p.product_manager,
+                   word_similarity(:query, p.name) AS name_score,
+                   word_similarity(:query, p.tags::text) AS tags_score,
+                   word_similarity(:query, coalesce(p.product_manager, '')) AS product_manager_score,
+                   word_similarity(:query, coalesce(p.business_vertical, '')) AS business_vertical_score,
+                   word_similarity(:query, coalesce(p.summary, '')) AS summary_score
+            FROM projects p
+            WHERE :query <% p.name OR :query <% (p.tags::text) OR :query <% p.product_manager
+               OR :query <% p.business_vertical OR :query <% p.summary
+        ) matched
+        ORDER BY GREATEST(:w_name * name_score, :w_tags * tags_score, :w_product_manager * product_manager_score,
+                          :w_business_vertical * business_vertical_score, :w_summary * summary_score) DESC, id
+        LIMIT :limit
+    """)
+    return [
+        # Transaction-local, so pooled connections keep the default
+        (text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+         {'threshold': str(threshold)}),
+        (sql, {
+            'query': ' '.join(words), 'limit': limit,
+            **{f'w_{field}': weight for field, weight in FIELD_WEIGHTS.items()},
+        }),
+    ]
+
+
+def postgres_matches(rows):
+    """(row, score, field) for the rows of postgres_statements(), scored by their best field"""
+    matches = []
+    for row in rows:
+        field, score = max(
+            ((field, FIELD_WEIGHTS[field] * float(getattr(row, f'{field}_score'))) for field in FIELDS),
+            key=lambda item: item[1]
+        )
+        matches.append((row, score, field))
+    return matches
+
+
+def fuzzy_results(matches, words, threshold):
+    """API dicts for (row, score, field) matches"""
+    return [{
+        'id': row.id,
+        'name': row.name,
+        'summary': _truncate(row.summary),
+        'business_vertical': row.business_vertical,
+        'product_manager': row.product_manager,
+        'name_highlighted': _highlight(row.name, words, threshold),
+        'snippet': _snippet(row.summary, words, threshold),
+        'score': round(score, 4),
+        'matched_field': field,
+    } for row, score, field in matches]
+
+
+def fuzzy_search(query, threshold=DEFAULT_THRESHOLD, limit=DEFAULT_LIMIT):
+    """Projects similar to the query, ranked by weighted trigram similarity"""
+    words = query_words(query)
+    if not words:
+        return []
+
+    if uses_trigram_index():
+        trigram_index.ensure_current()
+        ranked = trigram_index.search(query, threshold=threshold, limit=limit)
+        rows = db.session.execute(rows_statement([project_id for project_id, _, _ in ranked])) if ranked else []
+        matches = index_matches(ranked, rows)
+    else:
+        *setup, (sql, params) = postgres_statements(words, threshold, limit)
+        for statement in setup:
+            db.session.execute(*statement)
+        matches = postgres_matches(db.session.execute(sql, params))
+
+    return fuzzy_results(matches, words, threshold)
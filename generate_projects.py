@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Synthetic project catalog generator
+
+Builds any number of projects, reproducibly from --seed, as records in the
+export format (the Project.from_dict fields plus id and timestamps) with
+distributions closer to a real portfolio than uniform noise:
+
+- tag popularity follows a Zipf law: a few tags on most projects, a long tail
+- verticals are skewed (VAS and A2I the largest)
+- 2-15 stakeholders per role, drawn from a people pool that grows with the
+  catalog, where a few people sit on many projects
+- 0-14 docs over the four categories, with every URL type doc_types.py
+  recognises plus plain links
+- related links to earlier projects, mostly in the same vertical
+- created_at spread over --years (more projects recently), updated_at after it
+
+Output is NDJSON (.gz to compress), which restore.py loads as is and
+bulk_import.py imports by name, or a direct load into DATABASE_URL through
+restore.py's bulk loader (ids and timestamps kept). Pass --end to get
+byte-identical output on another day.
+
+Usage:
+    python generate_projects.py --count 100000 -o fixtures/projects_100k.ndjson.gz
+    python generate_projects.py --count 10000 --seed 7 --database [--replace]
+"""
+import argparse
+import gzip
+import itertools
+import json
+import sys
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+from random import Random
+from doc_types import classify_url
+from models import STAKEHOLDER_ROLES
+
+VERTICALS = {'VAS': 30, 'A2I': 22, 'I2P': 15, 'Finance': 10, 'Challan': 8, 'Supply': 8, 'Platform': 7}
+
+# Most popular first; the Zipf weight of a tag is 1 / rank ** TAG_EXPONENT
+TAGS = [
+    'Mobile', 'Web', 'Analytics', 'Payments', 'Operations', 'AI/ML', 'UX', 'Automation', 'Dealers',
+    'Compliance', 'Insurance', 'Warranty', 'Logistics', 'FinTech', 'Data Science', 'Retail', 'Services',
+    'Computer Vision', 'Optimization', 'Pricing', 'Lending', 'Inspection', 'Growth', 'Notifications',
+    'Onboarding', 'Search', 'Reporting', 'Risk', 'KYC', 'Partners', 'Catalog', 'Auctions', 'CRM',
+    'Customer Support', 'Experimentation', 'Security', 'Infrastructure', 'Integrations', 'Refurbishment',
+    'RC Transfer', 'Challan', 'Leads', 'LMS', 'PLL', 'RA allocation', 'Call Center', 'Chatbot',
+    'Recommendations', 'Forecasting', 'Fraud', 'Scheduling', 'Geo', 'Maps', 'Workflow', 'Billing',
+    'Collections', 'Underwriting', 'Documents', 'OCR', 'Vendor Management', 'Procurement', 'Inventory',
+    'SEO', 'Marketing', 'Referrals', 'Loyalty', 'Subscriptions', 'Feedback', 'Accessibility',
+    'Localization', 'Performance', 'Observability', 'Data Platform', 'Reconciliation', 'Audit', 'Hiring',
+]
+TAG_EXPONENT = 1.1
+TAGS_PER_PROJECT = {1: 10, 2: 25, 3: 28, 4: 18, 5: 10, 6: 5, 7: 3, 8: 1}
+
+NAME_PREFIXES = ['Smart', 'Instant', 'Unified', 'Self-serve', 'Automated', 'Dealer', 'Customer', 'Partner',
+                 'Realtime', 'Bulk', 'Mobile', 'Assisted', 'Digital', 'Express', 'Doorstep']
+DOMAINS = ['Inspection', 'Loan', 'Warranty', 'Pricing', 'Auction', 'Challan', 'RC Transfer', 'Insurance',
+           'Payments', 'Lead', 'Logistics', 'Refurbishment', 'Buyback', 'Valuation', 'Checkout', 'Booking',
+           'Delivery', 'Onboarding', 'Catalog', 'Search', 'Test Drive', 'Service', 'Finance', 'Documents']
+NAME_SUFFIXES = ['Portal', 'Engine', 'Service', 'Dashboard', 'Platform', 'Tracker', 'Workflow', 'Assistant',
+                 'API', 'App', 'Console', 'Pipeline', 'Hub', 'Revamp', 'Automation']
+
+VERBS = ['Automates', 'Streamlines', 'Tracks', 'Centralises', 'Speeds up', 'Simplifies', 'Digitises',
+         'Standardises', 'Personalises', 'Monitors']
+AUDIENCES = ['dealers', 'customers', 'ops teams', 'field agents', 'partner banks', 'the finance team',
+             'inspection engineers', 'call center agents', 'city managers', 'channel partners']
+BENEFITS = ['reducing turnaround time', 'cutting manual effort', 'improving conversion',
+            'with real-time visibility', 'with fewer drop-offs', 'lowering cost per transaction',
+            'reducing disputes', 'improving NPS']
+DETAILS = ['Integrates with the CRM and the payments stack.', 'Phase 2 adds vernacular support.',
+           'Built on the shared workflow service.', 'Rolled out city by city.',
+           'Includes an admin console for operations.', 'Uses ML models trained on historical data.',
+           'Replaces a spreadsheet-driven process.', 'Exposes APIs for partner integrations.']
+
+FIRST_NAMES = ['Aarav', 'Aditi', 'Akash', 'Ananya', 'Anjali', 'Arjun', 'Ayesha', 'Deepak', 'Divya', 'Gaurav',
+               'Ishaan', 'Kabir', 'Karan', 'Kavya', 'Meera', 'Mohit', 'Neha', 'Nikhil', 'Pooja', 'Pranav',
+               'Priya', 'Rahul', 'Riya', 'Rohan', 'Sakshi', 'Sameer', 'Sanya', 'Shreya', 'Siddharth', 'Sneha',
+               'Tanvi', 'Varun', 'Vikram', 'Vivek', 'Yash', 'Zoya']
+LAST_NAMES = ['Agarwal', 'Bansal', 'Bhatt', 'Chopra', 'Das', 'Desai', 'Ghosh', 'Gupta', 'Iyer', 'Jain',
+              'Joshi', 'Kapoor', 'Khan', 'Kumar', 'Malhotra', 'Mehta', 'Menon', 'Mishra', 'Nair', 'Patel',
+              'Rao', 'Reddy', 'Saxena', 'Shah', 'Sharma', 'Singh', 'Sinha', 'Thomas', 'Verma', 'Yadav']
+PEOPLE_EXPONENT = 0.6
+# Stakeholders per role (2-15), most projects near the low end
+STAKEHOLDERS_PER_ROLE = {n: 1 / (n - 1) for n in range(2, 16)}
+
+# Doc names and URL kinds per category: (name choices, {kind: weight}, (min, max) count)
+DOC_CATEGORIES = {
+    'core_docs': (['PRD', 'BRD', 'TRD', 'Tech Spec', 'Launch Plan', 'One Pager'],
+                  {'google_doc': 70, 'notion': 10, 'google_drive': 5, 'link': 15}, (0, 5)),
+    'design_docs': (['Designs', 'Prototype', 'User Flows', 'Design Review', 'Wireframes'],
+                    {'figma': 65, 'miro': 20, 'google_slides': 15}, (0, 3)),
+    'analytics_docs': (['Dashboard', 'Metrics', 'Funnel', 'Experiment Results', 'Weekly Report'],
+                       {'looker_studio': 35, 'looker': 25, 'google_sheet': 40}, (0, 3)),
+    'other_docs': (['Runbook', 'API Docs', 'Retro', 'Roadmap', 'User Research', 'Jira Board', 'Release Notes'],
+                   {'google_doc': 20, 'google_sheet': 10, 'google_slides': 10, 'notion': 15, 'miro': 5,
+                    'google_drive': 10, 'link': 30}, (0, 3)),
+}
+# URL shapes per doc_types.py type ('link': no embed); {} is a random token
+DOC_URLS = {
+    'google_doc': ['https://docs.google.com/document/d/{}/edit'],
+    'google_sheet': ['https://docs.google.com/spreadsheets/d/{}/edit'],
+    'google_slides': ['https://docs.google.com/presentation/d/{}/edit'],
+    'google_drive': ['https://drive.google.com/file/d/{}/view'],
+    'looker_studio': ['https://lookerstudio.google.com/reporting/{}'],
+    'looker': ['https://cars24.looker.com/dashboards/{}'],
+    'figma': ['https://www.figma.com/file/{}/Design'],
+    'notion': ['https://www.notion.so/cars24/{}'],
+    'miro': ['https://miro.com/app/board/{}=/'],
+    'link': ['https://cars24.atlassian.net/wiki/spaces/PROD/pages/{}', 'https://cars24.atlassian.net/browse/{}',
+             'https://github.com/cars24/{}', 'https://app.amplitude.com/analytics/cars24/chart/{}'],
+}
+TOKEN_PLACEHOLDER = 'TOKEN0placeholder'
+
+RELATED_PER_PROJECT = {0: 30, 1: 30, 2: 20, 3: 10, 4: 6, 5: 4}
+SAME_VERTICAL_SHARE = 0.8
+RECENT_SKEW = 0.6  # < 1 puts more projects near --end (a growing portfolio)
+
+
+class Weighted:
+    """Repeated draws from a fixed weighted population
+
+    Random.choices(population, cum_weights=...) without its per-call setup,
+    which dominates when it is called a few dozen times per project.
+    """
+
+    def __init__(self, population, weights):
+        self.population = list(population)
+        self.cum_weights = list(itertools.accumulate(weights))
+        self.total = self.cum_weights[-1]
+        self.hi = len(self.population) - 1
+
+    def _index(self, rng):
+        return bisect(self.cum_weights, rng.random() * self.total, 0, self.hi)
+
+    def pick(self, rng):
+        return self.population[self._index(rng)]
+
+    def distinct(self, rng, k):
+        """Up to `k` draws of distinct items, in the order drawn"""
+        picked = {}
+        for _ in range(k * 4):
+            picked[self._index(rng)] = None
+            if len(picked) == k:
+                break
+        return [self.population[i] for i in picked]
+
+
+def zipf(population, exponent):
+    """Weighted draws where the item at rank r has weight 1 / r ** exponent"""
+    return Weighted(population, (1 / rank ** exponent for rank in range(1, len(population) + 1)))
+
+
+def people_pool(size):
+    """`size` distinct {'name', 'email'} people"""
+    people = []
+    combinations = len(FIRST_NAMES) * len(LAST_NAMES)
+    for i in range(size):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]
+        n = i // combinations
+        suffix = f' {n + 1}' if n else ''
+        people.append({'name': f'{first} {last}{suffix}',
+                       'email': f'{first}.{last}{n + 1 if n else ""}@cars24.com'.lower()})
+    return people
+
+
+def doc_templates():
+    """(type, url template, embed template) per kind, classified once through doc_types.py
+
+    Per doc only the token changes, so substituting it into the classified
+    template gives what annotate_docs() would, without a registry scan per URL.
+    """
+    templates = {}
+    for kind, urls in DOC_URLS.items():
+        templates[kind] = []
+        for url in urls:
+            info = classify_url(url.format(TOKEN_PLACEHOLDER))
+            if info['type'] != kind:
+                raise ValueError(f"{url} is classified as {info['type']}, not {kind}")
+            templates[kind].append((kind, url, info['embed_url']))
+    return templates
+
+
+def generate_projects(count, seed=1, end=None, years=4):
+    """Yield `count` export-format records with ids 1..count, oldest first"""
+    rng = Random(seed)
+    end = end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    span = timedelta(days=365 * years).total_seconds()
+    # Creation times in id order
+    offsets = sorted(rng.random() ** RECENT_SKEW for _ in range(count))
+
+    verticals = Weighted(VERTICALS, VERTICALS.values())
+    tags = zipf(TAGS, TAG_EXPONENT)
+    tag_counts = Weighted(TAGS_PER_PROJECT, TAGS_PER_PROJECT.values())
+    role_sizes = Weighted(STAKEHOLDERS_PER_ROLE, STAKEHOLDERS_PER_ROLE.values())
+    related_counts = Weighted(RELATED_PER_PROJECT, RELATED_PER_PROJECT.values())
+
+    # The pools grow with the catalog, so people per project stays realistic at any size
+    pool_size = max(30, count // 8)
+    people = people_pool(pool_size * len(STAKEHOLDER_ROLES))
+    rng.shuffle(people)  # popularity follows pool order; don't let it follow the name grid
+    pools = {role: zipf(people[i * pool_size:(i + 1) * pool_size], PEOPLE_EXPONENT)
+             for i, role in enumerate(STAKEHOLDER_ROLES)}
+
+    templates = doc_templates()
+    doc_kinds = {
+        field: (names, Weighted(kinds, kinds.values()), bounds)
+        for field, (names, kinds, bounds) in DOC_CATEGORIES.items()
+    }
+
+    name_uses = {}
+    by_vertical = {vertical: [] for vertical in VERTICALS}
+    for project_id, offset in enumerate(offsets, start=1):
+        vertical = verticals.pick(rng)
+        domain = rng.choice(DOMAINS)
+        base = f'{rng.choice(NAME_PREFIXES)} {domain} {rng.choice(NAME_SUFFIXES)}'
+        uses = name_uses[base] = name_uses.get(base, 0) + 1
+        name = base if uses == 1 else f'{base} {uses}'
+
+        summary = (f'{rng.choice(VERBS)} {domain.lower()} {rng.choice(NAME_SUFFIXES).lower()} flows for '
+                   f'{rng.choice(AUDIENCES)}, {rng.choice(BENEFITS)}.')
+        if rng.random() < 0.7:
+            summary += ' ' + ' '.join(rng.sample(DETAILS, rng.randint(1, 3)))
+
+        stakeholders = {role: pools[role].distinct(rng, role_sizes.pick(rng)) for role in STAKEHOLDER_ROLES}
+
+        docs = {}
+        for field, (names, kinds, (low, high)) in doc_kinds.items():
+            entries = []
+            for _ in range(rng.randint(low, high)):
+                doc_type, url, embed_url = rng.choice(templates[kinds.pick(rng)])
+                token = f'{rng.getrandbits(96):024x}'
+                entries.append({
+                    'name': rng.choice(names),
+                    'url': url.format(token),
+                    'type': doc_type,
+                    'embed_url': embed_url and embed_url.replace(TOKEN_PLACEHOLDER, token),
+                })
+            docs[field] = entries
+
+        related = []
+        earlier = by_vertical[vertical]
+        for _ in range(min(project_id - 1, related_counts.pick(rng))):
+            if earlier and rng.random() < SAME_VERTICAL_SHARE:
+                related.append(rng.choice(earlier))
+            else:
+                related.append(rng.randint(1, project_id - 1))
+        earlier.append(project_id)
+
+        created_at = end - timedelta(seconds=span * (1 - offset))
+        # Most projects are last touched soon after creation, a few recently
+        updated_at = created_at + (end - created_at) * rng.random() ** 4
+
+        yield {
+            'id': project_id,
+            'name': name,
+            'summary': summary,
+            'business_vertical': vertical,
+            # The PM is the first product stakeholder
+            'product_manager': stakeholders['product'][0]['name'],
+            'stakeholders': stakeholders,
+            **docs,
+            'tags': tags.distinct(rng, tag_counts.pick(rng)),
+            'related_projects': list(dict.fromkeys(related)),
+            'created_at': created_at.isoformat(),
+            'updated_at': updated_at.isoformat(),
+        }
+
+
+def write_ndjson(records, path):
+    """Write records as NDJSON to `path` ('-' for stdout, .gz compresses); returns the count"""
+    if path == '-':
+        stream = sys.stdout
+    elif path.endswith('.gz'):
+        # Level 1: about twice as fast as 6 for a ~30% larger file; fixtures are rebuilt often
+        stream = gzip.open(path, 'wt', encoding='utf-8', compresslevel=1)
+    else:
+        stream = open(path, 'w', encoding='utf-8')
+    count = 0
+    try:
+        for record in records:
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return count
+
+
+def load_database(records, replace=False):
+    """Bulk-load records into DATABASE_URL with restore.py; returns its report"""
+    from app import app
+    from migrations import ensure_schema
+    from restore import restore
+
+    with app.app_context():
+        ensure_schema()
+        return restore(records, replace=replace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic project catalog')
+    parser.add_argument('--count', type=int, default=1000, help='number of projects')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--years', type=float, default=4, help='created_at spread, ending at --end')
+    parser.add_argument('--end', help='latest timestamp, ISO date (default: today; fix it for identical output)')
+    parser.add_argument('-o', '--output', help="NDJSON file ('-' for stdout, .gz to compress)")
+    parser.add_argument('--database', action='store_true', help='load into DATABASE_URL instead')
+    parser.add_argument('--replace', action='store_true', help='with --database: overwrite existing projects')
+    args = parser.parse_args()
+    if bool(args.output) == args.database:
+        parser.error('give either --output or --database')
+
+    end = datetime.fromisoformat(args.end) if args.end else None
+    records = generate_projects(args.count, seed=args.seed, end=end, years=args.years)
+
+    if args.output == '-':
+        write_ndjson(records, '-')
+        return 0
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Synthetic Catalog")
+    print("=" * 60)
+    print()
+
+    started = time.perf_counter()
+    if args.output:
+        count = write_ndjson(records, args.output)
+        print(f"✅ Wrote {count} projects to {args.output}")
+    else:
+        from restore import RestoreError
+        try:
+            report = load_database(records, replace=args.replace)
+        except RestoreError as e:
+            print(f"❌ {e}")
+            return 1
+        count = report['projects']
+        print(f"✅ Loaded {count} projects ({report['tags']} tags, {report['people']} people)")
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {elapsed:.1f}s ({count / elapsed:.0f} projects/s)")
+
+    print()
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Related-projects graph
+
+Related projects are resolved with a single `WHERE id IN (...)` query that
+selects only the columns the UI shows, and the dependency graph is walked
+breadth-first over the indexed project_relations edge table, one query per
+level. Graph results go through the versioned read cache.
+"""
+from models import db, Project, ProjectRelation
+from cache import cached
+
+MAX_DEPTH = 4
+MAX_NODES = 500
+
+
+def related_summaries(related_ids):
+    """id / name / business_vertical for the given projects, in the given order"""
+    ids = []
+    for value in related_ids or []:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    if not ids:
+        return []
+
+    rows = (
+        db.session.query(Project.id, Project.name, Project.business_vertical)
+        .filter(Project.id.in_(ids))
+        .all()
+    )
+    by_id = {row.id: {'id': row.id, 'name': row.name, 'business_vertical': row.business_vertical} for row in rows}
+    return [by_id[i] for i in dict.fromkeys(ids) if i in by_id]
+
+
+def _neighbours(frontier):
+    """Edges touching any project in the frontier (treated as undirected)"""
+    edges = db.session.query(ProjectRelation.project_id, ProjectRelation.related_id).filter(
+        db.or_(
+            ProjectRelation.project_id.in_(frontier),
+            ProjectRelation.related_id.in_(frontier)
+        )
+    )
+    return edges.all()
+
+
+def _build_graph(project_id, depth):
+    distances = {project_id: 0}
+    edges = set()
+    frontier = [project_id]
+    truncated = False
+
+    for level in range(1, depth + 1):
+        if not frontier:
+            break
+        next_frontier = []
+        for source, target in _neighbours(frontier):
+            edges.add((source, target))
+            for node in (source, target):
+                if node in distances:
+                    continue
+                if len(distances) >= MAX_NODES:
+                    truncated = True
+                    continue
+                distances[node] = level
+                next_frontier.append(node)
+        frontier = next_frontier
+
+    # Drop edges that lead to nodes cut off by MAX_NODES
+    edges = [(s, t) for s, t in sorted(edges) if s in distances and t in distances]
+    nodes = {node['id']: node for node in related_summaries(list(distances))}
+
+    return {
+        'root': project_id,
+        'depth': depth,
+        'nodes': [dict(nodes[i], distance=d) for i, d in sorted(distances.items(), key=lambda x: (x[1], x[0])) if i in nodes],
+        'edges': [{'source': s, 'target': t} for s, t in edges],
+        'truncated': truncated,
+    }
+
+
+def project_graph(project_id, depth=1):
+    """Bounded BFS over the relationship graph around a project (cached)"""
+    depth = max(1, min(depth, MAX_DEPTH))
+    return cached('graph', (project_id, depth), lambda: _build_graph(project_id, depth))
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings
+
+Schema migrations run once in the master process before any worker forks,
+so workers start with only a cheap schema version check. Each worker then
+builds its in-process autocomplete and (unless pg_trgm serves fuzzy search)
+trigram indexes in a background thread, so gunicorn's normal worker timeout
+applies: at 100k projects the build takes about 40s on one CPU. Other pages
+are served meanwhile; a search or autocomplete request waits for the build.
+
+The same hooks serve the ASGI mode (asgi.py):
+    gunicorn -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker asgi:app
+"""
+import threading
+
+def on_starting(server):
+    from migrations import run_migrations
+    run_migrations()
+
+def post_worker_init(worker):
+    # Build the in-process indexes before the first keystroke reaches this worker
+    built = threading.Event()
+    threading.Thread(target=_build_indexes, args=(built,), name='index-warmup', daemon=True).start()
+    threading.Thread(target=_heartbeat, args=(worker, built), name='index-warmup-heartbeat', daemon=True).start()
+
+def _build_indexes(built):
+    from app import app
+    from autocomplete import autocomplete_index
+    from fuzzy_search import trigram_index, uses_trigram_index
+    try:
+        with app.app_context():
+            autocomplete_index.ensure_current()
+            if uses_trigram_index():
+                trigram_index.ensure_current()
+    finally:
+        built.set()
+
+def _heartbeat(worker, built):
+    # A request waiting for the build holds a sync worker's main loop (and
+    # the ASGI lifespan startup), which then can't check in with the arbiter
+    while not built.wait(worker.timeout / 2):
+        worker.notify()
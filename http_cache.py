@@ -0,0 +1,92 @@
+"""
+HTTP conditional requests (ETag / Last-Modified / 304)
+
+Validators are computed from cheap indexed lookups (the catalog version row,
+or a project's updated_at), so a matching If-None-Match / If-Modified-Since
+is answered with 304 before any rows are loaded or templates rendered.
+"""
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import request, make_response
+from models import db, Project, ProjectRelation
+from cache import catalog_state
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+
+
+def as_utc(value):
+    return value.replace(tzinfo=timezone.utc, microsecond=0) if value else None
+
+
+def catalog_validators(**view_args):
+    """Validators for list-type responses: change on any project write"""
+    version, updated_at = catalog_state()
+    return catalog_etag(version, updated_at), updated_at
+
+
+def catalog_etag(version, updated_at):
+    return make_etag('catalog', version, updated_at)
+
+
+def project_validators(project_id, **view_args):
+    """Validators for a project page: the project plus the related projects it shows"""
+    related = db.select(ProjectRelation.related_id).where(ProjectRelation.project_id == project_id)
+    latest, count, present = db.session.query(
+        db.func.max(Project.updated_at),
+        db.func.count(Project.id),
+        db.func.max(db.case((Project.id == project_id, 1), else_=0))
+    ).filter(db.or_(Project.id == project_id, Project.id.in_(related))).one()
+    if not present:
+        return None  # let the view produce its 404
+    return make_etag('project', project_id, latest, count), latest
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return as_utc(last_modified) <= request.if_modified_since
+    return False
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = as_utc(last_modified)
+    # Let browsers and proxies keep a copy but always revalidate it
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional(validators):
+    """Decorator: answer 304 when the client's copy is current, else add validators
+    
+    `validators` receives the view's arguments and returns (etag, last_modified),
+    or None to skip conditional handling.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            result = validators(**kwargs)
+            if result is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = result
+            # Query strings change the body, so fold them into the tag
+            etag = make_etag(etag, request.full_path)
+            if _not_modified(etag, last_modified):
+                return _set_validators(make_response('', 304), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations
+
+Migrations are registered in order with @migration(version, name) and must be
+idempotent: each one is recorded in the schema_version table once it has run,
+and a run interrupted before that point simply repeats it. They are applied
+under a lock (a PostgreSQL advisory lock, or a lock file next to the SQLite
+database), so concurrently starting processes never race each other.
+
+They run once before the app serves traffic:
+- gunicorn: the on_starting hook in gunicorn.conf.py (master process, before
+  workers fork)
+- by hand: python migrations.py [status]
+
+Workers only compare MAX(schema_version.version) with the latest migration
+on their first request; if the database is behind and AUTO_MIGRATE is not
+disabled they apply the pending migrations themselves (under the same lock).
+"""
+import argparse
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import DateTime, bindparam, inspect, select, text
+from models import (
+    db, Project, Tag, ProjectStakeholder, ProjectRelation, SchemaVersion, DataMigrationState,
+    RestoreLog, normalize_name
+)
+from search_index import install_search_index
+from fuzzy_search import install_trigram_indexes
+from cache import ensure_catalog_version
+
+ADVISORY_LOCK_KEY = 0x6332344d  # arbitrary, shared by every process running migrations
+
+MIGRATIONS = []
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def migration(version, name):
+    """Register a migration function; versions must be unique and increasing"""
+    def register(fn):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f'Migration {version} is out of order')
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+# --- Migrations --------------------------------------------------------------
+
+@migration(1, 'create tables')
+def create_tables():
+    with db.engine.begin() as conn:
+        db.metadata.create_all(conn)
+        # Databases from older releases: add the nullable columns they lack
+        # (data is converted later by data_migrations.py legacy_project_shape)
+        existing = {c['name'] for c in inspect(conn).get_columns('projects')}
+        for col in Project.__table__.columns:
+            if col.name not in existing and col.nullable:
+                col_type = col.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE projects ADD COLUMN {col.name} {col_type}'))
+
+
+@migration(2, 'secondary indexes')
+def create_indexes():
+    # create_all() skips indexes on tables that already exist
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+JSON_COLUMNS = {
+    'stakeholders': '{}',
+    'core_docs': '[]',
+    'design_docs': '[]',
+    'analytics_docs': '[]',
+    'other_docs': '[]',
+    'tags': '[]',
+    'related_projects': '[]',
+}
+
+
+@migration(3, 'native JSON columns')
+def json_columns():
+    """jsonb + GIN indexes on PostgreSQL; valid JSON text on SQLite"""
+    with db.engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            for column, empty in JSON_COLUMNS.items():
+                data_type = conn.execute(text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_name = 'projects' AND column_name = :column"
+                ), {'column': column}).scalar()
+                if data_type != 'jsonb':
+                    conn.execute(text(
+                        f"ALTER TABLE projects ALTER COLUMN {column} TYPE jsonb "
+                        f"USING COALESCE(NULLIF({column}, ''), '{empty}')::jsonb"
+                    ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_projects_tags_gin ON projects USING GIN (tags jsonb_path_ops)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_projects_stakeholders_gin ON projects USING GIN (stakeholders)"
+            ))
+        else:
+            for column, empty in JSON_COLUMNS.items():
+                conn.execute(text(
+                    f"UPDATE projects SET {column} = '{empty}' "
+                    f"WHERE {column} IS NULL OR {column} = '' OR NOT json_valid({column})"
+                ))
+
+
+@migration(4, 'full-text search index')
+def search_index():
+    with db.engine.begin() as conn:
+        install_search_index(conn)
+
+
+@migration(5, 'catalog version row')
+def catalog_version_row():
+    ensure_catalog_version()
+
+
+def _backfill(columns, sync):
+    """Walk projects in primary-key order, one batch per transaction"""
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(Project.id, *columns)
+            .filter(Project.id > last_id)
+            .order_by(Project.id)
+            .limit(BACKFILL_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        sync(rows)
+        db.session.commit()
+        last_id = rows[-1].id
+
+
+@migration(6, 'backfill tags')
+def backfill_tags():
+    _backfill([Project.tags], lambda rows: Tag.sync_project_tags(
+        {row.id: row.tags or [] for row in rows}
+    ))
+
+
+@migration(7, 'backfill people directory')
+def backfill_people():
+    _backfill([Project.stakeholders, Project.product_manager], lambda rows: ProjectStakeholder.sync_projects(
+        {row.id: (row.stakeholders, row.product_manager) for row in rows}
+    ))
+
+
+@migration(8, 'backfill related-project edges')
+def backfill_relations():
+    _backfill([Project.related_projects], lambda rows: ProjectRelation.sync_projects(
+        {row.id: row.related_projects or [] for row in rows}
+    ))
+
+
+@migration(9, 'data migration checkpoints')
+def data_migration_state():
+    with db.engine.begin() as conn:
+        DataMigrationState.__table__.create(conn, checkfirst=True)
+
+
+@migration(10, 'case-insensitive unique project names')
+def project_name_key():
+    """Backfill projects.name_key and build its unique index
+
+    Existing names that only differ by case or whitespace are kept: the newer
+    project of each such pair keeps a NULL key (NULLs never collide) and is
+    listed here, and gets its key the next time it is saved under a free name.
+    """
+    table = Project.__table__
+    with db.engine.begin() as conn:
+        if 'name_key' not in {c['name'] for c in inspect(conn).get_columns('projects')}:
+            conn.execute(text('ALTER TABLE projects ADD COLUMN name_key VARCHAR(200)'))
+
+        taken = set(conn.execute(select(table.c.name_key).where(table.c.name_key.isnot(None))).scalars())
+        updates = []
+        for project_id, name in conn.execute(
+            select(table.c.id, table.c.name).where(table.c.name_key.is_(None)).order_by(table.c.id)
+        ):
+            key = normalize_name(name)
+            if key in taken:
+                print(f"  ⚠️  Project {project_id} ({name!r}) duplicates another name ignoring case; rename it")
+                continue
+            taken.add(key)
+            updates.append({'_id': project_id, '_key': key})
+        if updates:
+            conn.execute(
+                table.update().where(table.c.id == bindparam('_id')).values(name_key=bindparam('_key')),
+                updates
+            )
+        for index in table.indexes:
+            if index.name == 'uq_projects_name_key':
+                index.create(conn, checkfirst=True)
+
+
+@migration(11, 'trigram search indexes')
+def trigram_indexes():
+    """pg_trgm GIN indexes on PostgreSQL; SQLite searches an in-process index"""
+    with db.engine.begin() as conn:
+        install_trigram_indexes(conn)
+
+
+# Existing SQLite tables cannot get NOT NULL added to a column; these fill in
+# the timestamps of rows written without them instead, in SQLAlchemy's text
+# format (with microseconds) so keyset comparisons on the stored strings hold
+SQLITE_NOW = "(strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')"
+SQLITE_TIMESTAMP_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS projects_timestamps_{name} AFTER {event} ON projects
+    WHEN new.created_at IS NULL OR new.updated_at IS NULL BEGIN
+        UPDATE projects SET created_at = COALESCE(created_at, updated_at, {SQLITE_NOW}),
+                            updated_at = COALESCE(updated_at, created_at, {SQLITE_NOW})
+        WHERE id = new.id;
+    END
+    """
+    for name, event in [('ai', 'INSERT'), ('au', 'UPDATE OF created_at, updated_at')]
+]
+
+
+@migration(12, 'non-null project timestamps')
+def project_timestamps():
+    """Backfill NULL created_at / updated_at; the landing page's keyset cursor needs updated_at
+
+    PostgreSQL gets NOT NULL constraints; an existing SQLite table gets the
+    triggers above (new databases get the constraints from create_all).
+    """
+    with db.engine.begin() as conn:
+        # Both SET expressions see the old row; :now is bound as a DateTime so
+        # SQLite stores it in the same text format as every other timestamp
+        conn.execute(text(
+            "UPDATE projects SET created_at = COALESCE(created_at, updated_at, :now), "
+            "updated_at = COALESCE(updated_at, created_at, :now) "
+            "WHERE created_at IS NULL OR updated_at IS NULL"
+        ).bindparams(bindparam('now', datetime.utcnow(), type_=DateTime)))
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text('ALTER TABLE projects ALTER COLUMN created_at SET NOT NULL'))
+            conn.execute(text('ALTER TABLE projects ALTER COLUMN updated_at SET NOT NULL'))
+        else:
+            columns = {c['name']: c for c in inspect(conn).get_columns('projects')}
+            if columns['created_at']['nullable'] or columns['updated_at']['nullable']:
+                for statement in SQLITE_TIMESTAMP_TRIGGERS:
+                    conn.execute(text(statement))
+
+
+
+@migration(13, 'restore log')
+def restore_log():
+    with db.engine.begin() as conn:
+        RestoreLog.__table__.create(conn, checkfirst=True)
+
+
+@migration(14, 'trigram indexes on product manager and vertical')
+def people_trigram_indexes():
+    """Fuzzy search also matches product_manager / business_vertical; their pg_trgm indexes"""
+    with db.engine.begin() as conn:
+        install_trigram_indexes(conn)
+
+# --- Runner ------------------------------------------------------------------
+
+def current_version():
+    """Highest applied migration (0 for a database that predates schema_version)"""
+    with db.engine.connect() as conn:
+        if not inspect(conn).has_table(SchemaVersion.__tablename__):
+            return 0
+        return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+@contextmanager
+def migration_lock():
+    """Serialize migration runs across processes"""
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+                conn.commit()
+        return
+
+    database = db.engine.url.database
+    if not database or database == ':memory:':
+        yield
+        return
+    with open(f'{database}.migrate.lock', 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def pending_migrations(version=None):
+    version = current_version() if version is None else version
+    return [(v, name, fn) for v, name, fn in MIGRATIONS if v > version]
+
+
+def migrate(verbose=False):
+    """Apply pending migrations under the lock; returns the versions applied
+
+    Must run inside an app context.
+    """
+    applied = []
+    with migration_lock():
+        # Re-read under the lock: another process may have just finished
+        with db.engine.begin() as conn:
+            SchemaVersion.__table__.create(conn, checkfirst=True)
+        for version, name, fn in pending_migrations():
+            started = time.perf_counter()
+            fn()
+            with db.engine.begin() as conn:
+                conn.execute(SchemaVersion.__table__.insert().values(version=version, name=name))
+            applied.append(version)
+            if verbose:
+                print(f"  ✓ {version:>3} {name} ({time.perf_counter() - started:.2f}s)")
+    return applied
+
+
+def auto_migrate_enabled():
+    return os.environ.get('AUTO_MIGRATE', 'on').lower() not in ('0', 'off', 'false', 'no')
+
+
+def ensure_schema():
+    """Cheap version check; applies pending migrations if AUTO_MIGRATE allows"""
+    version = current_version()
+    if version >= latest_version():
+        return version
+    if not auto_migrate_enabled():
+        raise RuntimeError(
+            f'Database schema is at version {version}, the code needs {latest_version()}; '
+            f'run `python migrations.py`'
+        )
+    migrate()
+    return latest_version()
+
+
+def run_migrations(verbose=True):
+    """Entry point for the gunicorn pre-start hook and the CLI"""
+    from app import app, display_database_url
+    with app.app_context():
+        if verbose:
+            print(f"Using database: {display_database_url}")
+        applied = migrate(verbose=verbose)
+        if verbose:
+            print(f"✅ Schema at version {latest_version()} ({len(applied)} migrations applied)")
+        # Don't hand pooled connections to forked workers
+        db.engine.dispose()
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply or inspect schema migrations')
+    parser.add_argument('command', nargs='?', default='migrate', choices=['migrate', 'status'])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Schema Migrations")
+    print("=" * 60)
+    print()
+
+    if args.command == 'status':
+        from app import app
+        with app.app_context():
+            version = current_version()
+            print(f"📊 Current version: {version} (latest {latest_version()})")
+            for v, name, fn in pending_migrations(version):
+                print(f"  ⏳ {v:>3} {name}")
+    else:
+        run_migrations()
+
+    print()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
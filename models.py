@@ -1,29 +1,501 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
-import json
+from doc_types import annotate_docs
 
 db = SQLAlchemy()
 
+# JSONB on PostgreSQL (GIN-indexable), JSON1-backed text on SQLite
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
+
+def insert_skipping_conflicts(table, *unique_columns):
+    """INSERT ... ON CONFLICT (unique_columns) DO NOTHING, for get-or-create under concurrency
+    
+    Rows another transaction inserted first are skipped instead of raising, so
+    callers re-select afterwards. Other dialects get a plain INSERT.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return table.insert()
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    return insert(table).on_conflict_do_nothing(index_elements=list(unique_columns))
+
+# Normalized copy of Project.tags so tag lookups and counts can use indexes
+project_tags = db.Table(
+    'project_tags',
+    db.Column('project_id', db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key covers project -> tags; this covers tag -> projects
+    db.Index('ix_project_tags_tag_id_project_id', 'tag_id', 'project_id')
+)
+
+class Tag(db.Model):
+    __tablename__ = 'tags'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    
+    @staticmethod
+    def clean_names(names):
+        """Drop blanks and duplicates, keeping the original order"""
+        return list(dict.fromkeys(name.strip() for name in names or [] if name and name.strip()))
+    
+    @staticmethod
+    def insert_missing(names):
+        """Create tags for names, skipping any that exist by now; returns {name: id}"""
+        with db.session.no_autoflush:
+            db.session.execute(insert_skipping_conflicts(Tag.__table__, 'name'), [{'name': name} for name in sorted(names)])
+            return dict(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(list(names))))
+    
+    @staticmethod
+    def resolve(names):
+        """Return Tag objects for the given names, creating any that are missing"""
+        names = Tag.clean_names(names)
+        if not names:
+            return []
+        
+        with db.session.no_autoflush:
+            found = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names))}
+        
+        missing = [name for name in names if name not in found]
+        if missing:
+            # Inserted straight away so a concurrent request creating the same tag can't fail ours
+            ids = Tag.insert_missing(missing)
+            with db.session.no_autoflush:
+                found.update((tag.name, tag) for tag in Tag.query.filter(Tag.id.in_(list(ids.values()))))
+        return [found[name] for name in names]
+    
+    @staticmethod
+    def sync_project_tags(tags_by_project):
+        """Replace the tag links of many projects in a few set-based statements
+        
+        Used by backfills and bulk paths that bypass from_dict/update_from_dict.
+        tags_by_project maps project id -> list of tag names.
+        """
+        if not tags_by_project:
+            return
+        
+        cleaned = {pid: Tag.clean_names(tags) for pid, tags in tags_by_project.items()}
+        names = {name for tags in cleaned.values() for name in tags}
+        
+        tag_ids = {}
+        if names:
+            tag_ids = dict(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(names)))
+            missing = names - tag_ids.keys()
+            if missing:
+                tag_ids.update(Tag.insert_missing(missing))
+        
+        db.session.execute(
+            project_tags.delete().where(project_tags.c.project_id.in_(list(cleaned)))
+        )
+        links = [
+            {'project_id': pid, 'tag_id': tag_ids[name]}
+            for pid, tags in cleaned.items() for name in tags
+        ]
+        if links:
+            db.session.execute(project_tags.insert(), links)
+    
+    def __repr__(self):
+        return f'<Tag {self.id}: {self.name}>'
+
+STAKEHOLDER_ROLES = ['business', 'product', 'design', 'engineering']
+
+def normalize_name(name):
+    """Collapse whitespace and casefold names so they can be compared"""
+    return ' '.join((name or '').split()).casefold()
+
+def stakeholder_entries(stakeholders, product_manager=None):
+    """Flatten a stakeholders dict into (role, name, email) tuples
+    
+    Handles both {"name", "email"} dicts and the legacy plain-string entries.
+    The product manager is included under the 'product_manager' role.
+    """
+    entries = []
+    seen = set()
+    people = [('product_manager', product_manager)] if product_manager else []
+    for role, members in (stakeholders or {}).items():
+        people.extend((role, member) for member in members or [])
+    
+    for role, member in people:
+        if isinstance(member, dict):
+            name, email = member.get('name') or '', member.get('email') or ''
+        else:
+            name, email = member or '', ''
+        name, email = ' '.join(name.split()), email.strip().lower()
+        if not name:
+            continue
+        key = (role, Person.key_for(name, email))
+        if key in seen:
+            continue
+        seen.add(key)
+        entries.append((role, name, email))
+    return entries
+
+class Person(db.Model):
+    __tablename__ = 'people'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(200))
+    # "email:<address>" when known, otherwise "name:<normalized name>"
+    dedupe_key = db.Column(db.String(255), nullable=False, unique=True)
+    name_key = db.Column(db.String(100), nullable=False, index=True)  # normalized name, for typeahead
+    
+    @staticmethod
+    def key_for(name, email):
+        return f'email:{email}' if email else f'name:{normalize_name(name)}'
+    
+    @staticmethod
+    def lookup(identities):
+        """Map (name, email) identities to existing Person rows, keyed by identity
+        
+        People with an email are matched on it; people without one fall back to
+        the normalized name, matching anyone already known under that name.
+        """
+        keys = {Person.key_for(name, email) for name, email in identities}
+        name_keys = {normalize_name(name) for name, email in identities if not email}
+        
+        found = {}
+        with db.session.no_autoflush:
+            candidates = Person.query.filter(db.or_(
+                Person.dedupe_key.in_(keys),
+                Person.name_key.in_(name_keys)
+            )).order_by(Person.id).all()
+        candidates += [obj for obj in db.session.new if isinstance(obj, Person)]
+        by_key = {}
+        by_name = {}
+        for person in candidates:
+            by_key.setdefault(person.dedupe_key, person)
+            by_name.setdefault(person.name_key, person)
+        
+        for name, email in identities:
+            person = by_key.get(Person.key_for(name, email))
+            if person is None and not email:
+                person = by_name.get(normalize_name(name))
+            if person is not None:
+                found[(name, email)] = person
+        return found
+    
+    @staticmethod
+    def insert_missing(identities):
+        """Create people for (name, email) identities; returns {dedupe_key: id}
+        
+        INSERT ... ON CONFLICT (dedupe_key) DO NOTHING plus a re-select, so a
+        person another request created since our lookup is reused instead of
+        failing the whole transaction on the unique constraint.
+        """
+        rows = {}
+        for name, email in identities:
+            key = Person.key_for(name, email)
+            rows.setdefault(key, {'name': name, 'email': email or None, 'dedupe_key': key, 'name_key': normalize_name(name)})
+        if not rows:
+            return {}
+        
+        with db.session.no_autoflush:
+            db.session.execute(insert_skipping_conflicts(Person.__table__, 'dedupe_key'), list(rows.values()))
+            return dict(db.session.query(Person.dedupe_key, Person.id).filter(Person.dedupe_key.in_(list(rows))))
+    
+    @staticmethod
+    def resolve(identities):
+        """Return a Person for every (name, email) identity, creating missing ones"""
+        identities = list(dict.fromkeys(identities))
+        found = Person.lookup(identities)
+        missing = [identity for identity in identities if identity not in found]
+        if missing:
+            # Same-keyed identities (e.g. one email-less name spelled twice) share a row
+            ids = Person.insert_missing(missing)
+            with db.session.no_autoflush:
+                created = {person.id: person for person in Person.query.filter(Person.id.in_(list(ids.values())))}
+            for name, email in missing:
+                found[(name, email)] = created[ids[Person.key_for(name, email)]]
+        return found
+    
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'email': self.email or ''}
+    
+    def __repr__(self):
+        return f'<Person {self.id}: {self.name}>'
+
+class ProjectStakeholder(db.Model):
+    __tablename__ = 'project_stakeholders'
+    __table_args__ = (
+        # "Projects by person" lookups
+        db.Index('ix_project_stakeholders_person_id_project_id', 'person_id', 'project_id'),
+    )
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    person_id = db.Column(db.Integer, db.ForeignKey('people.id', ondelete='CASCADE'), primary_key=True)
+    role = db.Column(db.String(30), primary_key=True)
+    
+    person = db.relationship('Person', lazy='joined')
+    
+    @staticmethod
+    def build(stakeholders, product_manager=None):
+        """Association rows for a project's stakeholders (ORM path)"""
+        entries = stakeholder_entries(stakeholders, product_manager)
+        people = Person.resolve([(name, email) for role, name, email in entries])
+        return [
+            ProjectStakeholder(role=role, person=people[(name, email)])
+            for role, name, email in entries
+        ]
+    
+    @staticmethod
+    def sync_projects(stakeholders_by_project):
+        """Replace the stakeholder links of many projects in a few set-based statements
+        
+        stakeholders_by_project maps project id -> (stakeholders dict, product manager).
+        """
+        if not stakeholders_by_project:
+            return
+        
+        entries_by_project = {
+            pid: stakeholder_entries(stakeholders, pm)
+            for pid, (stakeholders, pm) in stakeholders_by_project.items()
+        }
+        identities = list(dict.fromkeys(
+            (name, email) for entries in entries_by_project.values() for role, name, email in entries
+        ))
+        
+        people = {identity: person.id for identity, person in Person.lookup(identities).items()}
+        missing = [identity for identity in identities if identity not in people]
+        if missing:
+            created = Person.insert_missing(missing)
+            for name, email in missing:
+                people[(name, email)] = created[Person.key_for(name, email)]
+        
+        db.session.execute(
+            ProjectStakeholder.__table__.delete()
+            .where(ProjectStakeholder.project_id.in_(list(entries_by_project)))
+        )
+        links = list({
+            (pid, people[(name, email)], role): None
+            for pid, entries in entries_by_project.items() for role, name, email in entries
+        })
+        if links:
+            db.session.execute(ProjectStakeholder.__table__.insert(), [
+                {'project_id': pid, 'person_id': person_id, 'role': role}
+                for pid, person_id, role in links
+            ])
+
+class ProjectRelation(db.Model):
+    """Directed "related project" edge; mirrors Project.related_projects"""
+    __tablename__ = 'project_relations'
+    __table_args__ = (
+        # The primary key covers outgoing edges; this covers incoming ones
+        db.Index('ix_project_relations_related_id_project_id', 'related_id', 'project_id'),
+    )
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    related_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    
+    @staticmethod
+    def clean_ids(related_ids, project_id=None):
+        """Keep ids of projects that exist, dropping duplicates and self-links"""
+        ids = []
+        for value in related_ids or []:
+            try:
+                ids.append(int(value))
+            except (TypeError, ValueError):
+                continue
+        ids = [i for i in dict.fromkeys(ids) if i != project_id]
+        if not ids:
+            return []
+        with db.session.no_autoflush:
+            existing = {row.id for row in db.session.query(Project.id).filter(Project.id.in_(ids))}
+        return [i for i in ids if i in existing]
+    
+    @staticmethod
+    def build(related_ids, project_id=None):
+        """Edge rows for a project's related projects (ORM path)"""
+        return [ProjectRelation(related_id=i) for i in ProjectRelation.clean_ids(related_ids, project_id)]
+    
+    @staticmethod
+    def sync_projects(related_by_project):
+        """Replace the outgoing edges of many projects in a few set-based statements"""
+        if not related_by_project:
+            return
+        
+        wanted = {pid: [int(i) for i in ids or [] if str(i).isdigit()] for pid, ids in related_by_project.items()}
+        all_ids = {i for ids in wanted.values() for i in ids}
+        existing = set()
+        if all_ids:
+            existing = {row.id for row in db.session.query(Project.id).filter(Project.id.in_(all_ids))}
+        
+        db.session.execute(
+            ProjectRelation.__table__.delete()
+            .where(ProjectRelation.project_id.in_(list(wanted)))
+        )
+        edges = list({
+            (pid, i): None for pid, ids in wanted.items() for i in ids if i in existing and i != pid
+        })
+        if edges:
+            db.session.execute(ProjectRelation.__table__.insert(), [
+                {'project_id': pid, 'related_id': i} for pid, i in edges
+            ])
+
+class CatalogVersion(db.Model):
+    """Single-row counter bumped in the same transaction as every project write
+    
+    All workers read it to decide whether their cached aggregates are stale.
+    """
+    __tablename__ = 'catalog_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.version}>'
+
+class SchemaVersion(db.Model):
+    """One row per applied migration (see migrations.py)"""
+    __tablename__ = 'schema_version'
+    
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SchemaVersion {self.version}: {self.name}>'
+
+class DataMigrationState(db.Model):
+    """Checkpoint of a batched data migration (see data_migrations.py)"""
+    __tablename__ = 'data_migration_state'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    rows_changed = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<DataMigrationState {self.name} @ {self.last_id}>'
+
+class ProjectTombstone(db.Model):
+    """Deleted project ids, so incremental backups can see deletes
+    
+    Rows are written by an after_delete hook on Project.
+    """
+    __tablename__ = 'project_tombstones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(200))
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<ProjectTombstone {self.project_id}>'
+
+class RestoreLog(db.Model):
+    """One row per restore.py run
+    
+    Restored projects keep their original updated_at, so readers that catch
+    up from updated_at (backup_store.py, catalog_index.py) remember the
+    newest id they have seen and start over when a newer one shows up.
+    """
+    __tablename__ = 'restore_log'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    restored_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    source = db.Column(db.String(500))
+    projects = db.Column(db.Integer, nullable=False, default=0)
+    replaced = db.Column(db.Integer, nullable=False, default=0)  # projects the restore removed
+    
+    @staticmethod
+    def latest_id():
+        """Id of the newest restore, 0 if there was none"""
+        return db.session.query(db.func.max(RestoreLog.id)).scalar() or 0
+    
+    def __repr__(self):
+        return f'<RestoreLog {self.restored_at}: {self.projects} projects>'
+
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # Keyset pagination on the landing page walks (updated_at, id) newest first
+        db.Index('ix_projects_updated_at_id', 'updated_at', 'id'),
+        # Vertical filter and per-vertical facet counts
+        db.Index('ix_projects_business_vertical', 'business_vertical'),
+        # Names are unique ignoring case and whitespace; the write paths insert
+        # or update directly and catch the IntegrityError (see is_name_conflict)
+        db.Index('uq_projects_name_key', 'name_key', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False, unique=True)  # Unique constraint
+    name_key = db.Column(db.String(200))  # normalize_name(name)
     summary = db.Column(db.Text, nullable=False)
     business_vertical = db.Column(db.String(50), nullable=False)
     product_manager = db.Column(db.String(100), nullable=False)
     
-    # Store complex data as JSON strings
-    stakeholders = db.Column(db.Text)  # JSON: {"business": [{"name": "...", "email": "..."}], ...}
-    core_docs = db.Column(db.Text)     # JSON: PRD, BRD, TRD
-    design_docs = db.Column(db.Text)   # JSON: Figma, Miro
-    analytics_docs = db.Column(db.Text)  # JSON: GA Events, Dashboards
-    other_docs = db.Column(db.Text)    # JSON: Other documents
-    tags = db.Column(db.Text)          # JSON string
-    related_projects = db.Column(db.Text)  # JSON: list of project IDs
+    # Complex data as native JSON columns (JSONB on PostgreSQL, with GIN indexes
+    # on tags and stakeholders created by migrations.py)
+    stakeholders = db.Column(JSONType)  # {"business": [{"name": "...", "email": "..."}], ...}
+    core_docs = db.Column(JSONType)     # PRD, BRD, TRD
+    design_docs = db.Column(JSONType)   # Figma, Miro
+    analytics_docs = db.Column(JSONType)  # GA Events, Dashboards
+    other_docs = db.Column(JSONType)    # Other documents
+    tags = db.Column(JSONType)          # list of tag names
+    related_projects = db.Column(JSONType)  # list of project IDs
+    
+    # Indexed mirror of `tags`, kept in sync by from_dict/update_from_dict
+    tag_objects = db.relationship('Tag', secondary=project_tags, lazy='select', backref='projects')
+    # Indexed people directory links, kept in sync the same way
+    stakeholder_links = db.relationship('ProjectStakeholder', cascade='all, delete-orphan', lazy='select')
+    # Related-project graph edges in both directions; deleting a project removes both
+    relation_links = db.relationship(
+        'ProjectRelation', foreign_keys='ProjectRelation.project_id',
+        cascade='all, delete-orphan', lazy='select'
+    )
+    incoming_relation_links = db.relationship(
+        'ProjectRelation', foreign_keys='ProjectRelation.related_id',
+        cascade='all, delete-orphan', lazy='select'
+    )
+    
+    # NOT NULL: the landing page's keyset cursor is (updated_at, id)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Column projections for list-type pages, which never need the
+    # stakeholders / related_projects blobs
+    SUMMARY_COLUMNS = ('id', 'name', 'summary', 'business_vertical', 'product_manager')
+    CARD_COLUMNS = SUMMARY_COLUMNS + ('tags', 'core_docs', 'design_docs', 'analytics_docs', 'other_docs', 'updated_at')
+    
+    @classmethod
+    def projected(cls, columns=SUMMARY_COLUMNS):
+        """Query that loads only the given columns (e.g. Project.CARD_COLUMNS)"""
+        return cls.query.options(load_only(*[getattr(cls, name) for name in columns]))
+    
+    def to_summary_dict(self):
+        """Lightweight dictionary for lists and search results (SUMMARY_COLUMNS)"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'summary': self.summary,
+            'business_vertical': self.business_vertical,
+            'product_manager': self.product_manager
+        }
+    
+    def to_card_dict(self, doc_limit=4):
+        """Dictionary for landing page cards (CARD_COLUMNS)
+        
+        Cards show the first few documents across all categories plus a count.
+        """
+        docs = (self.core_docs or []) + (self.design_docs or []) + (self.analytics_docs or []) + (self.other_docs or [])
+        card = self.to_summary_dict()
+        card.update({
+            'tags': self.tags or [],
+            'docs': docs[:doc_limit],
+            'doc_count': len(docs),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        })
+        return card
     
     def to_dict(self):
         """Convert database model to dictionary"""
@@ -33,13 +505,13 @@ class Project(db.Model):
             'summary': self.summary,
             'business_vertical': self.business_vertical,
             'product_manager': self.product_manager,
-            'stakeholders': json.loads(self.stakeholders) if self.stakeholders else {},
-            'core_docs': json.loads(self.core_docs) if self.core_docs else [],
-            'design_docs': json.loads(self.design_docs) if self.design_docs else [],
-            'analytics_docs': json.loads(self.analytics_docs) if self.analytics_docs else [],
-            'other_docs': json.loads(self.other_docs) if self.other_docs else [],
-            'tags': json.loads(self.tags) if self.tags else [],
-            'related_projects': json.loads(self.related_projects) if self.related_projects else [],
+            'stakeholders': self.stakeholders or {},
+            'core_docs': self.core_docs or [],
+            'design_docs': self.design_docs or [],
+            'analytics_docs': self.analytics_docs or [],
+            'other_docs': self.other_docs or [],
+            'tags': self.tags or [],
+            'related_projects': self.related_projects or [],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -47,34 +519,71 @@ class Project(db.Model):
     @staticmethod
     def from_dict(data):
         """Create Project from dictionary"""
-        return Project(
+        project = Project(
             name=data.get('name'),
+            name_key=normalize_name(data.get('name')),
             summary=data.get('summary'),
             business_vertical=data.get('business_vertical'),
             product_manager=data.get('product_manager'),
-            stakeholders=json.dumps(data.get('stakeholders', {})),
-            core_docs=json.dumps(data.get('core_docs', [])),
-            design_docs=json.dumps(data.get('design_docs', [])),
-            analytics_docs=json.dumps(data.get('analytics_docs', [])),
-            other_docs=json.dumps(data.get('other_docs', [])),
-            tags=json.dumps(data.get('tags', [])),
-            related_projects=json.dumps(data.get('related_projects', []))
+            stakeholders=data.get('stakeholders', {}),
+            core_docs=annotate_docs(data.get('core_docs', [])),
+            design_docs=annotate_docs(data.get('design_docs', [])),
+            analytics_docs=annotate_docs(data.get('analytics_docs', [])),
+            other_docs=annotate_docs(data.get('other_docs', [])),
+            tags=data.get('tags', []),
+            related_projects=data.get('related_projects', [])
         )
+        project.tag_objects = Tag.resolve(data.get('tags', []))
+        project.stakeholder_links = ProjectStakeholder.build(data.get('stakeholders', {}), data.get('product_manager'))
+        project.relation_links = ProjectRelation.build(data.get('related_projects', []))
+        return project
     
     def update_from_dict(self, data):
         """Update existing project from dictionary"""
         self.name = data.get('name', self.name)
+        self.name_key = normalize_name(self.name)
         self.summary = data.get('summary', self.summary)
         self.business_vertical = data.get('business_vertical', self.business_vertical)
         self.product_manager = data.get('product_manager', self.product_manager)
-        self.stakeholders = json.dumps(data.get('stakeholders', {}))
-        self.core_docs = json.dumps(data.get('core_docs', []))
-        self.design_docs = json.dumps(data.get('design_docs', []))
-        self.analytics_docs = json.dumps(data.get('analytics_docs', []))
-        self.other_docs = json.dumps(data.get('other_docs', []))
-        self.tags = json.dumps(data.get('tags', []))
-        self.related_projects = json.dumps(data.get('related_projects', []))
+        self.stakeholders = data.get('stakeholders', {})
+        self.core_docs = annotate_docs(data.get('core_docs', []))
+        self.design_docs = annotate_docs(data.get('design_docs', []))
+        self.analytics_docs = annotate_docs(data.get('analytics_docs', []))
+        self.other_docs = annotate_docs(data.get('other_docs', []))
+        self.tags = data.get('tags', [])
+        self.tag_objects = Tag.resolve(data.get('tags', []))
+        self.stakeholder_links = ProjectStakeholder.build(data.get('stakeholders', {}), self.product_manager)
+        self.relation_links = ProjectRelation.build(data.get('related_projects', []), self.id)
+        self.related_projects = data.get('related_projects', [])
         self.updated_at = datetime.utcnow()
     
+    def live_related_ids(self):
+        """related_projects in their saved order, limited to edges that still exist"""
+        linked = {link.related_id for link in self.relation_links}
+        ids = [int(i) for i in self.related_projects or [] if str(i).isdigit()]
+        return [i for i in dict.fromkeys(ids) if i in linked]
+    
+    def drop_from_referrers(self):
+        """Remove this project from the related_projects lists that point at it"""
+        referrer_ids = [link.project_id for link in self.incoming_relation_links]
+        if not referrer_ids:
+            return
+        for referrer in Project.query.filter(Project.id.in_(referrer_ids)):
+            referrer.related_projects = [i for i in referrer.related_projects or [] if str(i) != str(self.id)]
+    
+    @staticmethod
+    def is_name_conflict(error):
+        """True if the error is an IntegrityError from one of the unique name indexes"""
+        if not isinstance(error, IntegrityError):
+            return False
+        message = str(error.orig)
+        return 'name_key' in message or 'projects.name' in message
+    
     def __repr__(self):
         return f'<Project {self.id}: {self.name}>'
+
+@event.listens_for(Project, 'after_delete')
+def _record_tombstone(mapper, connection, target):
+    connection.execute(ProjectTombstone.__table__.insert().values(
+        project_id=target.id, name=target.name, deleted_at=datetime.utcnow()
+    ))
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Restore projects from a backup
+
+Sources:
+- a SQLite backup file (projects_<ts>.db from backup_database.py)
+- a JSON array export (legacy projects_<ts>.json) or an NDJSON stream
+  (.ndjson / .ndjson.gz, '-' for stdin)
+- a snapshot from the incremental store (backup_store.py)
+
+Everything happens in one transaction: secondary indexes and the full-text
+triggers are dropped, projects are inserted with executemany batches (ids
+kept), tags / people / relations are derived set-based, then indexes and the
+search index are rebuilt. Before anything is committed the source checksum
+and row count are checked against the backup manifest, and a checksum of
+every restored record is compared with the source.
+
+Usage:
+    python restore.py backups/projects_20250101_120000.db
+    python restore.py backups/projects_20250101_120000.ndjson.gz --replace
+    python restore.py --snapshot latest [--store backups/store]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app import app
+from models import (
+    db, Project, Tag, Person, ProjectStakeholder, ProjectRelation, ProjectTombstone, RestoreLog,
+    project_tags, normalize_name
+)
+from export_projects import EXPORT_FIELDS, naive_utc
+from backup_database import file_sha256
+from backup_store import BackupStore, DEFAULT_STORE, canonical_json, iter_snapshot_records
+from search_index import SQLITE_DDL
+from fuzzy_search import POSTGRES_TRGM_INDEXES, install_trigram_indexes
+from cache import bump_catalog_version
+from migrations import ensure_schema
+
+BATCH_SIZE = 1000
+
+JSON_DEFAULTS = {
+    'stakeholders': {},
+    'core_docs': [],
+    'design_docs': [],
+    'analytics_docs': [],
+    'other_docs': [],
+    'tags': [],
+    'related_projects': [],
+}
+
+# Tables whose non-unique indexes are rebuilt after the load
+INDEXED_TABLES = [
+    Project.__table__, project_tags, Person.__table__,
+    ProjectStakeholder.__table__, ProjectRelation.__table__
+]
+
+
+class RestoreError(Exception):
+    """The backup failed verification or the target is not restorable"""
+
+
+def _parse_datetime(value):
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    return naive_utc(value)
+
+
+def normalize_record(record):
+    """Map a source record onto the projects columns"""
+    row = {}
+    for field in EXPORT_FIELDS:
+        value = record.get(field)
+        if field in JSON_DEFAULTS:
+            if isinstance(value, str):
+                value = json.loads(value) if value else None
+            if value is None:
+                value = JSON_DEFAULTS[field]
+        elif field in ('created_at', 'updated_at'):
+            value = _parse_datetime(value)
+        row[field] = value
+    # Both timestamps are NOT NULL; older exports may lack one or both
+    now = datetime.utcnow()
+    row['created_at'] = row['created_at'] or row['updated_at'] or now
+    row['updated_at'] = row['updated_at'] or row['created_at']
+    return row
+
+
+def record_digest(row):
+    return int.from_bytes(hashlib.sha256(canonical_json(row)).digest(), 'big')
+
+
+# --- Sources -----------------------------------------------------------------
+
+def _manifest_for(path):
+    """The backup_database.py manifest written next to a backup file, if any"""
+    run = os.path.basename(path).split('.')[0]
+    manifest_path = os.path.join(os.path.dirname(path), f'{run}.manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _iter_sqlite(path):
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        for row in conn.execute(f"SELECT {', '.join(EXPORT_FIELDS)} FROM projects ORDER BY id"):
+            yield dict(row)
+    finally:
+        conn.close()
+
+
+def _iter_json(stream):
+    head = stream.read(1)
+    while head and head.isspace():
+        head = stream.read(1)
+    if head == '[':
+        yield from json.loads(head + stream.read())
+        return
+    if head:
+        yield json.loads(head + stream.readline())
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_file(path):
+    if path == '-':
+        yield from _iter_json(sys.stdin)
+        return
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as stream:
+        yield from _iter_json(stream)
+
+
+def open_source(path=None, snapshot=None, store_root=DEFAULT_STORE):
+    """Return (records iterator, expected project count or None, description)
+
+    Checksums recorded in a manifest are verified here, before any load.
+    """
+    if snapshot:
+        store = BackupStore(store_root)
+        snapshot_id = store.snapshot_ids()[-1] if snapshot == 'latest' else snapshot
+        manifest = store.load_manifest(snapshot_id)
+        # Objects are checked against their sha256 as they are read
+        return iter_snapshot_records(store, manifest), manifest['projects'], f'snapshot {snapshot_id}'
+
+    manifest = _manifest_for(path) if path != '-' else None
+    if path.endswith('.db'):
+        entry = (manifest or {}).get('database')
+        records = _iter_sqlite(path)
+        expected = entry['row_counts'].get('projects') if entry else None
+    else:
+        entry = (manifest or {}).get('export')
+        records = _iter_file(path)
+        expected = entry['projects'] if entry else None
+
+    if entry:
+        actual = file_sha256(path)
+        if actual != entry['sha256']:
+            raise RestoreError(f"{path}: sha256 {actual} does not match the manifest ({entry['sha256']})")
+    return records, expected, path
+
+
+# --- Load --------------------------------------------------------------------
+
+def _secondary_indexes():
+    return [index for table in INDEXED_TABLES for index in table.indexes if not index.unique]
+
+
+def _drop_search_triggers(conn, dialect):
+    if dialect == 'sqlite':
+        for trigger in ('projects_fts_ai', 'projects_fts_ad', 'projects_fts_au'):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {trigger}'))
+    elif dialect == 'postgresql':
+        conn.execute(text('DROP INDEX IF EXISTS ix_projects_search_vector'))
+        for index in POSTGRES_TRGM_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS {index}'))
+
+
+def _rebuild_search(conn, dialect):
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        # The row trigger stayed on and filled search_vector during the load
+        conn.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_projects_search_vector ON projects USING GIN (search_vector)'
+        ))
+        install_trigram_indexes(conn)
+
+
+def _derive_links(batch_size):
+    """Fill tags / people / relations from the restored JSON columns"""
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(Project.id, Project.tags, Project.stakeholders,
+                             Project.product_manager, Project.related_projects)
+            .filter(Project.id > last_id)
+            .order_by(Project.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        Tag.sync_project_tags({row.id: row.tags or [] for row in rows})
+        ProjectStakeholder.sync_projects({row.id: (row.stakeholders, row.product_manager) for row in rows})
+        ProjectRelation.sync_projects({row.id: row.related_projects or [] for row in rows})
+        last_id = rows[-1].id
+
+
+def _restored_checksum():
+    total = 0
+    count = 0
+    stmt = db.select(*[getattr(Project, f) for f in EXPORT_FIELDS])
+    for row in db.session.execute(stmt.execution_options(yield_per=BATCH_SIZE)):
+        total = (total + record_digest(dict(zip(EXPORT_FIELDS, row)))) % (1 << 256)
+        count += 1
+    return count, total
+
+
+def _record_removed(replaced, restored_ids, batch_size):
+    """Tombstone the replaced projects the restore did not bring back
+
+    The Core deletes above bypass the ORM hook that normally writes them.
+    Older tombstones of restored ids are dropped, or incremental readers
+    would delete those projects again.
+    """
+    tombstones = ProjectTombstone.__table__
+    db.session.execute(tombstones.delete().where(tombstones.c.project_id.in_(db.select(Project.id))))
+    now = datetime.utcnow()
+    rows = [
+        {'project_id': project_id, 'name': name, 'deleted_at': now}
+        for project_id, name in replaced.items() if project_id not in restored_ids
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(tombstones.insert(), rows[start:start + batch_size])
+    return len(rows)
+
+
+def restore(records, expected=None, replace=False, batch_size=BATCH_SIZE, source=None):
+    """Load records into the current database in one transaction; returns a report dict
+
+    Must run inside an app context. The run is recorded in restore_log, which
+    makes the next backup_store.py snapshot a full one.
+    """
+    timings = {}
+    started = time.perf_counter()
+    dialect = db.engine.dialect.name
+    conn = db.session.connection()
+
+    existing = db.session.query(Project.id).limit(1).first()
+    if existing and not replace:
+        raise RestoreError('The target database already has projects; use --replace to overwrite them')
+
+    try:
+        # A write first, so pysqlite has opened the transaction before the DDL
+        # below (it would otherwise autocommit each DROP)
+        bump_catalog_version()
+        _drop_search_triggers(conn, dialect)
+        for index in _secondary_indexes():
+            index.drop(conn, checkfirst=True)
+
+        replaced = {}
+        if existing:
+            replaced = dict(conn.execute(db.select(Project.id, Project.name)).all())
+            for table in (project_tags, ProjectStakeholder.__table__, ProjectRelation.__table__,
+                          Project.__table__, Tag.__table__, Person.__table__):
+                conn.execute(table.delete())
+            if dialect == 'sqlite':
+                conn.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('delete-all')"))
+
+        # 1. Projects, ids preserved
+        source_checksum = 0
+        count = 0
+        batch = []
+        name_keys = set()
+        restored_ids = set()
+        for record in records:
+            row = normalize_record(record)
+            source_checksum = (source_checksum + record_digest(row)) % (1 << 256)
+            # Names that only differ by case predate the unique name_key index;
+            # later ones keep a NULL key, as after schema migration 10
+            key = normalize_name(row['name'])
+            row['name_key'] = None if key in name_keys else key
+            name_keys.add(key)
+            restored_ids.add(row['id'])
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(Project.__table__.insert(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.execute(Project.__table__.insert(), batch)
+            count += len(batch)
+        if dialect == 'postgresql':
+            conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('projects', 'id'), COALESCE(MAX(id), 1)) FROM projects"
+            ))
+        timings['load'] = time.perf_counter() - started
+
+        # 2. Derived tables
+        mark = time.perf_counter()
+        _derive_links(batch_size)
+        timings['derive'] = time.perf_counter() - mark
+
+        # 3. Indexes and search
+        mark = time.perf_counter()
+        for index in _secondary_indexes():
+            index.create(conn, checkfirst=True)
+        _rebuild_search(conn, dialect)
+        timings['index'] = time.perf_counter() - mark
+
+        # 4. Verify before committing
+        mark = time.perf_counter()
+        if expected is not None and count != expected:
+            raise RestoreError(f'Source had {count} projects; the manifest expects {expected}')
+        restored, restored_checksum = _restored_checksum()
+        if restored != count or restored_checksum != source_checksum:
+            raise RestoreError(f'Restored data does not match the source ({restored}/{count} projects)')
+        timings['verify'] = time.perf_counter() - mark
+
+        removed = _record_removed(replaced, restored_ids, batch_size)
+        # Stamped last, so it is not older than anything a reader could see
+        db.session.add(RestoreLog(source=source and source[:500], projects=count, replaced=removed))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        'projects': count,
+        'removed': removed,
+        'tags': Tag.query.count(),
+        'people': Person.query.count(),
+        'checksum': f'{source_checksum:064x}',
+        'seconds': round(elapsed, 3),
+        'phases': {name: round(seconds, 3) for name, seconds in timings.items()},
+        'records_per_second': round(count / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Restore projects from a backup')
+    parser.add_argument('path', nargs='?', help=".db, .json, .ndjson(.gz) backup ('-' for stdin)")
+    parser.add_argument('--snapshot', help="restore a backup_store.py snapshot id (or 'latest')")
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--replace', action='store_true', help='overwrite the projects already in the database')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if bool(args.path) == bool(args.snapshot):
+        parser.error('give either a backup path or --snapshot')
+
+    print("=" * 60)
+    print("Cars24 Product Portal - Restore")
+    print("=" * 60)
+    print()
+
+    try:
+        records, expected, description = open_source(args.path, args.snapshot, args.store)
+        print(f"📦 Restoring from {description}" + (f" ({expected} projects expected)" if expected is not None else ""))
+        with app.app_context():
+            # An empty target gets the full schema first
+            ensure_schema()
+            report = restore(records, expected, replace=args.replace, batch_size=args.batch_size,
+                             source=description)
+    except (RestoreError, SQLAlchemyError, OSError, ValueError) as e:
+        print(f"❌ Restore failed, nothing was changed: {e}")
+        return 1
+
+    phases = report['phases']
+    print(f"✅ Restored {report['projects']} projects ({report['tags']} tags, {report['people']} people)")
+    if report['removed']:
+        print(f"🗑️  {report['removed']} replaced projects are not in the backup; recorded as deleted")
+    print(f"🔒 Checksum verified: {report['checksum'][:16]}…")
+    print(f"⏱️  {report['seconds']}s ({report['records_per_second']} projects/s): "
+          f"load {phases['load']}s, derive {phases['derive']}s, "
+          f"index {phases['index']}s, verify {phases['verify']}s")
+
+    print()
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Full-text search index for projects
+
+SQLite: an external-content FTS5 table (projects_fts) kept in sync with the
+projects table by triggers, ranked with bm25().
+PostgreSQL: a tsvector column maintained by a trigger, backed by a GIN index
+and ranked with ts_rank().
+
+Because the index is maintained by the database itself, every write path
+(forms, scripts, raw SQL) keeps it up to date.
+"""
+import re
+from markupsafe import escape
+from sqlalchemy import text
+from models import db
+
+# Highlight markers used inside the database; swapped for <mark> tags after
+# the surrounding text has been HTML-escaped.
+_HL_OPEN = '\x02'
+_HL_CLOSE = '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Column weights: name > tags > product manager > business vertical > summary
+_SQLITE_BM25_WEIGHTS = '10.0, 1.0, 4.0, 2.0, 6.0'
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+        name, summary, product_manager, business_vertical, tags,
+        content='projects', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, summary, product_manager, business_vertical, tags)
+        VALUES (new.id, new.name, new.summary, new.product_manager, new.business_vertical, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, summary, product_manager, business_vertical, tags)
+        VALUES ('delete', old.id, old.name, old.summary, old.product_manager, old.business_vertical, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, summary, product_manager, business_vertical, tags)
+        VALUES ('delete', old.id, old.name, old.summary, old.product_manager, old.business_vertical, old.tags);
+        INSERT INTO projects_fts(rowid, name, summary, product_manager, business_vertical, tags)
+        VALUES (new.id, new.name, new.summary, new.product_manager, new.business_vertical, new.tags);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_projects_search_vector ON projects USING GIN (search_vector)",
+    """
+    CREATE OR REPLACE FUNCTION projects_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.tags::text, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.product_manager, '') || ' ' ||
+                                            coalesce(NEW.business_vertical, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(NEW.summary, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS projects_search_vector_trigger ON projects",
+    """
+    CREATE TRIGGER projects_search_vector_trigger
+        BEFORE INSERT OR UPDATE ON projects
+        FOR EACH ROW EXECUTE FUNCTION projects_search_vector_update()
+    """,
+]
+
+
+def init_search_index():
+    """Create the full-text index (idempotent) and backfill existing rows"""
+    with db.engine.begin() as conn:
+        install_search_index(conn)
+
+
+def install_search_index(conn):
+    """init_search_index() on an existing connection (used by migrations.py)"""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_fts'"
+        )).first()
+        for statement in SQLITE_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            conn.execute(text(statement))
+        # Touch rows that predate the trigger so it fills search_vector
+        conn.execute(text("UPDATE projects SET name = name WHERE search_vector IS NULL"))
+
+
+def rebuild_search_index():
+    """Rebuild the index from scratch (e.g. after a bulk load with triggers off)"""
+    dialect = db.engine.dialect.name
+
+    with db.engine.begin() as conn:
+        if dialect == 'sqlite':
+            conn.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"))
+        elif dialect == 'postgresql':
+            conn.execute(text("UPDATE projects SET name = name"))
+
+
+def _query_tokens(query):
+    return _TOKEN_RE.findall(query.lower())
+
+
+def _sqlite_match(tokens):
+    # Every token must match; the trailing * makes the last-typed word a prefix
+    return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def _postgres_tsquery(tokens):
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def _render_highlight(value):
+    """HTML-escape text from the index and turn the markers into <mark> tags"""
+    if not value:
+        return ''
+    escaped = str(escape(value))
+    return escaped.replace(_HL_OPEN, '<mark>').replace(_HL_CLOSE, '</mark>')
+
+
+def _truncate(summary, length=100):
+    summary = summary or ''
+    return summary[:length] + '...' if len(summary) > length else summary
+
+
+def _sqlite_statement(tokens, limit):
+    sql = text(f"""
+        SELECT p.id, p.name, p.summary, p.business_vertical, p.product_manager,
+               highlight(projects_fts, 0, :hl_open, :hl_close) AS name_highlighted,
+               snippet(projects_fts, 1, :hl_open, :hl_close, '…', 16) AS snippet,
+               -bm25(projects_fts, {_SQLITE_BM25_WEIGHTS}) AS score
+        FROM projects_fts
+        JOIN projects p ON p.id = projects_fts.rowid
+        WHERE projects_fts MATCH :match
+        ORDER BY score DESC
+        LIMIT :limit
+    """)
+    # bm25() is "lower is better"; negated so callers can treat higher as better
+    return sql, {
+        'match': _sqlite_match(tokens), 'limit': limit,
+        'hl_open': _HL_OPEN, 'hl_close': _HL_CLOSE,
+    }
+
+
+def _postgres_statement(tokens, limit):
+    sql = text("""
+        SELECT id, name, summary, business_vertical, product_manager, score,
+               ts_headline('simple', name, query,
+                           'StartSel=' || :hl_open || ', StopSel=' || :hl_close || ', HighlightAll=true') AS name_highlighted,
+               ts_headline('simple', summary, query,
+                           'StartSel=' || :hl_open || ', StopSel=' || :hl_close || ', MaxWords=24, MinWords=8') AS snippet
+        FROM (
+            SELECT p.id, p.name, p.summary, p.business_vertical, p.product_manager,
+                   ts_rank(p.search_vector, q) AS score, q AS query
+            FROM projects p, to_tsquery('simple', :tsquery) q
+            WHERE p.search_vector @@ q
+            ORDER BY score DESC, p.id
+            LIMIT :limit
+        ) ranked
+        ORDER BY score DESC, id
+    """)
+    return sql, {
+        'tsquery': _postgres_tsquery(tokens), 'limit': limit,
+        'hl_open': _HL_OPEN, 'hl_close': _HL_CLOSE,
+    }
+
+
+def full_text_filter(query):
+    """Return a WHERE clause restricting projects to full-text matches, or None"""
+    tokens = _query_tokens(query)
+    if not tokens:
+        return None
+
+    if db.engine.dialect.name == 'postgresql':
+        return text(
+            "projects.search_vector @@ to_tsquery('simple', :fts_query)"
+        ).bindparams(fts_query=_postgres_tsquery(tokens))
+    return text(
+        "projects.id IN (SELECT rowid FROM projects_fts WHERE projects_fts MATCH :fts_match)"
+    ).bindparams(fts_match=_sqlite_match(tokens))
+
+
+def full_text_statement(query, limit, dialect):
+    """(statement, parameters) of the ranked search, or None for a query without words
+
+    Shared by full_text_search() and the async handlers in asgi.py.
+    """
+    tokens = _query_tokens(query)
+    if not tokens:
+        return None
+    if dialect == 'postgresql':
+        return _postgres_statement(tokens, limit)
+    return _sqlite_statement(tokens, limit)
+
+
+def full_text_results(rows):
+    """API dicts for the rows (mappings) of full_text_statement()"""
+    return [{
+        'id': row['id'],
+        'name': row['name'],
+        'summary': _truncate(row['summary']),
+        'business_vertical': row['business_vertical'],
+        'product_manager': row['product_manager'],
+        'name_highlighted': _render_highlight(row['name_highlighted']),
+        'snippet': _render_highlight(row['snippet']),
+        'score': round(float(row['score']), 4),
+    } for row in rows]
+
+
+def full_text_search(query, limit=20):
+    """Ranked full-text search over name, summary, PM, vertical and tags"""
+    statement = full_text_statement(query, limit, db.engine.dialect.name)
+    if statement is None:
+        return []
+    return full_text_results(db.session.execute(*statement).mappings())
@@ -0,0 +1,48 @@
+"""
+Document URLs that must never turn into an embed (they are rendered as an iframe src)
+
+Run with: python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_types import annotate_docs, classify_url, get_document_embed_info
+
+HOSTILE_URLS = [
+    'javascript:alert(document.domain)//notion.so/x',
+    'JavaScript:alert(1)//www.figma.com/file/x',
+    'javascript:alert(1)//docs.google.com/document/d/abc',
+    'data:text/html,<script>alert(1)</script>//notion.so/',
+    'data:text/html;base64,PHNjcmlwdD4=//miro.com/app/board/x=/',
+    'http://www.notion.so/cars24/Page',
+    'https://evil.example/?u=https://www.notion.so/cars24/Page',
+    'https://notion.so.evil.example/cars24/Page',
+    'https://docs.google.com.evil.example/document/d/abc/edit',
+]
+
+
+@pytest.mark.parametrize('url', HOSTILE_URLS)
+def test_hostile_urls_get_no_embed(url):
+    assert classify_url(url)['embed_url'] is None
+    assert annotate_docs([{'name': 'doc', 'url': url}])[0]['embed_url'] is None
+    assert get_document_embed_info({'name': 'doc', 'url': url})['embed_url'] is None
+
+
+@pytest.mark.parametrize('embed_url', ['javascript:alert(1)', 'data:text/html,<script>alert(1)</script>', 'http://x/'])
+def test_stored_entries_with_unsafe_embed_urls_are_not_rendered(embed_url):
+    doc = {'name': 'doc', 'url': 'https://www.notion.so/x', 'type': 'notion', 'embed_url': embed_url}
+    assert get_document_embed_info(doc)['embed_url'] is None
+
+
+@pytest.mark.parametrize('url, embed_url', [
+    ('https://www.notion.so/cars24/Roadmap-abc123?pvs=4', 'https://www.notion.so/cars24/Roadmap-abc123'),
+    ('https://docs.google.com/document/d/abc_123/edit', 'https://docs.google.com/document/d/abc_123/preview'),
+    ('https://cars24.looker.com/dashboards/42', 'https://cars24.looker.com/embed/dashboards/42'),
+    ('https://miro.com/app/board/uXjVO=/', 'https://miro.com/app/live-embed/uXjVO=/'),
+])
+def test_known_services_still_embed(url, embed_url):
+    assert classify_url(url)['embed_url'] == embed_url